@@ -1,5 +1,8 @@
 import os
 from typing import List
+from dotenv import load_dotenv
+
+load_dotenv()
 
 class Settings:
     """Application settings and configuration"""
@@ -21,10 +24,20 @@ class Settings:
     SUPABASE_ANON_KEY: str = os.getenv("SUPABASE_ANON_KEY", "")
     SUPABASE_SERVICE_ROLE_KEY: str = os.getenv("SUPABASE_SERVICE_ROLE_KEY", "")
     
+    # Authentication backend: "supabase", or "local" for users stored in the app database
+    AUTH_BACKEND: str = os.getenv("AUTH_BACKEND", "supabase").lower()
+    AUTH_HASH_WORKERS: int = int(os.getenv("AUTH_HASH_WORKERS", "2"))
+    AUTH_BCRYPT_ROUNDS: int = int(os.getenv("AUTH_BCRYPT_ROUNDS", "12"))
+    
     # JWT Configuration
     JWT_SECRET_KEY: str = os.getenv("JWT_SECRET_KEY", "your-secret-key-change-in-production")
     JWT_ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
+    # Users of tokens without profile claims are cached per token for this many seconds
+    AUTH_USER_CACHE_TTL: float = float(os.getenv("AUTH_USER_CACHE_TTL", "60"))
+    AUTH_USER_CACHE_SIZE: int = int(os.getenv("AUTH_USER_CACHE_SIZE", "10000"))
+    # Logged-out tokens are shared between workers through the database every this many seconds
+    AUTH_REVOCATION_SYNC_INTERVAL: float = float(os.getenv("AUTH_REVOCATION_SYNC_INTERVAL", "2"))
     
     # CORS Configuration
     ALLOWED_ORIGINS: List[str] = [
@@ -39,6 +52,45 @@ class Settings:
     OPENAI_MODEL: str = os.getenv("OPENAI_MODEL", "gpt-3.5-turbo")
     OPENAI_MAX_TOKENS: int = int(os.getenv("OPENAI_MAX_TOKENS", "500"))
     OPENAI_TEMPERATURE: float = float(os.getenv("OPENAI_TEMPERATURE", "0.7"))
+    OPENAI_TIMEOUT: float = float(os.getenv("OPENAI_TIMEOUT", "30"))
+    OPENAI_CONNECT_TIMEOUT: float = float(os.getenv("OPENAI_CONNECT_TIMEOUT", "5"))
+    OPENAI_MAX_RETRIES: int = int(os.getenv("OPENAI_MAX_RETRIES", "2"))
+    OPENAI_MAX_CONNECTIONS: int = int(os.getenv("OPENAI_MAX_CONNECTIONS", "20"))
+    OPENAI_MAX_KEEPALIVE_CONNECTIONS: int = int(os.getenv("OPENAI_MAX_KEEPALIVE_CONNECTIONS", "10"))
+    AI_STATUS_CACHE_TTL: float = float(os.getenv("AI_STATUS_CACHE_TTL", "10"))
+    AI_HISTORY_TOKEN_BUDGET: int = int(os.getenv("AI_HISTORY_TOKEN_BUDGET", "1500"))
+    AI_SUMMARY_MAX_TOKENS: int = int(os.getenv("AI_SUMMARY_MAX_TOKENS", "200"))
+    AI_SESSION_MAX: int = int(os.getenv("AI_SESSION_MAX", "10000"))
+    AI_SESSION_TTL: float = float(os.getenv("AI_SESSION_TTL", "86400"))
+    AI_SESSION_PERSIST: bool = os.getenv("AI_SESSION_PERSIST", "False").lower() == "true"
+    AI_FAST_PATH_ENABLED: bool = os.getenv("AI_FAST_PATH_ENABLED", "True").lower() == "true"
+    AI_RESPONSE_CACHE_SIZE: int = int(os.getenv("AI_RESPONSE_CACHE_SIZE", "1000"))
+    AI_RESPONSE_CACHE_TTL: float = float(os.getenv("AI_RESPONSE_CACHE_TTL", "600"))
+    AI_BACKEND: str = os.getenv("AI_BACKEND", "openai")
+    AI_TOOL_CALLING: bool = os.getenv("AI_TOOL_CALLING", "True").lower() == "true"
+    AI_MOCK_LATENCY_DISTRIBUTION: str = os.getenv("AI_MOCK_LATENCY_DISTRIBUTION", "lognormal")
+    AI_MOCK_LATENCY_MS: float = float(os.getenv("AI_MOCK_LATENCY_MS", "600"))
+    AI_MOCK_LATENCY_SPREAD: float = float(os.getenv("AI_MOCK_LATENCY_SPREAD", "0.5"))
+    AI_MOCK_TOKENS_PER_SECOND: float = float(os.getenv("AI_MOCK_TOKENS_PER_SECOND", "40"))
+    AI_MOCK_SCRIPT: str = os.getenv("AI_MOCK_SCRIPT", "")
+    AI_MOCK_SEED: str = os.getenv("AI_MOCK_SEED", "")
+    AI_LLM_MAX_CONCURRENCY: int = int(os.getenv("AI_LLM_MAX_CONCURRENCY", "8"))
+    AI_LLM_MAX_QUEUE: int = int(os.getenv("AI_LLM_MAX_QUEUE", "32"))
+    AI_LLM_QUEUE_TIMEOUT: float = float(os.getenv("AI_LLM_QUEUE_TIMEOUT", "5"))
+    AI_LLM_CALL_TIMEOUT: float = float(os.getenv("AI_LLM_CALL_TIMEOUT", "20"))
+    AI_BREAKER_FAILURE_THRESHOLD: int = int(os.getenv("AI_BREAKER_FAILURE_THRESHOLD", "5"))
+    AI_BREAKER_RESET_TIMEOUT: float = float(os.getenv("AI_BREAKER_RESET_TIMEOUT", "30"))
+    AI_DB_WORKERS: int = int(os.getenv("AI_DB_WORKERS", "8"))
+    AI_KNOWLEDGE_DIRS: str = os.getenv("AI_KNOWLEDGE_DIRS", "knowledge")
+    AI_KNOWLEDGE_INDEX_PATH: str = os.getenv("AI_KNOWLEDGE_INDEX_PATH", "data/knowledge_index.json")
+    AI_KNOWLEDGE_TOP_K: int = int(os.getenv("AI_KNOWLEDGE_TOP_K", "3"))
+    AI_KNOWLEDGE_MIN_SCORE: float = float(os.getenv("AI_KNOWLEDGE_MIN_SCORE", "1.0"))
+    AI_METRICS_ENABLED: bool = os.getenv("AI_METRICS_ENABLED", "True").lower() == "true"
+    AI_METRICS_BATCH_SIZE: int = int(os.getenv("AI_METRICS_BATCH_SIZE", "50"))
+    AI_METRICS_FLUSH_INTERVAL: float = float(os.getenv("AI_METRICS_FLUSH_INTERVAL", "5"))
+    AI_METRICS_RETENTION_DAYS: float = float(os.getenv("AI_METRICS_RETENTION_DAYS", "90"))
+    AI_PRICE_PROMPT_PER_1M: str = os.getenv("AI_PRICE_PROMPT_PER_1M", "")
+    AI_PRICE_COMPLETION_PER_1M: str = os.getenv("AI_PRICE_COMPLETION_PER_1M", "")
     
     # Email Configuration
     SMTP_SERVER: str = os.getenv("SMTP_SERVER", "smtp.gmail.com")
@@ -47,17 +99,51 @@ class Settings:
     EMAIL_PASSWORD: str = os.getenv("EMAIL_PASSWORD", "demo-password-12345")
     USE_TLS: bool = os.getenv("USE_TLS", "True").lower() == "true"
     EMAIL_DEMO_MODE: bool = os.getenv("EMAIL_DEMO_MODE", "True").lower() == "true"
+    SMTP_POOL_SIZE: int = int(os.getenv("SMTP_POOL_SIZE", "4"))
+    SMTP_MAX_MESSAGES_PER_CONNECTION: int = int(os.getenv("SMTP_MAX_MESSAGES_PER_CONNECTION", "100"))
+    SMTP_NOOP_AFTER: float = float(os.getenv("SMTP_NOOP_AFTER", "30"))
+    SMTP_MAX_IDLE: float = float(os.getenv("SMTP_MAX_IDLE", "240"))
+    SMTP_TIMEOUT: float = float(os.getenv("SMTP_TIMEOUT", "30"))
+    EMAIL_DELIVERY_MAX_IN_FLIGHT: int = int(os.getenv("EMAIL_DELIVERY_MAX_IN_FLIGHT", "4"))
+    EMAIL_DOMAIN_MAX_IN_FLIGHT: int = int(os.getenv("EMAIL_DOMAIN_MAX_IN_FLIGHT", "2"))
+    EMAIL_DOMAIN_RATE: str = os.getenv("EMAIL_DOMAIN_RATE", "0")
+    EMAIL_OUTBOX_POLL_INTERVAL: float = float(os.getenv("EMAIL_OUTBOX_POLL_INTERVAL", "5"))
+    EMAIL_OUTBOX_BATCH_SIZE: int = int(os.getenv("EMAIL_OUTBOX_BATCH_SIZE", "20"))
+    EMAIL_OUTBOX_MAX_ATTEMPTS: int = int(os.getenv("EMAIL_OUTBOX_MAX_ATTEMPTS", "6"))
+    EMAIL_OUTBOX_RETRY_BASE: float = float(os.getenv("EMAIL_OUTBOX_RETRY_BASE", "30"))
+    EMAIL_OUTBOX_RETRY_MAX: float = float(os.getenv("EMAIL_OUTBOX_RETRY_MAX", "3600"))
+    EMAIL_OUTBOX_RETENTION_DAYS: float = float(os.getenv("EMAIL_OUTBOX_RETENTION_DAYS", "30"))
     
     # Hotel Information
     HOTEL_NAME: str = os.getenv("HOTEL_NAME", "Grand Hotel")
     HOTEL_ADDRESS: str = os.getenv("HOTEL_ADDRESS", "123 Luxury Avenue, Hotel District, City 12345")
     HOTEL_PHONE: str = os.getenv("HOTEL_PHONE", "+1-555-HOTEL-1")
-    HOTEL_EMAIL: str = os.getenv("EMAIL_ADDRESS", EMAIL_ADDRESS)
+    HOTEL_EMAIL: str = os.getenv("HOTEL_EMAIL", EMAIL_ADDRESS)
     HOTEL_WEBSITE: str = os.getenv("HOTEL_WEBSITE", "https://grandhotel.com")
+    HOTEL_CHECK_IN_TIME: str = os.getenv("HOTEL_CHECK_IN_TIME", "3:00 PM")
     
     # Admin Configuration
     ADMIN_EMAIL: str = os.getenv("ADMIN_EMAIL", EMAIL_ADDRESS)
     ENABLE_ADMIN_NOTIFICATIONS: bool = os.getenv("ENABLE_ADMIN_NOTIFICATIONS", "True").lower() == "true"
+    ADMIN_DIGEST_ENABLED: bool = os.getenv("ADMIN_DIGEST_ENABLED", "False").lower() == "true"
+    ADMIN_DIGEST_INTERVAL: float = float(os.getenv("ADMIN_DIGEST_INTERVAL", "900"))
+    ADMIN_DIGEST_MAX_EVENTS: int = int(os.getenv("ADMIN_DIGEST_MAX_EVENTS", "200"))
+    
+    # Rate Limiting (requests per second, minute, hour or day; 0 disables a limit)
+    RATE_LIMIT_ENABLED: bool = os.getenv("RATE_LIMIT_ENABLED", "True").lower() == "true"
+    RATE_LIMIT_TRUST_PROXY: bool = os.getenv("RATE_LIMIT_TRUST_PROXY", "False").lower() == "true"
+    RATE_LIMIT_AI_CHAT: str = os.getenv("RATE_LIMIT_AI_CHAT", "20/minute")
+    RATE_LIMIT_AI_CHAT_IP: str = os.getenv("RATE_LIMIT_AI_CHAT_IP", "60/minute")
+    RATE_LIMIT_AI_SESSIONS: str = os.getenv("RATE_LIMIT_AI_SESSIONS", "20/minute")
+    RATE_LIMIT_AI_BOOKING_LOOKUP: str = os.getenv("RATE_LIMIT_AI_BOOKING_LOOKUP", "20/minute")
+    
+    # Health Probes
+    # /health/ready fails if SELECT 1 takes longer than this many seconds
+    HEALTH_DB_TIMEOUT: float = float(os.getenv("HEALTH_DB_TIMEOUT", "2"))
+    # Readiness reports "degraded" once a connection pool is this full
+    HEALTH_POOL_SATURATION_WARN: float = float(os.getenv("HEALTH_POOL_SATURATION_WARN", "0.8"))
+    # Readiness results are reused for this many seconds, however often probes arrive
+    HEALTH_READY_CACHE_TTL: float = float(os.getenv("HEALTH_READY_CACHE_TTL", "1"))
     
     # Development/Debug Settings
     DEBUG: bool = os.getenv("DEBUG", "False").lower() == "true"
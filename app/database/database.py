@@ -1,13 +1,79 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from typing import List, Optional
-from datetime import datetime
+from sqlalchemy import create_engine, func, text
+from sqlalchemy.orm import joinedload, sessionmaker
+from typing import List, Optional, Sequence
+from datetime import date, datetime, timedelta
+import itertools
+import json
+import threading
+import uuid
+import weakref
+
+# Bumped on every room or booking write so caches can tell that hotel data changed
+_write_counter = itertools.count(1)
+_data_version = 0
+
+def _mark_data_changed():
+    global _data_version
+    _data_version = next(_write_counter)
+
+# Every engine opened in this process, for pool statistics; each Database has its own pool
+_engines = weakref.WeakSet()
 
 class Database:
+    DATABASE_URL = "sqlite:///hotel.db"
+
     def __init__(self):
-        DATABASE_URL = "sqlite:///hotel.db"
-        self.engine = create_engine(DATABASE_URL)
-        self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+        # The engine is created on first use, so services can be built at import for free
+        self._engine = None
+        self._session_factory = None
+        self._engine_lock = threading.Lock()
+
+    @property
+    def engine(self):
+        if self._engine is None:
+            with self._engine_lock:
+                if self._engine is None:
+                    self._engine = create_engine(self.DATABASE_URL)
+                    _engines.add(self._engine)
+        return self._engine
+
+    @property
+    def SessionLocal(self):
+        if self._session_factory is None:
+            engine = self.engine
+            with self._engine_lock:
+                if self._session_factory is None:
+                    self._session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        return self._session_factory
+
+    def ping(self) -> None:
+        """Run SELECT 1 on a pooled connection; raises if the database cannot be reached"""
+        with self.engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+
+    @staticmethod
+    def get_pool_status() -> dict:
+        """Connections checked out of every engine's pool against what the pools allow"""
+        pools = []
+        for engine in list(_engines):
+            pool = engine.pool
+            # QueuePool reports its limits; other pool classes (e.g. for in-memory SQLite) have none
+            if not hasattr(pool, "checkedout"):
+                continue
+            capacity = pool.size() + max(pool._max_overflow, 0)
+            pools.append({"checked_out": pool.checkedout(), "capacity": capacity})
+        return {
+            "pools": len(pools),
+            "checked_out": sum(p["checked_out"] for p in pools),
+            "capacity": sum(p["capacity"] for p in pools),
+            # The fullest pool is the one requests would queue on
+            "saturation": round(max((p["checked_out"] / p["capacity"] for p in pools if p["capacity"]), default=0.0), 3)
+        }
+
+    @staticmethod
+    def get_data_version() -> int:
+        """Get the version of room and booking data written by this process"""
+        return _data_version
 
     def get_session(self):
         """Get a database session"""
@@ -37,6 +103,22 @@ class Database:
         finally:
             session.close()
 
+    def get_hotel_counts(self) -> dict:
+        """Get room and booking counts without loading the rows"""
+        session = self.SessionLocal()
+        try:
+            from ..models.database_models import Room, Booking
+            total_rooms = session.query(func.count(Room.id)).scalar() or 0
+            available_rooms = session.query(func.count(Room.id)).filter(Room.is_available == True).scalar() or 0
+            total_bookings = session.query(func.count(Booking.id)).scalar() or 0
+            return {
+                "total_rooms": total_rooms,
+                "available_rooms": available_rooms,
+                "total_bookings": total_bookings
+            }
+        finally:
+            session.close()
+
     def create_room_in_db(self, room_number: str, room_type: str, price_per_night: float) -> dict:
         """Create new room"""
         session = self.SessionLocal()
@@ -49,6 +131,7 @@ class Database:
             )
             session.add(new_room)
             session.commit()
+            _mark_data_changed()
             session.refresh(new_room)
             return self._room_to_dict(new_room)
         finally:
@@ -69,6 +152,7 @@ class Database:
             room.price_per_night = price_per_night
             room.is_available = is_available
             session.commit()
+            _mark_data_changed()
             return self._room_to_dict(room)
         finally:
             session.close()
@@ -85,6 +169,7 @@ class Database:
             room_dict = self._room_to_dict(room)
             session.delete(room)
             session.commit()
+            _mark_data_changed()
             return room_dict
         finally:
             session.close()
@@ -196,8 +281,8 @@ class Database:
             session.close()
 
     def create_booking_in_db(self, guest_id: int, room_id: int, check_in_date: str,
-                           check_out_date: str, total_price: float) -> dict:
-        """Create new booking"""
+                           check_out_date: str, total_price: float, notify: Sequence[str] = ()) -> dict:
+        """Create new booking, queueing the notify emails in the same transaction"""
         session = self.SessionLocal()
         try:
             from ..models.database_models import Booking
@@ -216,14 +301,17 @@ class Database:
                 total_price=total_price
             )
             session.add(new_booking)
+            session.flush()
+            self._add_outbox_emails(session, new_booking, notify)
             session.commit()
+            _mark_data_changed()
             session.refresh(new_booking)
             return self._booking_to_dict(new_booking)
         finally:
             session.close()
 
-    def delete_booking_from_db(self, booking_id: int) -> Optional[dict]:
-        """Cancel/Delete booking"""
+    def delete_booking_from_db(self, booking_id: int, notify: Sequence[str] = ()) -> Optional[dict]:
+        """Cancel/Delete booking, queueing the notify emails in the same transaction"""
         session = self.SessionLocal()
         try:
             from ..models.database_models import Booking
@@ -232,12 +320,383 @@ class Database:
                 return None
 
             booking_dict = self._booking_to_dict(booking)
+            self._add_outbox_emails(session, booking, notify)
             session.delete(booking)
             session.commit()
+            _mark_data_changed()
             return booking_dict
         finally:
             session.close()
 
+    def get_chat_session(self, session_id: str) -> Optional[dict]:
+        """Get a persisted chat session"""
+        session = self.SessionLocal()
+        try:
+            from ..models.database_models import ChatSession
+            chat_session = session.query(ChatSession).filter(ChatSession.id == session_id).first()
+            if not chat_session:
+                return None
+            return {
+                "id": chat_session.id,
+                "data": chat_session.data,
+                "updated_at": chat_session.updated_at
+            }
+        finally:
+            session.close()
+
+    def save_chat_session(self, session_id: str, data: str) -> None:
+        """Create or update a persisted chat session"""
+        session = self.SessionLocal()
+        try:
+            from ..models.database_models import ChatSession
+            chat_session = session.query(ChatSession).filter(ChatSession.id == session_id).first()
+            if chat_session:
+                chat_session.data = data
+                chat_session.updated_at = datetime.utcnow()
+            else:
+                session.add(ChatSession(id=session_id, data=data))
+            session.commit()
+        finally:
+            session.close()
+
+    def delete_chat_session(self, session_id: str) -> bool:
+        """Delete a persisted chat session"""
+        session = self.SessionLocal()
+        try:
+            from ..models.database_models import ChatSession
+            deleted = session.query(ChatSession).filter(ChatSession.id == session_id).delete()
+            session.commit()
+            return deleted > 0
+        finally:
+            session.close()
+
+    def delete_chat_sessions_before(self, cutoff: datetime) -> int:
+        """Delete persisted chat sessions not updated since cutoff"""
+        session = self.SessionLocal()
+        try:
+            from ..models.database_models import ChatSession
+            deleted = session.query(ChatSession).filter(ChatSession.updated_at < cutoff).delete()
+            session.commit()
+            return deleted
+        finally:
+            session.close()
+
+    def add_ai_calls(self, records: List[dict]) -> None:
+        """Append a batch of AI call records in one transaction"""
+        if not records:
+            return
+        session = self.SessionLocal()
+        try:
+            from ..models.database_models import AICall
+            session.bulk_insert_mappings(AICall, records)
+            session.commit()
+        finally:
+            session.close()
+
+    def get_ai_call_totals(self, since: datetime) -> List[dict]:
+        """Calls, tokens and cost of AI calls made at or after since, per day, source and outcome"""
+        session = self.SessionLocal()
+        try:
+            from ..models.database_models import AICall
+            day = func.date(AICall.created_at)
+            rows = session.query(
+                day.label("day"), AICall.source, AICall.outcome,
+                func.count(AICall.id).label("calls"),
+                func.sum(AICall.prompt_tokens).label("prompt_tokens"),
+                func.sum(AICall.completion_tokens).label("completion_tokens"),
+                func.sum(AICall.cost_usd).label("cost_usd")
+            ).filter(AICall.created_at >= since).group_by(day, AICall.source, AICall.outcome).all()
+            return [{**row._asdict(), "day": str(row.day)} for row in rows]
+        finally:
+            session.close()
+
+    def get_ai_call_latencies(self, since: datetime) -> List[tuple]:
+        """(day, source, latency_ms) of each AI call made at or after since, for latency percentiles"""
+        session = self.SessionLocal()
+        try:
+            from ..models.database_models import AICall
+            rows = session.query(func.date(AICall.created_at), AICall.source, AICall.latency_ms).filter(
+                AICall.created_at >= since
+            ).all()
+            return [(str(day), source, latency_ms) for day, source, latency_ms in rows]
+        finally:
+            session.close()
+
+    def purge_ai_calls(self, before: datetime) -> int:
+        """Delete AI call records made before a cutoff; return how many were deleted"""
+        session = self.SessionLocal()
+        try:
+            from ..models.database_models import AICall
+            deleted = session.query(AICall).filter(AICall.created_at < before).delete(synchronize_session=False)
+            session.commit()
+            return deleted
+        finally:
+            session.close()
+
+    def user_email_exists(self, email: str) -> bool:
+        """Whether the user directory has a user with this email (one indexed lookup)"""
+        session = self.SessionLocal()
+        try:
+            from ..models.database_models import DirectoryUser
+            return session.query(DirectoryUser.id).filter(DirectoryUser.email == email.lower()).first() is not None
+        finally:
+            session.close()
+
+    def upsert_directory_users(self, users: List[dict]) -> int:
+        """Create or update user directory entries ({"id", "email", "role", "created_at"}) in one transaction"""
+        if not users:
+            return 0
+        session = self.SessionLocal()
+        try:
+            from ..models.database_models import DirectoryUser
+            now = datetime.utcnow()
+            # A provider user deleted and re-created keeps the email under a new id
+            session.query(DirectoryUser).filter(
+                DirectoryUser.email.in_([user["email"].lower() for user in users]),
+                DirectoryUser.id.notin_([user["id"] for user in users])
+            ).delete(synchronize_session=False)
+            for user in users:
+                session.merge(DirectoryUser(id=user["id"], email=user["email"].lower(), role=user.get("role") or "user",
+                                            created_at=user.get("created_at"), synced_at=now))
+            session.commit()
+            return len(users)
+        finally:
+            session.close()
+
+    def delete_directory_users_synced_before(self, cutoff: datetime) -> int:
+        """Delete user directory entries a full sync did not see, i.e. users gone from the provider"""
+        session = self.SessionLocal()
+        try:
+            from ..models.database_models import DirectoryUser
+            deleted = session.query(DirectoryUser).filter(DirectoryUser.synced_at < cutoff).delete()
+            session.commit()
+            return deleted
+        finally:
+            session.close()
+
+    def create_local_user(self, email: str, password_hash: str, user_metadata: dict) -> dict:
+        """Create a local auth user; raises IntegrityError if the email is taken"""
+        session = self.SessionLocal()
+        try:
+            from ..models.database_models import LocalUser
+            now = datetime.utcnow()
+            user = LocalUser(id=str(uuid.uuid4()), email=email.lower(), password_hash=password_hash,
+                             user_metadata=json.dumps(user_metadata), created_at=now, email_confirmed_at=now)
+            session.add(user)
+            session.commit()
+            return self._local_user_to_dict(user)
+        finally:
+            session.close()
+
+    def get_local_user(self, email: str) -> Optional[dict]:
+        """Get a local auth user, including the password hash, by email"""
+        session = self.SessionLocal()
+        try:
+            from ..models.database_models import LocalUser
+            user = session.query(LocalUser).filter(LocalUser.email == email.lower()).first()
+            return self._local_user_to_dict(user) if user else None
+        finally:
+            session.close()
+
+    def get_local_users(self, offset: int, limit: int) -> List[dict]:
+        """Get one page of local auth users, oldest first"""
+        session = self.SessionLocal()
+        try:
+            from ..models.database_models import LocalUser
+            users = session.query(LocalUser).order_by(LocalUser.created_at, LocalUser.id).offset(offset).limit(limit).all()
+            return [self._local_user_to_dict(user) for user in users]
+        finally:
+            session.close()
+
+    def add_revoked_token(self, jti: str, expires_at: datetime) -> None:
+        """Record a revoked token until its expiry"""
+        session = self.SessionLocal()
+        try:
+            from ..models.database_models import RevokedToken
+            session.merge(RevokedToken(jti=jti, expires_at=expires_at, revoked_at=datetime.utcnow()))
+            session.commit()
+        finally:
+            session.close()
+
+    def get_revoked_tokens_since(self, since: datetime) -> List[dict]:
+        """Get unexpired revoked tokens recorded at or after since"""
+        session = self.SessionLocal()
+        try:
+            from ..models.database_models import RevokedToken
+            rows = session.query(RevokedToken.jti, RevokedToken.expires_at, RevokedToken.revoked_at).filter(
+                RevokedToken.revoked_at >= since,
+                RevokedToken.expires_at > datetime.utcnow()
+            ).all()
+            return [row._asdict() for row in rows]
+        finally:
+            session.close()
+
+    def delete_expired_revoked_tokens(self) -> int:
+        """Delete revoked tokens that have expired anyway"""
+        session = self.SessionLocal()
+        try:
+            from ..models.database_models import RevokedToken
+            deleted = session.query(RevokedToken).filter(RevokedToken.expires_at <= datetime.utcnow()).delete()
+            session.commit()
+            return deleted
+        finally:
+            session.close()
+
+    def claim_outbox_emails(self, limit: int, lease_seconds: float, kinds: Optional[Sequence[str]] = None,
+                            exclude_kinds: Sequence[str] = ()) -> List[dict]:
+        """
+        Claim up to limit outbox emails that are due, optionally only of (or not of) some kinds.
+
+        A claim marks the email as sending and pushes next_attempt_at out by
+        lease_seconds, so an email left behind by a crashed worker is picked
+        up again once its lease runs out.
+        """
+        session = self.SessionLocal()
+        try:
+            from ..models.database_models import EmailOutbox
+            now = datetime.utcnow()
+            due = session.query(EmailOutbox.id).filter(
+                EmailOutbox.status.in_(("pending", "sending")),
+                EmailOutbox.next_attempt_at <= now
+            )
+            if kinds is not None:
+                due = due.filter(EmailOutbox.kind.in_(kinds))
+            if exclude_kinds:
+                due = due.filter(EmailOutbox.kind.notin_(exclude_kinds))
+            due = due.order_by(EmailOutbox.next_attempt_at).limit(limit).all()
+
+            claimed_ids = []
+            for (email_id,) in due:
+                # Conditional update, so two workers never claim the same email
+                claimed = session.query(EmailOutbox).filter(
+                    EmailOutbox.id == email_id,
+                    EmailOutbox.status.in_(("pending", "sending")),
+                    EmailOutbox.next_attempt_at <= now
+                ).update({
+                    EmailOutbox.status: "sending",
+                    EmailOutbox.attempts: EmailOutbox.attempts + 1,
+                    EmailOutbox.next_attempt_at: now + timedelta(seconds=lease_seconds)
+                }, synchronize_session=False)
+                if claimed:
+                    claimed_ids.append(email_id)
+            session.commit()
+            if not claimed_ids:
+                return []
+
+            emails = session.query(EmailOutbox).filter(EmailOutbox.id.in_(claimed_ids)).all()
+            return [{
+                "id": email.id,
+                "kind": email.kind,
+                "booking_id": email.booking_id,
+                "payload": json.loads(email.payload),
+                "attempts": email.attempts,
+                "created_at": email.created_at
+            } for email in emails]
+        finally:
+            session.close()
+
+    def get_outbox_backlog(self, kinds: Optional[Sequence[str]] = None) -> dict:
+        """Number of due outbox emails of the given kinds (default all) and when the oldest was queued"""
+        session = self.SessionLocal()
+        try:
+            from ..models.database_models import EmailOutbox
+            query = session.query(func.count(EmailOutbox.id), func.min(EmailOutbox.created_at)).filter(
+                EmailOutbox.status.in_(("pending", "sending")),
+                EmailOutbox.next_attempt_at <= datetime.utcnow()
+            )
+            if kinds is not None:
+                query = query.filter(EmailOutbox.kind.in_(kinds))
+            count, oldest = query.one()
+            return {"count": count, "oldest": oldest}
+        finally:
+            session.close()
+
+    def complete_outbox_email(self, email_id: int, sent: bool, error: Optional[str] = None,
+                              retry_at: Optional[datetime] = None) -> None:
+        """Record the outcome of a send: sent, retry at retry_at, or failed for good when retry_at is None"""
+        session = self.SessionLocal()
+        try:
+            from ..models.database_models import EmailOutbox
+            email = session.query(EmailOutbox).filter(EmailOutbox.id == email_id).first()
+            if not email:
+                return
+            if sent:
+                email.status = "sent"
+                email.sent_at = datetime.utcnow()
+                email.last_error = None
+            elif retry_at is not None:
+                email.status = "pending"
+                email.next_attempt_at = retry_at
+                email.last_error = error
+            else:
+                email.status = "failed"
+                email.last_error = error
+            session.commit()
+        finally:
+            session.close()
+
+    def purge_outbox_emails(self, before: datetime) -> int:
+        """Delete sent and failed outbox emails queued before a cutoff; return how many were deleted"""
+        session = self.SessionLocal()
+        try:
+            from ..models.database_models import EmailOutbox
+            deleted = session.query(EmailOutbox).filter(
+                EmailOutbox.status.in_(("sent", "failed")),
+                EmailOutbox.created_at < before
+            ).delete(synchronize_session=False)
+            session.commit()
+            return deleted
+        finally:
+            session.close()
+
+    def queue_pre_arrival_reminders(self, check_in_day: date) -> int:
+        """Queue a reminder for each confirmed booking checking in on check_in_day that has none yet"""
+        session = self.SessionLocal()
+        try:
+            from ..models.database_models import Booking, EmailOutbox
+            start = datetime.combine(check_in_day, datetime.min.time())
+            reminded = session.query(EmailOutbox.booking_id).filter(EmailOutbox.kind == "pre_arrival_reminder")
+            bookings = session.query(Booking).options(
+                joinedload(Booking.guest), joinedload(Booking.room)
+            ).filter(
+                Booking.status == 'confirmed',
+                Booking.check_in_date >= start,
+                Booking.check_in_date < start + timedelta(days=1),
+                ~Booking.id.in_(reminded)
+            ).all()
+            for booking in bookings:
+                self._add_outbox_emails(session, booking, ("pre_arrival_reminder",))
+            session.commit()
+            return len(bookings)
+        finally:
+            session.close()
+
+    def _add_outbox_emails(self, session, booking, kinds: Sequence[str]) -> None:
+        """Queue notification emails for a booking in the caller's session"""
+        if not kinds:
+            return
+        from ..models.database_models import EmailOutbox
+        payload = json.dumps({
+            "booking": self._booking_to_dict(booking),
+            "guest": {
+                "first_name": booking.guest.first_name,
+                "last_name": booking.guest.last_name,
+                "email": booking.guest.email
+            }
+        })
+        for kind in kinds:
+            session.add(EmailOutbox(kind=kind, booking_id=booking.id, payload=payload))
+
+    def _local_user_to_dict(self, user) -> dict:
+        return {
+            "id": user.id,
+            "email": user.email,
+            "password_hash": user.password_hash,
+            "user_metadata": json.loads(user.user_metadata),
+            "created_at": user.created_at.isoformat(),
+            "email_confirmed_at": user.email_confirmed_at.isoformat() if user.email_confirmed_at else None
+        }
+
     def _room_to_dict(self, room) -> dict:
         """Convert Room model to dictionary"""
         return {
@@ -4,18 +4,52 @@ import os
 # Load environment variables from .env file
 load_dotenv()
 
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from .routes import room_routes, guest_routes, booking_routes, customer_routes, ai_routes, auth_routes
 from .database.database import Database
-from .models.database_models import Base
 from .config.settings import settings
+from .services.ai_service import shutdown_ai_service
+from .services.outbox_service import email_outbox
+from .services.email_service import email_service
+from .services.auth_service import auth_backend, token_revocations
+from .services.health_service import health_service
+
+# Database connections are opened on first use, not at import
+db = Database()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Startup and shutdown work, run by the server rather than at import.
+
+    Creates missing tables, then starts the local auth backend's hashing
+    processes, revoked-token syncing and the email outbox worker. On
+    shutdown it releases pooled OpenAI connections, stops the outbox worker
+    (unsent emails stay queued) and closes SMTP sessions, hashing processes,
+    revoked-token syncing and the health probe thread.
+    """
+    from .models.database_models import Base
+    Base.metadata.create_all(bind=db.engine)
+    auth_backend.start()
+    token_revocations.start()
+    email_outbox.start()
+    yield
+    await shutdown_ai_service()
+    email_outbox.stop()
+    email_service.close()
+    auth_backend.close()
+    token_revocations.stop()
+    health_service.close()
 
 # Create FastAPI app
 app = FastAPI(
     title=settings.APP_NAME,
     description=settings.APP_DESCRIPTION,
-    version=settings.APP_VERSION
+    version=settings.APP_VERSION,
+    lifespan=lifespan
 )
 
 # Add CORS middleware
@@ -27,10 +61,6 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize database
-db = Database()
-Base.metadata.create_all(bind=db.engine)
-
 # Include routers
 app.include_router(auth_routes.router)
 app.include_router(room_routes.router)
@@ -52,30 +82,35 @@ def read_root():
             "bookings": "/bookings",
             "customer": "/customer",
             "ai": "/ai",
+            "health": "/health/ready",
             "documentation": "/docs"
         }
     }
 
+@app.get("/health/live")
+async def liveness_check():
+    """Liveness probe: the process is up; constant time, no database access"""
+    return health_service.live()
+
+@app.get("/health/ready")
+def readiness_check():
+    """Readiness probe: SELECT 1 with a timeout, pool saturation, caches, outbox backlog and LLM breaker; 503 when not ready"""
+    ready, details = health_service.ready()
+    return JSONResponse(details, status_code=200 if ready else 503)
+
 @app.get("/health")
 def health_check():
-    """Health check endpoint for Docker and monitoring"""
-    try:
-        # Test database connection
-        db.get_all_rooms()
-        return {
-            "status": "healthy",
-            "service": settings.APP_NAME,
-            "version": settings.APP_VERSION,
-            "database": "connected"
-        }
-    except Exception as e:
-        return {
-            "status": "unhealthy",
-            "service": settings.APP_NAME,
-            "version": settings.APP_VERSION,
-            "database": "disconnected",
-            "error": str(e)
-        }
+    """Health check endpoint for Docker and monitoring; the readiness check in the original response format"""
+    ready, details = health_service.ready()
+    body = {
+        "status": "healthy" if ready else "unhealthy",
+        "service": settings.APP_NAME,
+        "version": settings.APP_VERSION,
+        "database": "connected" if ready else "disconnected"
+    }
+    if not ready:
+        body["error"] = details["database"].get("error", details["database"]["status"])
+    return JSONResponse(body, status_code=200 if ready else 503)
 
 # Run the application
 if __name__ == "__main__":
@@ -0,0 +1,61 @@
+from pydantic import BaseModel, EmailStr, Field, model_validator
+from typing import Dict, List, Literal, Optional
+from datetime import date
+
+RoomType = Literal["Single", "Double", "Suite", "Deluxe", "Presidential"]
+
+class CheckAvailabilityArgs(BaseModel):
+    """Arguments of the check_availability tool"""
+    check_in: date = Field(description="Check-in date (YYYY-MM-DD)")
+    check_out: date = Field(description="Check-out date (YYYY-MM-DD)")
+    room_type: Optional[RoomType] = Field(None, description="Only report this room type")
+
+    @model_validator(mode="after")
+    def check_dates(self):
+        if self.check_out <= self.check_in:
+            raise ValueError("Check-out date must be after check-in date")
+        return self
+
+class BookRoomArgs(CheckAvailabilityArgs):
+    """Arguments of the book_room tool"""
+    guest_name: str = Field(description="Guest's first and last name")
+    email: EmailStr = Field(description="Guest's email address")
+    phone: str = Field(description="Guest's phone number")
+    room_type: RoomType = Field(description="Room type to book")
+
+class CancelBookingArgs(BaseModel):
+    """Arguments of the cancel_booking tool"""
+    booking_id: Optional[int] = Field(None, description="Booking ID, if the guest has it")
+    email: Optional[EmailStr] = Field(None, description="Email address the booking was made with")
+
+    @model_validator(mode="after")
+    def check_reference(self):
+        if self.booking_id is None and self.email is None:
+            raise ValueError("Please provide either booking ID or email address")
+        return self
+
+TOOL_ARGS = {
+    "check_availability": CheckAvailabilityArgs,
+    "book_room": BookRoomArgs,
+    "cancel_booking": CancelBookingArgs,
+}
+
+TOOL_DESCRIPTIONS = {
+    "check_availability": "List the rooms free for a date range, optionally for one room type.",
+    "book_room": "Book a room as soon as the guest has given every detail. Do not ask for confirmation.",
+    "cancel_booking": "Cancel a booking by booking ID, or the most recent booking for an email address.",
+}
+
+def tool_schemas() -> List[Dict]:
+    """OpenAI tool definitions generated from the argument models"""
+    return [
+        {
+            "type": "function",
+            "function": {
+                "name": name,
+                "description": TOOL_DESCRIPTIONS[name],
+                "parameters": model.model_json_schema()
+            }
+        }
+        for name, model in TOOL_ARGS.items()
+    ]
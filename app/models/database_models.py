@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, ForeignKey, Index, Text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -48,4 +48,75 @@ class Booking(Base):
     
     # Relationships
     guest = relationship("Guest", back_populates="bookings")
-    room = relationship("Room", back_populates="bookings") 
\ No newline at end of file
+    room = relationship("Room", back_populates="bookings")
+
+class ChatSession(Base):
+    """SQLAlchemy model for persisted AI reception chat sessions"""
+    __tablename__ = 'chat_sessions'
+    
+    id = Column(String, primary_key=True)
+    data = Column(Text, nullable=False)  # JSON: history, summary, booking slots
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, index=True)
+
+class AICall(Base):
+    """SQLAlchemy model for the append-only log of AI reception calls"""
+    __tablename__ = 'ai_calls'
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+    endpoint = Column(String, nullable=False)  # chat, stream, summary
+    source = Column(String, nullable=False)  # model, cache, fast_path
+    model = Column(String, nullable=True)
+    outcome = Column(String, nullable=False)  # answered, booked, cancelled, fallback
+    prompt_tokens = Column(Integer, default=0, nullable=False)
+    completion_tokens = Column(Integer, default=0, nullable=False)
+    latency_ms = Column(Float, nullable=False)
+    cost_usd = Column(Float, default=0.0, nullable=False)
+
+class EmailOutbox(Base):
+    """SQLAlchemy model for notification emails waiting to be sent by the outbox worker"""
+    __tablename__ = 'email_outbox'
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    kind = Column(String, nullable=False)  # booking_confirmation, cancellation_confirmation, admin_*
+    booking_id = Column(Integer, nullable=True)  # no foreign key: cancelled bookings are deleted
+    payload = Column(Text, nullable=False)  # JSON: booking and guest snapshot
+    status = Column(String, default="pending", nullable=False)  # pending, sending, sent, failed
+    attempts = Column(Integer, default=0, nullable=False)
+    next_attempt_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    sent_at = Column(DateTime, nullable=True)
+    
+    # Due emails are found by status and next_attempt_at; sent and failed rows stay out of the scan
+    __table_args__ = (Index("ix_email_outbox_status_next_attempt", "status", "next_attempt_at"),)
+
+class DirectoryUser(Base):
+    """SQLAlchemy model for the local copy of auth provider users, for indexed email lookups"""
+    __tablename__ = 'user_directory'
+    
+    id = Column(String, primary_key=True)  # auth provider user id
+    email = Column(String, unique=True, nullable=False)  # lowercased
+    role = Column(String, default="user", nullable=False)
+    created_at = Column(String, nullable=True)  # as reported by the provider
+    synced_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+class LocalUser(Base):
+    """SQLAlchemy model for users of the local auth backend"""
+    __tablename__ = 'local_users'
+    
+    id = Column(String, primary_key=True)  # uuid4
+    email = Column(String, unique=True, nullable=False)  # lowercased
+    password_hash = Column(String, nullable=False)  # bcrypt
+    user_metadata = Column(Text, nullable=False)  # JSON: first_name, last_name, phone, role
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    email_confirmed_at = Column(DateTime, nullable=True)
+
+class RevokedToken(Base):
+    """SQLAlchemy model for access tokens revoked before they expire, shared by all app workers"""
+    __tablename__ = 'revoked_tokens'
+    
+    jti = Column(String, primary_key=True)  # token id, or hash of tokens issued without one
+    expires_at = Column(DateTime, nullable=False, index=True)
+    revoked_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
@@ -1,43 +1,93 @@
 """
 AI service routes for the Grand Hotel Management System
 """
-from fastapi import APIRouter, HTTPException
+import json
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from typing import List, Optional
 from pydantic import BaseModel
-from ..services.ai_service import AIService
+from ..config.settings import settings
+from ..services.ai_service import get_ai_service
+from ..utils.rate_limit import RateLimiter
 
 router = APIRouter(prefix="/ai", tags=["ai"])
 
-# Initialize AI service lazily to ensure environment variables are loaded
-def get_ai_service():
-    return AIService()
+# Chat turns cost OpenAI tokens: limit each conversation, and each IP across conversations
+chat_rate_limit = RateLimiter("ai_chat", settings.RATE_LIMIT_AI_CHAT,
+                              trust_proxy=settings.RATE_LIMIT_TRUST_PROXY, enabled=settings.RATE_LIMIT_ENABLED)
+chat_ip_rate_limit = RateLimiter("ai_chat_ip", settings.RATE_LIMIT_AI_CHAT_IP, keys=("ip",),
+                                 trust_proxy=settings.RATE_LIMIT_TRUST_PROXY, enabled=settings.RATE_LIMIT_ENABLED)
+session_rate_limit = RateLimiter("ai_sessions", settings.RATE_LIMIT_AI_SESSIONS, keys=("ip",),
+                                 trust_proxy=settings.RATE_LIMIT_TRUST_PROXY, enabled=settings.RATE_LIMIT_ENABLED)
+booking_lookup_rate_limit = RateLimiter("ai_booking_lookup", settings.RATE_LIMIT_AI_BOOKING_LOOKUP, keys=("ip",),
+                                        trust_proxy=settings.RATE_LIMIT_TRUST_PROXY, enabled=settings.RATE_LIMIT_ENABLED)
+
+class AIChatMessage(BaseModel):
+    """Model for a previous message in an AI conversation"""
+    role: str
+    content: str
 
 class AIMessageCreate(BaseModel):
     """Model for AI chat messages"""
     message: str
-    conversation_history: Optional[list] = []
+    session_id: Optional[str] = None
+    conversation_history: Optional[List[AIChatMessage]] = []
 
 class AIBookingLookup(BaseModel):
     """Model for AI booking lookup"""
     email: str
 
-@router.post("/chat", response_model=dict)
-def ai_chat(chat_data: AIMessageCreate):
+def get_chat_context(ai_service, chat_data: AIMessageCreate):
+    """Resolve the chat session (if any) and client-supplied history for a chat request"""
+    session = None
+    if chat_data.session_id:
+        session = ai_service.session_store.get(chat_data.session_id)
+        if session is None:
+            raise HTTPException(status_code=404, detail="Chat session not found or expired")
+    history = [message.dict() for message in chat_data.conversation_history or []]
+    return session, history
+
+@router.post("/sessions", response_model=dict, dependencies=[Depends(session_rate_limit)])
+def create_chat_session():
+    """Start a server-side chat session; later messages only need to send its session_id"""
+    session = get_ai_service().session_store.create()
+    return {
+        "success": True,
+        "session_id": session["session_id"]
+    }
+
+@router.get("/sessions/{session_id}", response_model=dict)
+def get_chat_session(session_id: str):
+    """Get the stored history, summary and booking details of a chat session"""
+    session = get_ai_service().session_store.get(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Chat session not found or expired")
+    return {
+        "success": True,
+        "session": session
+    }
+
+@router.delete("/sessions/{session_id}", response_model=dict)
+def delete_chat_session(session_id: str):
+    """End a chat session and discard its stored history"""
+    if not get_ai_service().session_store.delete(session_id):
+        raise HTTPException(status_code=404, detail="Chat session not found or expired")
+    return {"success": True, "message": "Chat session deleted"}
+
+@router.post("/chat", response_model=dict, dependencies=[Depends(chat_rate_limit), Depends(chat_ip_rate_limit)])
+async def ai_chat(chat_data: AIMessageCreate):
     """Chat with AI reception assistant"""
     ai_service = get_ai_service()
-    
-    if not ai_service.openai_client:
-        return {
-            "success": False,
-            "response": "AI Reception service is currently unavailable. Please contact our human staff for assistance.",
-            "error": "AI service not configured"
-        }
+    session, history = await ai_service.run_blocking(get_chat_context, ai_service, chat_data)
     
     try:
-        response = ai_service.chat_with_ai(
+        response = await ai_service.achat_with_ai(
             chat_data.message, 
-            chat_data.conversation_history
+            history,
+            session
         )
+        if session is not None:
+            response["session_id"] = session["session_id"]
         return response
     except Exception as e:
         return {
@@ -46,6 +96,58 @@ def ai_chat(chat_data: AIMessageCreate):
             "error": str(e)
         }
 
+@router.post("/chat/stream", dependencies=[Depends(chat_rate_limit), Depends(chat_ip_rate_limit)])
+async def ai_chat_stream(chat_data: AIMessageCreate):
+    """
+    Chat with AI reception assistant, streaming the answer as Server-Sent Events
+    
+    - **token** events carry `{"text": ...}` pieces of the answer as they arrive
+    - a final **done** (or **error**) event carries the same payload as `/ai/chat`
+    """
+    ai_service = get_ai_service()
+    session, history = await ai_service.run_blocking(get_chat_context, ai_service, chat_data)
+    
+    async def event_stream():
+        async for event in ai_service.stream_chat_with_ai(
+            chat_data.message,
+            history,
+            session
+        ):
+            name = event.pop("event")
+            if session is not None and name == "done":
+                event["session_id"] = session["session_id"]
+            yield f"event: {name}\ndata: {json.dumps(event)}\n\n"
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/cache-stats", response_model=dict)
+def get_ai_cache_stats():
+    """Get size and hit-rate statistics for the AI response cache"""
+    return {
+        "success": True,
+        "data": get_ai_service().response_cache.stats()
+    }
+
+@router.get("/llm-stats", response_model=dict)
+def get_ai_llm_stats():
+    """Get in-flight calls, queue depth and circuit breaker state for OpenAI calls"""
+    return {
+        "success": True,
+        "data": get_ai_service().llm_guard.stats()
+    }
+
+@router.get("/metrics", response_model=dict)
+def get_ai_metrics(days: int = Query(7, ge=1, le=90)):
+    """Get call counts, token usage, spend per day and p50/p95 latency of AI chat calls"""
+    return {
+        "success": True,
+        "data": get_ai_service().usage_recorder.summary(days)
+    }
+
 @router.get("/hotel-status", response_model=dict)
 def get_ai_hotel_status():
     """Get current hotel status for AI context"""
@@ -62,7 +164,7 @@ def get_ai_hotel_status():
             "error": str(e)
         }
 
-@router.post("/booking-lookup", response_model=dict)
+@router.post("/booking-lookup", response_model=dict, dependencies=[Depends(booking_lookup_rate_limit)])
 def ai_booking_lookup(lookup_data: AIBookingLookup):
     """Look up booking information via AI"""
     try:
@@ -4,20 +4,30 @@ AI Reception Service for Grand Hotel Management System
 Provides intelligent chat assistance for hotel bookings and information
 """
 
-from dotenv import load_dotenv
-import os
-
-# Load environment variables at module level
-load_dotenv()
-
-from openai import OpenAI
+import asyncio
+import functools
+import hashlib
 import json
 import re
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+from pydantic import ValidationError
+from ..config.settings import settings
 from ..database.database import Database
+from ..models.ai_tools import TOOL_ARGS, tool_schemas
 from ..services.booking_service import BookingService
 from ..services.guest_service import GuestService
+from ..services.conversation_service import ConversationHistoryManager, TokenCounter
+from ..services.session_service import ChatSessionStore, extract_booking_slots
+from ..services.intent_service import IntentFastPath
+from ..services.knowledge_service import KnowledgeBase
+from ..services.mock_llm_service import LatencyModel, MockCompletionBackend, MockOpenAIClient
+from ..services.usage_service import AIUsageRecorder, MODEL_PRICES
+from ..utils.cache import TTLCache
+from ..utils.llm_guard import CircuitBreaker, LLMCallGuard, LLMUnavailableError
 
 # Hotel Information for AI Context
 HOTEL_CONTEXT = {
@@ -64,85 +74,23 @@ HOTEL_CONTEXT = {
     }
 }
 
-class AIService:
-    """AI-powered reception service for hotel management"""
-    
-    def __init__(self):
-        self.openai_client = None
-        self.db = Database()
-        self.booking_service = BookingService()
-        self.guest_service = GuestService()
-        self.initialize_openai()
-    
-    def get_openai_config(self):
-        """Get OpenAI configuration dynamically from environment variables"""
-        return {
-            "api_key": os.getenv("OPENAI_API_KEY", "your-openai-api-key-here"),
-            "model": os.getenv("OPENAI_MODEL", "gpt-3.5-turbo"),
-            "max_tokens": int(os.getenv("OPENAI_MAX_TOKENS", "500")),
-            "temperature": float(os.getenv("OPENAI_TEMPERATURE", "0.7"))
-        }
-    
-    def initialize_openai(self):
-        """Initialize OpenAI client"""
-        try:
-            config = self.get_openai_config()
-            if config["api_key"] and config["api_key"] != "your-openai-api-key-here":
-                self.openai_client = OpenAI(api_key=config["api_key"])
-                print("✅ OpenAI client initialized successfully")
-            else:
-                print("⚠️  OpenAI API key not configured")
-                self.openai_client = None
-        except Exception as e:
-            print(f"❌ Failed to initialize OpenAI: {e}")
-            self.openai_client = None
-    
-    def get_hotel_data(self) -> Dict:
-        """Get current hotel data for AI context"""
-        try:
-            rooms = self.db.get_all_rooms()
-            available_rooms = self.db.get_available_rooms()
-            bookings = self.db.get_all_bookings()
-            
-            # Calculate occupancy
-            total_rooms = len(rooms)
-            occupied_rooms = total_rooms - len(available_rooms)
-            occupancy_rate = (occupied_rooms / total_rooms * 100) if total_rooms > 0 else 0
-            
-            return {
-                "total_rooms": total_rooms,
-                "available_rooms": len(available_rooms),
-                "occupied_rooms": occupied_rooms,
-                "occupancy_rate": round(occupancy_rate, 1),
-                "room_details": available_rooms,
-                "recent_bookings": len(bookings)
-            }
-        except Exception as e:
-            print(f"Error getting hotel data: {e}")
-            return {"error": "Unable to fetch hotel data"}
-    
-    def create_system_prompt(self) -> str:
-        """Create system prompt with hotel context"""
-        hotel_data = self.get_hotel_data()
-        
-        system_prompt = f"""
+def build_static_system_prompt(tool_calling: bool = False) -> str:
+    """Build the part of the system prompt that only depends on HOTEL_CONTEXT"""
+    system_prompt = f"""
         You are the AI Reception Assistant for {HOTEL_CONTEXT['name']}, a luxury hotel management system.
         
         HOTEL INFORMATION:
         - Name: {HOTEL_CONTEXT['name']}
         - Description: {HOTEL_CONTEXT['description']}
-        - Total Rooms: {hotel_data.get('total_rooms', 'N/A')}
-        - Available Rooms: {hotel_data.get('available_rooms', 'N/A')}
-        - Current Occupancy: {hotel_data.get('occupancy_rate', 'N/A')}%
         
         ROOM TYPES & PRICING:
         """
-        
-        # Add room type information
-        for room_type, details in HOTEL_CONTEXT['room_types'].items():
-            system_prompt += f"\n- {room_type}: {details['description']} (Capacity: {details['capacity']})"
-        
-        system_prompt += f"""
+    
+    # Add room type information
+    for room_type, details in HOTEL_CONTEXT['room_types'].items():
+        system_prompt += f"\n- {room_type}: {details['description']} (Capacity: {details['capacity']})"
+    
+    system_prompt += f"""
         
         HOTEL AMENITIES:
         {', '.join(HOTEL_CONTEXT['amenities'])}
@@ -170,9 +118,28 @@ class AIService:
         - Use the guest's name if they provide it
         - Suggest appropriate room types based on their needs
         - Mention current availability when relevant
+        """
+    
+    if tool_calling:
+        system_prompt += """
+        BOOKING CAPABILITIES:
+        You can DIRECTLY BOOK and CANCEL rooms for guests with your tools:
+        - check_availability: find the rooms free for the guest's dates
+        - book_room: needs guest name (first and last), email, phone, check-in date, check-out date (YYYY-MM-DD) and room type
+        - cancel_booking: needs the booking ID or the email address the booking was made with
+        New guest profiles are created automatically for new email addresses.
         
-        Current real-time hotel status: {hotel_data.get('available_rooms', 0)} rooms available out of {hotel_data.get('total_rooms', 0)} total rooms.
-        
+        IMPORTANT INSTRUCTIONS:
+        - When a guest has provided ALL required booking information, IMMEDIATELY call book_room
+        - If ANY information is missing, ask for it politely before booking
+        - DO NOT ask for confirmation - just book immediately when all data is provided
+        - The booking or cancellation result is shown to the guest automatically, so never make up booking IDs
+        - For cancellations, confirm the cancellation policy (free cancellation up to 24 hours)
+        - Be friendly and helpful throughout the process
+        """
+        return system_prompt
+    
+    system_prompt += f"""
         BOOKING CAPABILITIES:
         You can now DIRECTLY BOOK and CANCEL rooms for guests! Here's how:
         
@@ -210,8 +177,378 @@ class AIService:
         - For cancellations, confirm the cancellation policy (free cancellation up to 24 hours)
         - Be friendly and helpful throughout the process
         """
+    
+    return system_prompt
+
+COMMAND_MARKERS = ("BOOK_ROOM:", "CANCEL_BOOKING:")
+
+UNAVAILABLE_RESPONSE = "I'm sorry, but the AI reception service is currently unavailable. Please contact our human staff for assistance."
+
+ERROR_RESPONSE = "I apologize, but I'm experiencing technical difficulties. Please try again or contact our human staff for immediate assistance."
+
+class CommandStreamFilter:
+    """
+    Incrementally separates BOOK_ROOM / CANCEL_BOOKING commands from streamed text.
+    
+    Text is released as soon as it can no longer be the start of a command;
+    a command is held back until its closing brace arrives and is then
+    returned whole so it can be executed while the rest of the answer streams.
+    """
+    
+    def __init__(self):
+        self.pending = ""
+        self.in_command = False
+        self.visible_text = ""
+    
+    def feed(self, delta: str) -> Tuple[str, List[str]]:
+        """Add a streamed delta; return (text safe to emit, completed commands)"""
+        self.pending += delta
+        emitted = ""
+        commands = []
         
-        return system_prompt
+        while self.pending:
+            if self.in_command:
+                end = self.pending.find("}")
+                if end == -1:
+                    break
+                commands.append(self.pending[:end + 1])
+                self.pending = self.pending[end + 1:]
+                self.in_command = False
+                continue
+            
+            starts = [i for i in (self.pending.find(m) for m in COMMAND_MARKERS) if i != -1]
+            if starts:
+                start = min(starts)
+                emitted += self.pending[:start]
+                self.pending = self.pending[start:]
+                self.in_command = True
+                continue
+            
+            # Hold back a tail that could still grow into a command marker
+            hold = 0
+            for marker in COMMAND_MARKERS:
+                for size in range(min(len(marker) - 1, len(self.pending)), 0, -1):
+                    if self.pending.endswith(marker[:size]):
+                        hold = max(hold, size)
+                        break
+            emitted += self.pending[:len(self.pending) - hold]
+            self.pending = self.pending[len(self.pending) - hold:]
+            break
+        
+        self.visible_text += emitted
+        return emitted, commands
+    
+    def flush(self) -> Tuple[str, List[str]]:
+        """Release whatever is left at the end of the stream"""
+        emitted = ""
+        commands = []
+        if self.in_command:
+            # Unterminated command: pass it on so the parser can report it
+            commands.append(self.pending)
+        else:
+            emitted = self.pending
+        self.pending = ""
+        self.in_command = False
+        self.visible_text += emitted
+        return emitted, commands
+
+class AIService:
+    """AI-powered reception service for hotel management"""
+    
+    def __init__(self):
+        self._openai_client = None
+        self._http_client = None
+        self._async_openai_client = None
+        self._async_http_client = None
+        self._mock_backend = None
+        self._client_lock = threading.Lock()
+        self.status_cache = TTLCache(maxsize=1, ttl=settings.AI_STATUS_CACHE_TTL)
+        self.openai_config = self.get_openai_config()
+        self.static_system_prompt = build_static_system_prompt(self.openai_config["tool_calling"])
+        self.tools = tool_schemas() if self.openai_config["tool_calling"] else None
+        self.db = Database()
+        self.booking_service = BookingService()
+        self.guest_service = GuestService()
+        self.token_counter = TokenCounter(self.openai_config["model"])
+        self.history_manager = ConversationHistoryManager(
+            self.token_counter,
+            self.summarize_turns,
+            token_budget=self.openai_config["history_token_budget"]
+        )
+        self.session_store = ChatSessionStore(
+            maxsize=settings.AI_SESSION_MAX,
+            ttl=settings.AI_SESSION_TTL,
+            persist=settings.AI_SESSION_PERSIST,
+            db=self.db
+        )
+        self.fast_path = IntentFastPath(HOTEL_CONTEXT, self.db.get_available_rooms_for_dates)
+        self.knowledge_base = KnowledgeBase(
+            directories=[d.strip() for d in settings.AI_KNOWLEDGE_DIRS.split(",") if d.strip()],
+            index_path=settings.AI_KNOWLEDGE_INDEX_PATH,
+            top_k=settings.AI_KNOWLEDGE_TOP_K,
+            min_score=settings.AI_KNOWLEDGE_MIN_SCORE
+        )
+        self.response_cache = TTLCache(
+            maxsize=settings.AI_RESPONSE_CACHE_SIZE,
+            ttl=settings.AI_RESPONSE_CACHE_TTL
+        )
+        self.db_executor = ThreadPoolExecutor(
+            max_workers=settings.AI_DB_WORKERS,
+            thread_name_prefix="ai-db"
+        )
+        self.llm_guard = LLMCallGuard(
+            max_concurrency=settings.AI_LLM_MAX_CONCURRENCY,
+            max_queue=settings.AI_LLM_MAX_QUEUE,
+            queue_timeout=settings.AI_LLM_QUEUE_TIMEOUT,
+            call_timeout=settings.AI_LLM_CALL_TIMEOUT,
+            breaker=CircuitBreaker(
+                failure_threshold=settings.AI_BREAKER_FAILURE_THRESHOLD,
+                reset_timeout=settings.AI_BREAKER_RESET_TIMEOUT
+            ),
+            timeout_exceptions=self.timeout_exceptions(),
+            connection_exceptions=self.connection_exceptions()
+        )
+        self.usage_recorder = AIUsageRecorder(
+            db=self.db,
+            batch_size=settings.AI_METRICS_BATCH_SIZE,
+            flush_interval=settings.AI_METRICS_FLUSH_INTERVAL,
+            enabled=settings.AI_METRICS_ENABLED,
+            prices=self.get_model_prices(),
+            retention_days=settings.AI_METRICS_RETENTION_DAYS
+        )
+    
+    def timeout_exceptions(self) -> Tuple[type, ...]:
+        """Exceptions the LLM guard counts as timeouts; the openai SDK is only imported when it is the backend"""
+        if self.openai_config["backend"] == "mock":
+            return (TimeoutError,)
+        from openai import APITimeoutError
+        return (APITimeoutError, TimeoutError)
+    
+    def connection_exceptions(self) -> Tuple[type, ...]:
+        """Exceptions the LLM guard counts as the provider being unreachable"""
+        if self.openai_config["backend"] == "mock":
+            return (ConnectionError,)
+        from openai import APIConnectionError
+        return (APIConnectionError, ConnectionError)
+    
+    def get_openai_config(self):
+        """Get OpenAI configuration dynamically from environment variables"""
+        return {
+            "backend": settings.AI_BACKEND.lower(),
+            "tool_calling": settings.AI_TOOL_CALLING,
+            "api_key": settings.OPENAI_API_KEY,
+            "model": settings.OPENAI_MODEL,
+            "max_tokens": settings.OPENAI_MAX_TOKENS,
+            "temperature": settings.OPENAI_TEMPERATURE,
+            "timeout": settings.OPENAI_TIMEOUT,
+            "connect_timeout": settings.OPENAI_CONNECT_TIMEOUT,
+            "max_retries": settings.OPENAI_MAX_RETRIES,
+            "max_connections": settings.OPENAI_MAX_CONNECTIONS,
+            "max_keepalive_connections": settings.OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+            "history_token_budget": settings.AI_HISTORY_TOKEN_BUDGET,
+            "summary_max_tokens": settings.AI_SUMMARY_MAX_TOKENS,
+            "debug": settings.DEBUG
+        }
+    
+    def get_model_prices(self) -> Dict:
+        """Token prices per model, with AI_PRICE_* overriding the configured model's"""
+        prices = dict(MODEL_PRICES)
+        prompt_price = settings.AI_PRICE_PROMPT_PER_1M
+        completion_price = settings.AI_PRICE_COMPLETION_PER_1M
+        if prompt_price or completion_price:
+            default_prompt, default_completion = prices.get(self.openai_config["model"], (0.0, 0.0))
+            prices[self.openai_config["model"]] = (
+                float(prompt_price) if prompt_price else default_prompt,
+                float(completion_price) if completion_price else default_completion
+            )
+        return prices
+    
+    def is_openai_configured(self) -> bool:
+        """Check whether an OpenAI API key has been provided, or the mock backend is selected"""
+        if self.openai_config["backend"] == "mock":
+            return True
+        api_key = self.openai_config["api_key"]
+        return bool(api_key) and api_key != "your-openai-api-key-here"
+    
+    @property
+    def openai_client(self):
+        """OpenAI client, created on first use and reused for the life of the service"""
+        if self._openai_client is None and self.is_openai_configured():
+            with self._client_lock:
+                if self._openai_client is None:
+                    self.initialize_openai()
+        return self._openai_client
+    
+    @property
+    def async_openai_client(self):
+        """Async OpenAI client used for streaming, created on first use"""
+        if self._async_openai_client is None and self.is_openai_configured():
+            with self._client_lock:
+                if self._async_openai_client is None and self.openai_config["backend"] == "mock":
+                    self._async_openai_client = MockOpenAIClient(self.get_mock_backend(), is_async=True)
+                elif self._async_openai_client is None:
+                    import httpx
+                    from openai import AsyncOpenAI
+                    config = self.openai_config
+                    self._async_http_client = httpx.AsyncClient(
+                        timeout=httpx.Timeout(config["timeout"], connect=config["connect_timeout"]),
+                        limits=httpx.Limits(
+                            max_connections=config["max_connections"],
+                            max_keepalive_connections=config["max_keepalive_connections"]
+                        )
+                    )
+                    self._async_openai_client = AsyncOpenAI(
+                        api_key=config["api_key"],
+                        max_retries=config["max_retries"],
+                        http_client=self._async_http_client
+                    )
+        return self._async_openai_client
+    
+    def initialize_openai(self):
+        """Initialize OpenAI client with a pooled keep-alive HTTP client"""
+        config = self.openai_config
+        try:
+            if not self.is_openai_configured():
+                print("⚠️  OpenAI API key not configured")
+                return
+            
+            if config["backend"] == "mock":
+                self._openai_client = MockOpenAIClient(self.get_mock_backend())
+                print("🧪 Using local mock completion backend")
+                return
+            
+            import httpx
+            from openai import OpenAI
+            self._http_client = httpx.Client(
+                timeout=httpx.Timeout(config["timeout"], connect=config["connect_timeout"]),
+                limits=httpx.Limits(
+                    max_connections=config["max_connections"],
+                    max_keepalive_connections=config["max_keepalive_connections"]
+                )
+            )
+            self._openai_client = OpenAI(
+                api_key=config["api_key"],
+                max_retries=config["max_retries"],
+                http_client=self._http_client
+            )
+            print("✅ OpenAI client initialized successfully")
+        except Exception as e:
+            print(f"❌ Failed to initialize OpenAI: {e}")
+            self._openai_client = None
+    
+    def get_mock_backend(self) -> MockCompletionBackend:
+        """Shared mock completion backend, configured from AI_MOCK_* environment variables"""
+        if self._mock_backend is None:
+            seed = settings.AI_MOCK_SEED
+            script_path = settings.AI_MOCK_SCRIPT
+            self._mock_backend = MockCompletionBackend(
+                LatencyModel(
+                    distribution=settings.AI_MOCK_LATENCY_DISTRIBUTION,
+                    median_ms=settings.AI_MOCK_LATENCY_MS,
+                    spread=settings.AI_MOCK_LATENCY_SPREAD,
+                    seed=int(seed) if seed else None
+                ),
+                tokens_per_second=settings.AI_MOCK_TOKENS_PER_SECOND,
+                script=MockCompletionBackend.load_script(script_path) if script_path else None,
+                room_types=HOTEL_CONTEXT["room_types"]
+            )
+        return self._mock_backend
+    
+    async def close(self):
+        """Release pooled HTTP connections held by the OpenAI clients"""
+        if self._http_client is not None:
+            self._http_client.close()
+        if self._async_http_client is not None:
+            await self._async_http_client.aclose()
+        self._http_client = None
+        self._openai_client = None
+        self._async_http_client = None
+        self._async_openai_client = None
+        self.db_executor.shutdown(wait=False)
+        self.usage_recorder.close()
+    
+    async def run_blocking(self, func: Callable, *args) -> Any:
+        """Run blocking database or parsing work on the dedicated AI executor"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.db_executor, functools.partial(func, *args))
+    
+    def get_hotel_status(self) -> Dict:
+        """Get cached room and booking counters for the live-status part of the prompt"""
+        # Local writes bump the data version, so they show up immediately
+        key = ("hotel_status", self.db.get_data_version())
+        hotel_status = self.status_cache.get(key)
+        if hotel_status is None:
+            hotel_status = self._load_hotel_status()
+            if "error" not in hotel_status:
+                self.status_cache.set(key, hotel_status)
+        return hotel_status
+    
+    def get_hotel_data_version(self) -> str:
+        """Version of the hotel data the AI answers depend on"""
+        hotel_status = self.get_hotel_status()
+        return (f"{self.db.get_data_version()}:{hotel_status.get('total_rooms')}:"
+                f"{hotel_status.get('available_rooms')}:{hotel_status.get('recent_bookings')}")
+    
+    def _load_hotel_status(self) -> Dict:
+        """Load room and booking counters from the database"""
+        try:
+            counts = self.db.get_hotel_counts()
+            
+            # Calculate occupancy
+            total_rooms = counts["total_rooms"]
+            occupied_rooms = total_rooms - counts["available_rooms"]
+            occupancy_rate = (occupied_rooms / total_rooms * 100) if total_rooms > 0 else 0
+            
+            return {
+                "total_rooms": total_rooms,
+                "available_rooms": counts["available_rooms"],
+                "occupied_rooms": occupied_rooms,
+                "occupancy_rate": round(occupancy_rate, 1),
+                "recent_bookings": counts["total_bookings"]
+            }
+        except Exception as e:
+            print(f"Error getting hotel data: {e}")
+            return {"error": "Unable to fetch hotel data"}
+    
+    def get_hotel_data(self) -> Dict:
+        """Get current hotel data for AI context"""
+        hotel_data = dict(self.get_hotel_status())
+        if "error" in hotel_data:
+            return hotel_data
+        try:
+            hotel_data["room_details"] = self.db.get_available_rooms()
+            return hotel_data
+        except Exception as e:
+            print(f"Error getting hotel data: {e}")
+            return {"error": "Unable to fetch hotel data"}
+    
+    def create_system_prompt(self, user_message: str = "") -> str:
+        """Create system prompt with hotel context and the knowledge relevant to the guest message"""
+        return self.static_system_prompt + self.create_status_prompt() + self.create_knowledge_prompt(user_message)
+    
+    def create_knowledge_prompt(self, user_message: str) -> str:
+        """Create the fragment with the top knowledge base passages for a guest message"""
+        if not user_message:
+            return ""
+        try:
+            return self.knowledge_base.create_prompt(user_message)
+        except Exception as e:
+            print(f"Error searching hotel knowledge base: {e}")
+            return ""
+    
+    def create_status_prompt(self) -> str:
+        """Create the live-status fragment appended to the static system prompt"""
+        hotel_data = self.get_hotel_status()
+        
+        return f"""
+        
+        CURRENT HOTEL STATUS:
+        - Total Rooms: {hotel_data.get('total_rooms', 'N/A')}
+        - Available Rooms: {hotel_data.get('available_rooms', 'N/A')}
+        - Current Occupancy: {hotel_data.get('occupancy_rate', 'N/A')}%
+        
+        Current real-time hotel status: {hotel_data.get('available_rooms', 0)} rooms available out of {hotel_data.get('total_rooms', 0)} total rooms.
+        """
     
     def get_room_recommendations(self, guest_requirements: str) -> List[Dict]:
         """Get room recommendations based on guest requirements"""
@@ -258,6 +595,8 @@ class AIService:
     
     def parse_booking_request(self, ai_response: str) -> Dict:
         """Parse booking request from AI response"""
+        if "BOOK_ROOM" not in ai_response:
+            return {"found": False}
         # More flexible pattern to handle line breaks and quoted strings
         booking_pattern = r"BOOK_ROOM:\s*\{([^}]+)\}"
         match = re.search(booking_pattern, ai_response, re.DOTALL | re.MULTILINE)
@@ -307,6 +646,8 @@ class AIService:
     
     def parse_cancellation_request(self, ai_response: str) -> Dict:
         """Parse cancellation request from AI response"""
+        if "CANCEL_BOOKING" not in ai_response:
+            return {"found": False}
         cancel_pattern = r"CANCEL_BOOKING:\s*\{([^}]+)\}"
         match = re.search(cancel_pattern, ai_response, re.DOTALL | re.MULTILINE)
         
@@ -349,18 +690,14 @@ class AIService:
             if check_in_date < datetime.now().date():
                 return {"success": False, "error": "Check-in date cannot be in the past"}
             
-            # Get available rooms for the date range
-            availability = self.booking_service.check_room_availability(
+            # Find a room of the requested type that is free for the date range
+            available_rooms = self.db.get_available_rooms_for_dates(
                 booking_data['check_in'], 
                 booking_data['check_out']
             )
-            
-            # Find a room of the requested type
-            available_rooms = self.db.get_available_rooms()
             suitable_room = None
             for room in available_rooms:
-                if (room['room_type'].lower() == booking_data['room_type'].lower() and 
-                    room['id'] in availability['available_rooms']):
+                if room['room_type'].lower() == booking_data['room_type'].lower():
                     suitable_room = room
                     break
             
@@ -454,119 +791,600 @@ class AIService:
             print(f"Error processing AI cancellation: {e}")
             return {"success": False, "error": f"Cancellation failed: {str(e)}"}
 
-    def chat_with_ai(self, user_message: str, conversation_history: List[Dict] = None) -> Dict:
-        """Chat with AI reception assistant"""
+    def prepare_history(self, conversation_history: List[Dict] = None,
+                        session: Optional[Dict] = None) -> Tuple[List[Dict], Optional[str]]:
+        """Return (recent history within the token budget, summary of older turns)"""
+        if session is None:
+            return self.history_manager.prepare(conversation_history)
+        
+        # Sessions only keep the recent window; older turns live on in the summary
+        session["summary"], session["history"] = self.history_manager.compact(
+            session["summary"], session["history"]
+        )
+        return session["history"], session["summary"] or None
+    
+    def build_messages(self, user_message: str, conversation_history: List[Dict] = None,
+                       session: Optional[Dict] = None) -> List[Dict]:
+        """Build the OpenAI message list for a chat turn"""
+        # Keep recent history within the token budget, summarizing older turns
+        recent_history, summary = self.prepare_history(conversation_history, session)
+        return self.assemble_messages(user_message, self.create_system_prompt(user_message), recent_history, summary, session)
+    
+    def assemble_messages(self, user_message: str, system_prompt: str, recent_history: List[Dict],
+                          summary: Optional[str], session: Optional[Dict] = None) -> List[Dict]:
+        """Put together the OpenAI message list from already prepared parts"""
+        messages = [
+            {"role": "system", "content": system_prompt}
+        ]
+        
+        if summary:
+            messages.append({"role": "system", "content": f"Summary of the earlier conversation: {summary}"})
+        
+        if session and session["slots"]:
+            details = ", ".join(f"{key}: {value}" for key, value in session["slots"].items())
+            messages.append({"role": "system", "content": f"Booking details the guest has provided so far: {details}"})
+        
+        # Add conversation history
+        messages.extend(recent_history)
         
+        # Add current user message
+        messages.append({"role": "user", "content": user_message})
+        return messages
+    
+    def record_session_turn(self, session: Optional[Dict], user_message: str, ai_response: str):
+        """Append a completed turn to a chat session and update its booking details"""
+        if session is None:
+            return
+        session["history"].append({"role": "user", "content": user_message})
+        session["history"].append({"role": "assistant", "content": ai_response})
+        session["slots"].update(extract_booking_slots(user_message, HOTEL_CONTEXT["room_types"]))
+        self.session_store.save(session)
+    
+    def summarize_turns(self, previous_summary: str, turns: List[Dict]) -> str:
+        """Fold conversation turns into a running summary"""
+        transcript = "\n".join(f"{msg['role']}: {msg['content']}" for msg in turns)
+        
+        # Without a model, keep the most recent text that fits the summary size
+        fallback = f"{previous_summary} {transcript}".strip()[-self.openai_config["summary_max_tokens"] * 4:]
         if not self.openai_client:
-            return {
-                "response": "I'm sorry, but the AI reception service is currently unavailable. Please contact our human staff for assistance.",
-                "success": False,
-                "error": "OpenAI not configured"
-            }
+            return fallback
+        
+        started = time.perf_counter()
+        try:
+            with self.llm_guard.slot():
+                response = self.openai_client.chat.completions.create(
+                    model=self.openai_config["model"],
+                    messages=[
+                        {"role": "system", "content": (
+                            "Summarize this hotel reception conversation for the assistant's memory. "
+                            "Keep guest names, emails, phone numbers, dates, room preferences, "
+                            "booking IDs and open requests. Be brief."
+                        )},
+                        {"role": "user", "content": f"Existing summary:\n{previous_summary or 'None'}\n\nNew turns:\n{transcript}"}
+                    ],
+                    max_tokens=self.openai_config["summary_max_tokens"],
+                    temperature=0,
+                    timeout=self.llm_guard.call_timeout
+                )
+            self.record_call({"success": True, "usage": self.get_usage(response.usage)}, started, "summary")
+            return response.choices[0].message.content.strip()
+        except Exception as e:
+            print(f"Error summarizing conversation, keeping recent text instead: {e}")
+            self.record_call({"success": False}, started, "summary")
+            return fallback
+    
+    def get_usage(self, usage) -> Dict:
+        """Convert an OpenAI usage object to a plain dict"""
+        if usage is None:
+            return {}
+        return {
+            "prompt_tokens": usage.prompt_tokens,
+            "completion_tokens": usage.completion_tokens,
+            "total_tokens": usage.total_tokens
+        }
+    
+    def failed_result(self, error) -> Dict:
+        """Result for a chat turn the model did not answer: error is a reason string or the exception raised"""
+        if isinstance(error, LLMUnavailableError):
+            response, error = UNAVAILABLE_RESPONSE, f"AI service unavailable ({error.reason})"
+        elif isinstance(error, Exception):
+            response, error = ERROR_RESPONSE, str(error) or error.__class__.__name__
+        else:
+            response = UNAVAILABLE_RESPONSE
+        return {"response": response, "success": False, "error": error}
+    
+    def record_call(self, result: Dict, started: float, endpoint: str = "chat") -> Dict:
+        """Add a finished call to the usage log and return its result unchanged"""
+        if result.get("cached"):
+            source = "cache"
+        elif result.get("model_used") == "fast-path":
+            source = "fast_path"
+        else:
+            source = "model"
+        
+        if not result.get("success"):
+            outcome = "fallback"
+        elif result.get("booking_processed"):
+            outcome = "booked"
+        elif result.get("cancellation_processed"):
+            outcome = "cancelled"
+        else:
+            outcome = "answered"
+        
+        usage = result.get("usage") or {}
+        self.usage_recorder.record(
+            endpoint, source, result.get("model_used") or self.openai_config["model"], outcome,
+            usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0),
+            (time.perf_counter() - started) * 1000
+        )
+        return result
+    
+    def format_booking_result(self, booking_result: Dict) -> str:
+        """Format the guest-facing message for a processed booking command"""
+        if not booking_result["success"]:
+            return (f"\n\n❌ **Booking Failed:** {booking_result['error']}\n"
+                    "Please provide the correct information and I'll try again.")
+        
+        message = f"\n\n🎉 **BOOKING CONFIRMED!** 🎉\n"
+        message += f"✅ Booking ID: #{booking_result['booking_id']}\n"
+        message += f"🏨 Room: {booking_result['room_number']} ({booking_result['room_type']})\n"
+        message += f"👤 Guest: {booking_result['guest_name']}\n"
+        message += f"📧 Email: {booking_result['guest_email']}\n"
+        message += f"💰 Total Price: ₹{booking_result['total_price']} for {booking_result['nights']} nights\n"
+        message += f"🎫 Confirmation Number: {booking_result['confirmation_number']}\n"
+        message += f"📧 Confirmation details will be sent to your email.\n"
+        message += f"🌟 Thank you for choosing Grand Hotel!\n\n"
+        message += f"📋 **To View Your Booking:**\n"
+        message += f"• Click 'Management Dashboard' → 'Booking Management' to see all bookings\n"
+        message += f"• Your booking will appear in the system within 30 seconds\n"
+        message += f"• Save your Booking ID #{booking_result['booking_id']} for future reference\n"
+        message += f"• Use your email ({booking_result['guest_email']}) to manage bookings"
+        return message
+    
+    def format_cancellation_result(self, cancel_result: Dict) -> str:
+        """Format the guest-facing message for a processed cancellation command"""
+        if not cancel_result["success"]:
+            return (f"\n\n❌ **Cancellation Failed:** {cancel_result['error']}\n"
+                    "Please check your booking details and try again.")
+        
+        message = f"\n\n✅ **BOOKING CANCELLED!** ✅\n"
+        message += f"🆔 Booking ID: #{cancel_result['booking_id']}\n"
+        message += f"🏨 Room: {cancel_result['room_number']}\n"
+        message += f"👤 Guest: {cancel_result['guest_name']}\n"
+        message += f"📧 Cancellation confirmation will be sent to your email.\n"
+        message += f"💙 We hope to serve you again in the future!"
+        return message
+    
+    def run_tool(self, name: str, arguments: str) -> Tuple[str, str]:
+        """Validate and execute a tool call; return (kind, guest-facing message)"""
+        kind = {"book_room": "booking", "cancel_booking": "cancellation"}.get(name, "availability")
+        args_model = TOOL_ARGS.get(name)
+        if args_model is None:
+            print(f"⚠️  Ignoring unknown tool call: {name}")
+            return "unknown", ""
         
         try:
-            # Prepare conversation history
-            if conversation_history is None:
-                conversation_history = []
-            
-            # Create messages for OpenAI
-            messages = [
-                {"role": "system", "content": self.create_system_prompt()}
-            ]
-            
-            # Add conversation history
-            for msg in conversation_history[-10:]:  # Keep last 10 messages for context
-                messages.append(msg)
-            
-            # Add current user message
-            messages.append({"role": "user", "content": user_message})
-            
-            # Get AI response
-            response = self.openai_client.chat.completions.create(
-                model=self.get_openai_config()["model"],
-                messages=messages,
-                max_tokens=self.get_openai_config()["max_tokens"],
-                temperature=self.get_openai_config()["temperature"]
+            args = args_model.model_validate_json(arguments or "{}")
+        except ValidationError as e:
+            error = "; ".join(err["msg"].removeprefix("Value error, ") for err in e.errors())
+            if kind == "booking":
+                return kind, self.format_booking_result({"success": False, "error": error})
+            if kind == "cancellation":
+                return kind, self.format_cancellation_result({"success": False, "error": error})
+            return kind, f"\n\n❌ **Availability check failed:** {error}"
+        
+        if kind == "booking":
+            return kind, self.format_booking_result(self.process_ai_booking(args.model_dump(mode="json")))
+        if kind == "cancellation":
+            cancel_data = args.model_dump(mode="json", exclude_none=True)
+            return kind, self.format_cancellation_result(self.process_ai_cancellation(cancel_data))
+        return kind, self.format_availability(args.check_in.isoformat(), args.check_out.isoformat(), args.room_type)
+    
+    def format_availability(self, check_in: str, check_out: str, room_type: Optional[str] = None) -> str:
+        """Format the rooms free for a date range, grouped by room type"""
+        prices_by_type: Dict[str, List[float]] = {}
+        for room in self.db.get_available_rooms_for_dates(check_in, check_out):
+            if room_type is None or room["room_type"] == room_type:
+                prices_by_type.setdefault(room["room_type"], []).append(room["price_per_night"])
+        
+        message = f"\n\n📅 **Availability {check_in} to {check_out}:**"
+        if not prices_by_type:
+            return message + f"\n• No {room_type + ' ' if room_type else ''}rooms available for these dates"
+        for name, prices in sorted(prices_by_type.items()):
+            message += f"\n• {name}: {len(prices)} available from ₹{min(prices)}/night"
+        return message
+    
+    def wants_recommendations(self, user_message: str) -> bool:
+        """Check if user is asking for room recommendations"""
+        return any(keyword in user_message.lower() for keyword in ['recommend', 'suggest', 'room', 'availability'])
+    
+    def format_recommendations(self, recommendations: List[Dict]) -> str:
+        """Format room recommendations for appending to an AI response"""
+        if not recommendations:
+            return ""
+        
+        message = "\n\n🏨 Based on your requirements, here are my top room recommendations:\n"
+        for i, room in enumerate(recommendations, 1):
+            message += f"\n{i}. Room {room['room_number']} - {room['room_type']}"
+            message += f"\n   • Price: ₹{room['price_per_night']}/night"
+            message += f"\n   • {room['description']}"
+            message += f"\n   • Capacity: {room['capacity']}"
+        return message
+    
+    def response_cache_key(self, user_message: str, conversation_history: List[Dict] = None,
+                           session: Optional[Dict] = None) -> str:
+        """
+        Cache key for an answer: normalized message, the whole conversation so far and hotel data version.
+
+        Every earlier turn is part of the key, not just the last few: two
+        conversations that only differ in an earlier name or date must not
+        share a personalized answer.
+        """
+        if session is not None:
+            history = session["history"]
+            context = {"summary": session["summary"], "slots": session["slots"]}
+        else:
+            history = self.history_manager.sanitize(conversation_history)
+            context = {}
+        normalized = re.sub(r"\s+", " ", user_message.lower()).strip(" ?!.")
+        payload = json.dumps({
+            "message": normalized,
+            "history": history,
+            "context": context,
+            "hotel_version": self.get_hotel_data_version()
+        }, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+    
+    def get_cached_response(self, cache_key: str, user_message: str, session: Optional[Dict] = None) -> Optional[Dict]:
+        """Return a cached answer for this turn, if there is one"""
+        if self.response_cache.ttl <= 0:
+            return None
+        cached = self.response_cache.get(cache_key)
+        if cached is None:
+            return None
+        
+        self.record_session_turn(session, user_message, cached["response"])
+        return {**cached, "timestamp": datetime.now().isoformat(), "cached": True, "usage": {}}
+    
+    def cache_response(self, cache_key: str, result: Dict, raw_response: str):
+        """Cache a successful answer unless it carried out a booking or cancellation"""
+        if self.response_cache.ttl <= 0 or not result.get("success"):
+            return
+        if result.get("booking_processed") or result.get("cancellation_processed"):
+            return
+        if any(marker in raw_response for marker in COMMAND_MARKERS):
+            return
+        self.response_cache.set(cache_key, {
+            key: value for key, value in result.items() if key not in ("timestamp", "usage", "session_id")
+        })
+    
+    def answer_from_fast_path(self, user_message: str, session: Optional[Dict] = None) -> Optional[Dict]:
+        """Answer common questions from hotel data without calling OpenAI"""
+        if not settings.AI_FAST_PATH_ENABLED:
+            return None
+        try:
+            fast_answer = self.fast_path.answer(user_message)
+        except Exception as e:
+            print(f"Error in AI fast path: {e}")
+            return None
+        if fast_answer is None:
+            return None
+        
+        intent, ai_response = fast_answer
+        self.record_session_turn(session, user_message, ai_response)
+        return {
+            "response": ai_response,
+            "success": True,
+            "timestamp": datetime.now().isoformat(),
+            "model_used": "fast-path",
+            "intent": intent,
+            "booking_processed": False,
+            "cancellation_processed": False,
+            "usage": {}
+        }
+    
+    def carry_out_answer(self, message) -> Tuple[str, bool, bool]:
+        """
+        Run the tool calls and text commands in a model answer.
+        
+        Returns (answer with their results, booking processed, cancellation processed).
+        """
+        ai_response = (message.content or "").strip()
+        
+        # Tool calls are executed directly; their results complete the answer
+        tool_kinds = set()
+        for tool_call in getattr(message, "tool_calls", None) or []:
+            kind, result_message = self.run_tool(tool_call.function.name, tool_call.function.arguments)
+            tool_kinds.add(kind)
+            ai_response += result_message
+        ai_response = ai_response.strip()
+        
+        # Check for booking requests in AI response
+        booking_request = self.parse_booking_request(ai_response)
+        if booking_request["found"]:
+            booking_result = self.process_ai_booking(booking_request["data"])
+            
+            # Replace the booking command with the confirmation or error message
+            ai_response = re.sub(r"BOOK_ROOM:\s*\{[^}]+\}", "", ai_response).strip()
+            ai_response += self.format_booking_result(booking_result)
+        
+        # Check for cancellation requests in AI response
+        cancel_request = self.parse_cancellation_request(ai_response)
+        if cancel_request["found"]:
+            cancel_result = self.process_ai_cancellation(cancel_request["data"])
+            
+            # Replace the cancellation command with the confirmation or error message
+            ai_response = re.sub(r"CANCEL_BOOKING:\s*\{[^}]+\}", "", ai_response).strip()
+            ai_response += self.format_cancellation_result(cancel_result)
+        
+        return (
+            ai_response,
+            booking_request.get("found", False) or "booking" in tool_kinds,
+            cancel_request.get("found", False) or "cancellation" in tool_kinds
+        )
+    
+    async def achat_with_ai(self, user_message: str, conversation_history: List[Dict] = None,
+                            session: Optional[Dict] = None) -> Dict:
+        """
+        Chat with AI reception assistant without holding a worker thread.
+        
+        Database work runs on the dedicated AI executor and overlaps with the
+        model call: the status prompt, knowledge passages and history are
+        prepared together, and
+        room recommendations are fetched while the model answers, then dropped
+        if the answer booked or cancelled. With DEBUG on, the result carries
+        per-phase timings in milliseconds.
+        """
+        timings = {}
+        started = mark = time.perf_counter()
+        
+        def lap(phase: str):
+            nonlocal mark
+            now = time.perf_counter()
+            timings[phase] = round((now - mark) * 1000, 2)
+            mark = now
+        
+        def finish(result: Dict) -> Dict:
+            self.record_call(result, started)
+            if self.openai_config["debug"]:
+                timings["total"] = round((time.perf_counter() - started) * 1000, 2)
+                result["timings"] = timings
+            return result
+        
+        fast_response = await self.run_blocking(self.answer_from_fast_path, user_message, session)
+        lap("fast_path")
+        if fast_response:
+            return finish(fast_response)
+        
+        cache_key = await self.run_blocking(self.response_cache_key, user_message, conversation_history, session)
+        cached_response = await self.run_blocking(self.get_cached_response, cache_key, user_message, session)
+        lap("cache")
+        if cached_response:
+            return finish(cached_response)
+        
+        if not self.async_openai_client:
+            return finish(self.failed_result("OpenAI not configured"))
+        
+        # Start recommendations now so they are ready when the model answers
+        recommendations_task = None
+        if self.wants_recommendations(user_message):
+            recommendations_task = asyncio.ensure_future(
+                self.run_blocking(self.get_room_recommendations, user_message))
+        
+        try:
+            status_prompt, knowledge_prompt, (recent_history, summary) = await asyncio.gather(
+                self.run_blocking(self.create_status_prompt),
+                self.run_blocking(self.create_knowledge_prompt, user_message),
+                self.run_blocking(self.prepare_history, conversation_history, session)
             )
+            messages = self.assemble_messages(
+                user_message, self.static_system_prompt + status_prompt + knowledge_prompt,
+                recent_history, summary, session)
+            lap("prepare")
             
-            ai_response = response.choices[0].message.content.strip()
+            async with self.llm_guard.aslot():
+                response = await asyncio.wait_for(
+                    self.async_openai_client.chat.completions.create(
+                        model=self.openai_config["model"],
+                        messages=messages,
+                        max_tokens=self.openai_config["max_tokens"],
+                        temperature=self.openai_config["temperature"],
+                        timeout=self.llm_guard.call_timeout,
+                        **self.tool_options()
+                    ),
+                    timeout=self.llm_guard.call_timeout
+                )
+            lap("model")
             
-            # Check for booking requests in AI response
-            booking_request = self.parse_booking_request(ai_response)
-            if booking_request["found"]:
-                booking_result = self.process_ai_booking(booking_request["data"])
-                
-                if booking_result["success"]:
-                    # Remove the booking command from response and add confirmation
-                    ai_response = re.sub(r"BOOK_ROOM:\s*\{[^}]+\}", "", ai_response).strip()
-                    ai_response += f"\n\n🎉 **BOOKING CONFIRMED!** 🎉\n"
-                    ai_response += f"✅ Booking ID: #{booking_result['booking_id']}\n"
-                    ai_response += f"🏨 Room: {booking_result['room_number']} ({booking_result['room_type']})\n"
-                    ai_response += f"👤 Guest: {booking_result['guest_name']}\n"
-                    ai_response += f"📧 Email: {booking_result['guest_email']}\n"
-                    ai_response += f"💰 Total Price: ₹{booking_result['total_price']} for {booking_result['nights']} nights\n"
-                    ai_response += f"🎫 Confirmation Number: {booking_result['confirmation_number']}\n"
-                    ai_response += f"📧 Confirmation details will be sent to your email.\n"
-                    ai_response += f"🌟 Thank you for choosing Grand Hotel!\n\n"
-                    ai_response += f"📋 **To View Your Booking:**\n"
-                    ai_response += f"• Click 'Management Dashboard' → 'Booking Management' to see all bookings\n"
-                    ai_response += f"• Your booking will appear in the system within 30 seconds\n"
-                    ai_response += f"• Save your Booking ID #{booking_result['booking_id']} for future reference\n"
-                    ai_response += f"• Use your email ({booking_result['guest_email']}) to manage bookings"
-                else:
-                    # Remove the booking command and add error message
-                    ai_response = re.sub(r"BOOK_ROOM:\s*\{[^}]+\}", "", ai_response).strip()
-                    ai_response += f"\n\n❌ **Booking Failed:** {booking_result['error']}\n"
-                    ai_response += "Please provide the correct information and I'll try again."
-            
-            # Check for cancellation requests in AI response
-            cancel_request = self.parse_cancellation_request(ai_response)
-            if cancel_request["found"]:
-                cancel_result = self.process_ai_cancellation(cancel_request["data"])
-                
-                if cancel_result["success"]:
-                    # Remove the cancellation command from response and add confirmation
-                    ai_response = re.sub(r"CANCEL_BOOKING:\s*\{[^}]+\}", "", ai_response).strip()
-                    ai_response += f"\n\n✅ **BOOKING CANCELLED!** ✅\n"
-                    ai_response += f"🆔 Booking ID: #{cancel_result['booking_id']}\n"
-                    ai_response += f"🏨 Room: {cancel_result['room_number']}\n"
-                    ai_response += f"👤 Guest: {cancel_result['guest_name']}\n"
-                    ai_response += f"📧 Cancellation confirmation will be sent to your email.\n"
-                    ai_response += f"💙 We hope to serve you again in the future!"
+            message = response.choices[0].message
+            raw_response = (message.content or "").strip()
+            ai_response, booking_processed, cancellation_processed = await self.run_blocking(
+                self.carry_out_answer, message)
+            lap("actions")
+            
+            if recommendations_task is not None:
+                if booking_processed or cancellation_processed:
+                    recommendations_task.cancel()
                 else:
-                    # Remove the cancellation command and add error message
-                    ai_response = re.sub(r"CANCEL_BOOKING:\s*\{[^}]+\}", "", ai_response).strip()
-                    ai_response += f"\n\n❌ **Cancellation Failed:** {cancel_result['error']}\n"
-                    ai_response += "Please check your booking details and try again."
-            
-            # Check if user is asking for room recommendations
-            if any(keyword in user_message.lower() for keyword in ['recommend', 'suggest', 'room', 'availability']):
-                recommendations = self.get_room_recommendations(user_message)
-                
-                if recommendations:
-                    ai_response += "\n\n🏨 Based on your requirements, here are my top room recommendations:\n"
-                    for i, room in enumerate(recommendations, 1):
-                        ai_response += f"\n{i}. Room {room['room_number']} - {room['room_type']}"
-                        ai_response += f"\n   • Price: ₹{room['price_per_night']}/night"
-                        ai_response += f"\n   • {room['description']}"
-                        ai_response += f"\n   • Capacity: {room['capacity']}"
+                    ai_response += self.format_recommendations(await recommendations_task)
+                lap("recommendations")
             
-            return {
+            await self.run_blocking(self.record_session_turn, session, user_message, ai_response)
+            
+            result = {
                 "response": ai_response,
                 "success": True,
                 "timestamp": datetime.now().isoformat(),
-                "model_used": self.get_openai_config()["model"],
-                "booking_processed": booking_request.get("found", False),
-                "cancellation_processed": cancel_request.get("found", False)
+                "model_used": self.openai_config["model"],
+                "booking_processed": booking_processed,
+                "cancellation_processed": cancellation_processed,
+                "usage": self.get_usage(response.usage)
             }
+            await self.run_blocking(self.cache_response, cache_key, result, raw_response)
+            lap("finish")
+            return finish(result)
             
+        except LLMUnavailableError as e:
+            print(f"⚠️  AI chat refused without calling OpenAI: {e.reason}")
+            return finish(self.failed_result(e))
         except Exception as e:
             print(f"Error in AI chat: {e}")
-            return {
-                "response": "I apologize, but I'm experiencing technical difficulties. Please try again or contact our human staff for immediate assistance.",
-                "success": False,
-                "error": str(e)
+            return finish(self.failed_result(e))
+        finally:
+            if recommendations_task is not None and not recommendations_task.done():
+                recommendations_task.cancel()
+    
+    async def stream_chat_with_ai(self, user_message: str, conversation_history: List[Dict] = None,
+                                  session: Optional[Dict] = None) -> AsyncIterator[Dict]:
+        """
+        Stream a chat turn as events.
+        
+        Yields ``{"event": "token", "text": ...}`` for each visible piece of the
+        answer and a single ``{"event": "done", ...}`` (or ``"error"``) at the
+        end. BOOK_ROOM / CANCEL_BOOKING commands are held back from the token
+        stream and executed as soon as they are complete, so their outcome is
+        ready by the time the final event is sent.
+        """
+        started = time.perf_counter()
+        fast_response = await self.run_blocking(self.answer_from_fast_path, user_message, session)
+        if fast_response:
+            yield {"event": "token", "text": fast_response["response"]}
+            yield {"event": "done", **self.record_call(fast_response, started, "stream")}
+            return
+        
+        cache_key = await self.run_blocking(self.response_cache_key, user_message, conversation_history, session)
+        cached_response = await self.run_blocking(self.get_cached_response, cache_key, user_message, session)
+        if cached_response:
+            yield {"event": "token", "text": cached_response["response"]}
+            yield {"event": "done", **self.record_call(cached_response, started, "stream")}
+            return
+        
+        if not self.async_openai_client:
+            yield self.record_call({"event": "error", **self.failed_result("OpenAI not configured")}, started, "stream")
+            return
+        
+        try:
+            messages = await self.run_blocking(self.build_messages, user_message, conversation_history, session)
+            
+            command_filter = CommandStreamFilter()
+            command_tasks = []
+            tool_calls: Dict[int, Dict] = {}
+            usage = None
+            # The deadline covers the whole stream, not just the wait for each chunk
+            deadline = time.monotonic() + self.llm_guard.call_timeout
+            async with self.llm_guard.aslot():
+                stream = await asyncio.wait_for(
+                    self.async_openai_client.chat.completions.create(
+                        model=self.openai_config["model"],
+                        messages=messages,
+                        max_tokens=self.openai_config["max_tokens"],
+                        temperature=self.openai_config["temperature"],
+                        stream=True,
+                        stream_options={"include_usage": True},
+                        timeout=self.llm_guard.call_timeout,
+                        **self.tool_options()
+                    ),
+                    timeout=max(0.0, deadline - time.monotonic())
+                )
+                chunks = stream.__aiter__()
+                while True:
+                    try:
+                        chunk = await asyncio.wait_for(chunks.__anext__(), timeout=max(0.0, deadline - time.monotonic()))
+                    except StopAsyncIteration:
+                        break
+                    if getattr(chunk, "usage", None) is not None:
+                        usage = chunk.usage
+                    if not chunk.choices:
+                        continue
+                    # Tool call names and arguments arrive in fragments keyed by index
+                    for fragment in getattr(chunk.choices[0].delta, "tool_calls", None) or []:
+                        tool_call = tool_calls.setdefault(fragment.index, {"name": "", "arguments": ""})
+                        if fragment.function and fragment.function.name:
+                            tool_call["name"] += fragment.function.name
+                        if fragment.function and fragment.function.arguments:
+                            tool_call["arguments"] += fragment.function.arguments
+                    delta = chunk.choices[0].delta.content
+                    if not delta:
+                        continue
+                    
+                    text, commands = command_filter.feed(delta)
+                    for command in commands:
+                        command_tasks.append(asyncio.create_task(self._run_command(command)))
+                    if text:
+                        yield {"event": "token", "text": text}
+            
+            text, commands = command_filter.flush()
+            for command in commands:
+                command_tasks.append(asyncio.create_task(self._run_command(command)))
+            for index in sorted(tool_calls):
+                tool_call = tool_calls[index]
+                command_tasks.append(asyncio.create_task(
+                    self.run_blocking(self.run_tool, tool_call["name"], tool_call["arguments"])))
+            if text:
+                yield {"event": "token", "text": text}
+            
+            # Commands have been running while the rest of the answer streamed
+            suffix = ""
+            booking_processed = False
+            cancellation_processed = False
+            for kind, message in await asyncio.gather(*command_tasks):
+                booking_processed = booking_processed or kind == "booking"
+                cancellation_processed = cancellation_processed or kind == "cancellation"
+                suffix += message
+            
+            if self.wants_recommendations(user_message) and not (booking_processed or cancellation_processed):
+                recommendations = await self.run_blocking(self.get_room_recommendations, user_message)
+                suffix += self.format_recommendations(recommendations)
+            
+            if suffix:
+                yield {"event": "token", "text": suffix}
+            
+            ai_response = command_filter.visible_text.strip() + suffix
+            await self.run_blocking(self.record_session_turn, session, user_message, ai_response)
+            
+            result = {
+                "response": ai_response,
+                "success": True,
+                "timestamp": datetime.now().isoformat(),
+                "model_used": self.openai_config["model"],
+                "booking_processed": booking_processed,
+                "cancellation_processed": cancellation_processed,
+                "usage": self.get_usage(usage)
             }
+            # Streamed commands never reach visible_text, so check for them separately
+            if not command_tasks:
+                self.cache_response(cache_key, result, command_filter.visible_text)
+            yield {"event": "done", **self.record_call(result, started, "stream")}
+            
+        except LLMUnavailableError as e:
+            print(f"⚠️  AI chat stream refused without calling OpenAI: {e.reason}")
+            yield self.record_call({"event": "error", **self.failed_result(e)}, started, "stream")
+        except Exception as e:
+            print(f"Error in AI chat stream: {e}")
+            yield self.record_call({"event": "error", **self.failed_result(e)}, started, "stream")
+    
+    def tool_options(self) -> Dict:
+        """Extra completion arguments that offer the booking tools to the model"""
+        if not self.tools:
+            return {}
+        return {"tools": self.tools, "tool_choice": "auto"}
+    
+    async def _run_command(self, command: str):
+        """Parse and execute a single streamed command off the event loop"""
+        if command.startswith("BOOK_ROOM"):
+            booking_request = self.parse_booking_request(command)
+            if not booking_request["found"]:
+                return "booking", self.format_booking_result(
+                    {"success": False, "error": booking_request.get("error", "Invalid booking format")})
+            result = await self.run_blocking(self.process_ai_booking, booking_request["data"])
+            return "booking", self.format_booking_result(result)
+        
+        cancel_request = self.parse_cancellation_request(command)
+        if not cancel_request["found"]:
+            return "cancellation", self.format_cancellation_result(
+                {"success": False, "error": cancel_request.get("error", "Invalid cancellation format")})
+        result = await self.run_blocking(self.process_ai_cancellation, cancel_request["data"])
+        return "cancellation", self.format_cancellation_result(result)
     
     def get_booking_info(self, email: str) -> Dict:
         """Get booking information for a guest"""
@@ -590,5 +1408,26 @@ class AIService:
                 "error": str(e)
             }
 
-# Global AI reception service instance
-ai_reception_service = AIService() 
\ No newline at end of file
+# Global AI reception service instance, created lazily on first request
+_ai_service: Optional[AIService] = None
+_ai_service_lock = threading.Lock()
+
+def get_ai_service() -> AIService:
+    """Return the shared AI reception service, creating it on first use"""
+    global _ai_service
+    if _ai_service is None:
+        with _ai_service_lock:
+            if _ai_service is None:
+                _ai_service = AIService()
+    return _ai_service
+
+def peek_ai_service() -> Optional[AIService]:
+    """Return the shared AI reception service if it has been created, without creating it"""
+    return _ai_service
+
+async def shutdown_ai_service():
+    """Close the shared AI reception service if it was ever created"""
+    global _ai_service
+    if _ai_service is not None:
+        await _ai_service.close()
+        _ai_service = None
@@ -0,0 +1,210 @@
+"""
+Authentication backends for Grand Hotel Management System
+Supabase Auth, or a self-contained user store in the app database
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import threading
+from abc import ABC, abstractmethod
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from typing import List, Optional
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.exc import IntegrityError
+
+from ..config.settings import settings
+from ..database.database import Database
+from ..utils.passwords import hash_password, verify_password
+
+@dataclass
+class AuthUser:
+    """A user as returned by the local backend; mirrors the Supabase user fields the app reads"""
+    id: str
+    email: str
+    user_metadata: dict = field(default_factory=dict)
+    created_at: Optional[str] = None
+    email_confirmed_at: Optional[str] = None
+
+class AuthBackend(ABC):
+    """
+    Where users live and how their passwords are checked.
+
+    AuthService issues and verifies its own JWTs, so a backend only creates
+    users, checks credentials and lists users for the user directory.
+    Users expose id, email, user_metadata, created_at and email_confirmed_at.
+    """
+
+    name = "base"
+
+    @abstractmethod
+    async def create_user(self, email: str, password: str, user_metadata: dict):
+        """Create a user; raises an error mentioning "already exists" if the email is taken"""
+
+    @abstractmethod
+    async def authenticate(self, email: str, password: str):
+        """The user with these credentials, or None"""
+
+    async def get_user(self, token: str):
+        """The user a provider-issued access token belongs to, or None"""
+        return None
+
+    @abstractmethod
+    def list_users(self, page: int, per_page: int) -> List:
+        """One page of users, starting at page 1"""
+
+    def start(self):
+        """Get ready to serve logins, e.g. at application startup"""
+
+    def close(self):
+        """Release resources held by the backend"""
+
+class SupabaseAuthBackend(AuthBackend):
+    """Users in Supabase Auth; the client is created on first use, not at import"""
+
+    name = "supabase"
+
+    def __init__(self, url: str, key: str):
+        self.url = url
+        self.key = key
+        self._client = None
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    from supabase import create_client
+                    self._client = create_client(self.url, self.key)
+        return self._client
+
+    async def create_user(self, email: str, password: str, user_metadata: dict):
+        response = await run_in_threadpool(self.client.auth.admin.create_user, {
+            "email": email,
+            "password": password,
+            "email_confirm": True,
+            "user_metadata": user_metadata
+        })
+        return response.user
+
+    async def authenticate(self, email: str, password: str):
+        response = await run_in_threadpool(self.client.auth.sign_in_with_password, {
+            "email": email,
+            "password": password
+        })
+        return response.user
+
+    async def get_user(self, token: str):
+        response = await run_in_threadpool(self.client.auth.get_user, token)
+        return response.user if response else None
+
+    def list_users(self, page: int, per_page: int) -> List:
+        response = self.client.auth.admin.list_users(page=page, per_page=per_page)
+        return getattr(response, "users", response) or []
+
+class LocalAuthBackend(AuthBackend):
+    """
+    Users in the app database's local_users table, with bcrypt passwords.
+
+    Hashing and verifying take a few hundred milliseconds of CPU each, so
+    they run in a process pool of hash_workers processes rather than on the
+    event loop; when all workers are busy, further logins queue for them.
+    Unknown emails are checked against a dummy hash so they take as long as
+    wrong passwords. The workers are spawned, not forked. Spawning fails
+    when the main script has no if __name__ == "__main__" guard; the backend
+    then hashes on a thread pool of the same size instead (bcrypt releases
+    the GIL, so logins still leave the event loop free).
+    """
+
+    name = "local"
+
+    def __init__(self, db: Optional[Database] = None, hash_workers: int = 2, rounds: int = 12):
+        self.db = db or Database()
+        self.hash_workers = hash_workers
+        self.rounds = rounds
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+        self._dummy_hash: Optional[str] = None
+        self.logger = logging.getLogger(__name__)
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    # spawn, not fork: the app has worker threads running
+                    self._executor = ProcessPoolExecutor(max_workers=self.hash_workers,
+                                                         mp_context=multiprocessing.get_context("spawn"))
+        return self._executor
+
+    def _use_threads(self, error: BaseException):
+        """Replace a process pool that could not start with a thread pool"""
+        with self._lock:
+            if isinstance(self._executor, ThreadPoolExecutor):
+                return
+            self.logger.warning(f"Password hashing processes unavailable ({error!r}); hashing on threads instead")
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = ThreadPoolExecutor(max_workers=self.hash_workers, thread_name_prefix="auth-hash")
+
+    async def _run(self, function, *args):
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self.executor, function, *args)
+        except BrokenProcessPool as e:
+            self._use_threads(e)
+            return await loop.run_in_executor(self.executor, function, *args)
+
+    def _to_user(self, row: dict) -> AuthUser:
+        return AuthUser(id=row["id"], email=row["email"], user_metadata=row["user_metadata"],
+                        created_at=row["created_at"], email_confirmed_at=row["email_confirmed_at"])
+
+    async def create_user(self, email: str, password: str, user_metadata: dict) -> AuthUser:
+        if await run_in_threadpool(self.db.get_local_user, email):
+            raise ValueError("User with this email already exists")
+        password_hash = await self._run(hash_password, password, self.rounds)
+        try:
+            row = await run_in_threadpool(self.db.create_local_user, email, password_hash, user_metadata)
+        except IntegrityError:
+            raise ValueError("User with this email already exists")
+        return self._to_user(row)
+
+    async def authenticate(self, email: str, password: str) -> Optional[AuthUser]:
+        row = await run_in_threadpool(self.db.get_local_user, email)
+        if row is None:
+            if self._dummy_hash is None:
+                self._dummy_hash = await self._run(hash_password, "not-a-password", self.rounds)
+            await self._run(verify_password, password, self._dummy_hash)
+            return None
+        if not await self._run(verify_password, password, row["password_hash"]):
+            return None
+        return self._to_user(row)
+
+    def list_users(self, page: int, per_page: int) -> List[AuthUser]:
+        return [self._to_user(row) for row in self.db.get_local_users((page - 1) * per_page, per_page)]
+
+    def start(self):
+        # Start the hashing processes now so the first login does not wait for them,
+        # and find out here rather than on the first login if they cannot start
+        try:
+            futures = [self.executor.submit(hash_password, "warm-up", 4) for _ in range(self.hash_workers)]
+            for future in futures:
+                future.result()
+        except (BrokenProcessPool, OSError, NotImplementedError) as e:
+            self._use_threads(e)
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+def create_auth_backend() -> AuthBackend:
+    """The backend selected by AUTH_BACKEND"""
+    if settings.AUTH_BACKEND == "local":
+        return LocalAuthBackend(hash_workers=settings.AUTH_HASH_WORKERS, rounds=settings.AUTH_BCRYPT_ROUNDS)
+    if settings.AUTH_BACKEND != "supabase":
+        raise ValueError(f"Unknown AUTH_BACKEND: {settings.AUTH_BACKEND}")
+    return SupabaseAuthBackend(settings.SUPABASE_URL, settings.SUPABASE_ANON_KEY)
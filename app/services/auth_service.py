@@ -1,56 +1,129 @@
-from supabase import create_client, Client
 from fastapi import HTTPException, status, Depends
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from jose import JWTError, jwt
 from datetime import datetime, timedelta
 from typing import Optional
+import hashlib
 import os
+import time
+import uuid
 
 from ..config.settings import settings
+from ..database.database import Database
+from .auth_backends import AuthBackend, create_auth_backend
+from .revocation_service import TokenRevocationService
 from ..models.auth_models import UserRegister, UserLogin, UserResponse, Token, TokenData, UserRole
+from ..utils.cache import TTLCache
 
-# Initialize Supabase client
-supabase: Client = create_client(settings.SUPABASE_URL, settings.SUPABASE_ANON_KEY)
+# Where users live: Supabase Auth or the local users table (AUTH_BACKEND)
+auth_backend: AuthBackend = create_auth_backend()
+
+# Local user directory, for indexed email lookups instead of listing every provider user
+directory_db = Database()
 
 # Security scheme for JWT tokens
 security = HTTPBearer()
 
+# Identity of tokens without profile claims (issued before they were added),
+# keyed by token hash, so the auth backend is only asked once per token and TTL
+user_cache = TTLCache(maxsize=settings.AUTH_USER_CACHE_SIZE, ttl=settings.AUTH_USER_CACHE_TTL)
+
+# Tokens revoked by logout, kept until they expire and shared with the other workers
+token_revocations = TokenRevocationService(
+    directory_db,
+    sync_interval=settings.AUTH_REVOCATION_SYNC_INTERVAL,
+    default_ttl=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+)
+
+def _token_hash(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+def _user_from_claims(payload: dict) -> Optional[UserResponse]:
+    """Build the user from signed token claims, or None if the token predates profile claims"""
+    profile = payload.get("profile")
+    if not payload.get("uid") or not isinstance(profile, dict):
+        return None
+    return UserResponse(
+        id=payload["uid"],
+        email=payload["sub"],
+        first_name=profile.get("first_name", ""),
+        last_name=profile.get("last_name", ""),
+        phone=profile.get("phone"),
+        role=UserRole(payload.get("role", "user")),
+        is_active=profile.get("is_active", True),
+        created_at=profile.get("created_at", "")
+    )
+
+async def _fetch_user(token: str) -> UserResponse:
+    """Look the token's user up in the auth backend"""
+    user = await auth_backend.get_user(token)
+    
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User not found"
+        )
+    
+    # Get user metadata
+    user_metadata = user.user_metadata or {}
+    role = UserRole(user_metadata.get("role", "user"))
+    
+    return UserResponse(
+        id=user.id,
+        email=user.email,
+        first_name=user_metadata.get("first_name", ""),
+        last_name=user_metadata.get("last_name", ""),
+        phone=user_metadata.get("phone"),
+        role=role,
+        is_active=user.email_confirmed_at is not None,
+        created_at=user.created_at
+    )
+
+def _directory_entry(user) -> dict:
+    """User directory row for an auth backend user"""
+    return {
+        "id": str(user.id),
+        "email": user.email,
+        "role": (user.user_metadata or {}).get("role", "user"),
+        "created_at": str(user.created_at) if user.created_at else None
+    }
+
+def _is_duplicate_email_error(error: Exception) -> bool:
+    """Whether the provider rejected a new user because the email is taken"""
+    message = str(error).lower()
+    return "already exists" in message or "already been registered" in message or "email_exists" in message
+
 # Standalone dependency functions
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> UserResponse:
-    """Get current authenticated user from JWT token"""
+    """
+    Get current authenticated user from JWT token
+    
+    The token is verified locally and the user comes from its signed claims;
+    only tokens without profile claims fall back to the auth backend, cached per token.
+    """
     token = credentials.credentials
-    token_data = AuthService.verify_token(token)
+    payload = AuthService.decode_token(token)
+    
+    user = _user_from_claims(payload)
+    if user is not None:
+        return user
+    
+    cache_key = _token_hash(token)
+    user = user_cache.get(cache_key)
+    if user is not None:
+        return user
     
     try:
-        # Get user from Supabase
-        user_response = supabase.auth.get_user(token)
-        
-        if not user_response.user:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="User not found"
-            )
-        
-        # Get user metadata
-        user_metadata = user_response.user.user_metadata or {}
-        role = UserRole(user_metadata.get("role", "user"))
-        
-        return UserResponse(
-            id=user_response.user.id,
-            email=user_response.user.email,
-            first_name=user_metadata.get("first_name", ""),
-            last_name=user_metadata.get("last_name", ""),
-            phone=user_metadata.get("phone"),
-            role=role,
-            is_active=user_response.user.email_confirmed_at is not None,
-            created_at=user_response.user.created_at
-        )
-        
+        user = await _fetch_user(token)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials"
         )
+    # Never cache past the token's own expiry
+    ttl = min(user_cache.ttl, payload["exp"] - time.time()) if "exp" in payload else None
+    user_cache.set(cache_key, user, ttl=ttl)
+    return user
 
 class AuthService:
     """Authentication service for handling user authentication and authorization"""
@@ -58,6 +131,7 @@ class AuthService:
     @staticmethod
     def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
         """Create JWT access token"""
+        from jose import jwt
         to_encode = data.copy()
         if expires_delta:
             expire = datetime.utcnow() + expires_delta
@@ -65,78 +139,81 @@ class AuthService:
             expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
         
         to_encode.update({"exp": expire})
+        to_encode.setdefault("iat", datetime.utcnow())
+        to_encode.setdefault("jti", uuid.uuid4().hex)
         encoded_jwt = jwt.encode(to_encode, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
         return encoded_jwt
     
     @staticmethod
-    def verify_token(token: str) -> TokenData:
-        """Verify JWT token and return token data"""
+    def decode_token(token: str) -> dict:
+        """Verify a JWT's signature, expiry and revocation and return its claims"""
+        from jose import JWTError, jwt
+        credentials_exception = HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
         try:
             payload = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
-            email: str = payload.get("sub")
-            role: str = payload.get("role")
-            
-            if email is None:
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="Could not validate credentials",
-                    headers={"WWW-Authenticate": "Bearer"},
-                )
-            
-            return TokenData(email=email, role=UserRole(role) if role else None)
         except JWTError:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Could not validate credentials",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
+            raise credentials_exception
+        
+        if payload.get("sub") is None:
+            raise credentials_exception
+        if token_revocations.is_revoked(payload.get("jti") or _token_hash(token)):
+            raise credentials_exception
+        return payload
+    
+    @staticmethod
+    def verify_token(token: str) -> TokenData:
+        """Verify JWT token and return token data"""
+        payload = AuthService.decode_token(token)
+        role = payload.get("role")
+        return TokenData(email=payload["sub"], role=UserRole(role) if role else None)
     
     @staticmethod
     async def register_user(user_data: UserRegister) -> UserResponse:
         """Register a new user"""
         try:
-            # Check if user already exists
-            existing_user = supabase.auth.admin.list_users()
-            for user in existing_user.users:
-                if user.email == user_data.email:
-                    raise HTTPException(
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        detail="User with this email already exists"
-                    )
+            # Fast path for known users; the provider's unique-email check is authoritative
+            if await run_in_threadpool(directory_db.user_email_exists, user_data.email):
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="User with this email already exists"
+                )
             
-            # Create user in Supabase Auth
-            auth_response = supabase.auth.admin.create_user({
-                "email": user_data.email,
-                "password": user_data.password,
-                "email_confirm": True,
-                "user_metadata": {
-                    "first_name": user_data.first_name,
-                    "last_name": user_data.last_name,
-                    "phone": user_data.phone,
-                    "role": user_data.role.value
-                }
+            # Create user in the auth backend
+            user = await auth_backend.create_user(user_data.email, user_data.password, {
+                "first_name": user_data.first_name,
+                "last_name": user_data.last_name,
+                "phone": user_data.phone,
+                "role": user_data.role.value
             })
             
-            if not auth_response.user:
+            if not user:
                 raise HTTPException(
                     status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                     detail="Failed to create user"
                 )
             
+            await AuthService._sync_directory_user(user)
+            
             # Return user response
             return UserResponse(
-                id=auth_response.user.id,
-                email=auth_response.user.email,
+                id=user.id,
+                email=user.email,
                 first_name=user_data.first_name,
                 last_name=user_data.last_name,
                 phone=user_data.phone,
                 role=user_data.role,
-                is_active=auth_response.user.email_confirmed_at is not None,
-                created_at=auth_response.user.created_at
+                is_active=user.email_confirmed_at is not None,
+                created_at=user.created_at
             )
             
+        except HTTPException:
+            raise
         except Exception as e:
-            if "already exists" in str(e):
+            if _is_duplicate_email_error(e):
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail="User with this email already exists"
@@ -150,38 +227,48 @@ class AuthService:
     async def login_user(user_data: UserLogin) -> Token:
         """Authenticate user and return JWT token"""
         try:
-            # Sign in user with Supabase
-            auth_response = supabase.auth.sign_in_with_password({
-                "email": user_data.email,
-                "password": user_data.password
-            })
+            # Check the credentials with the auth backend
+            user = await auth_backend.authenticate(user_data.email, user_data.password)
             
-            if not auth_response.user:
+            if not user:
                 raise HTTPException(
                     status_code=status.HTTP_401_UNAUTHORIZED,
                     detail="Invalid credentials"
                 )
             
+            await AuthService._sync_directory_user(user)
+            
             # Get user metadata
-            user_metadata = auth_response.user.user_metadata or {}
+            user_metadata = user.user_metadata or {}
             role = UserRole(user_metadata.get("role", "user"))
             
             # Create user response
             user_response = UserResponse(
-                id=auth_response.user.id,
-                email=auth_response.user.email,
+                id=user.id,
+                email=user.email,
                 first_name=user_metadata.get("first_name", ""),
                 last_name=user_metadata.get("last_name", ""),
                 phone=user_metadata.get("phone"),
                 role=role,
-                is_active=auth_response.user.email_confirmed_at is not None,
-                created_at=auth_response.user.created_at
+                is_active=user.email_confirmed_at is not None,
+                created_at=user.created_at
             )
             
             # Create access token
             access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
             access_token = AuthService.create_access_token(
-                data={"sub": user_response.email, "role": user_response.role.value},
+                data={
+                    "sub": user_response.email,
+                    "role": user_response.role.value,
+                    "uid": user_response.id,
+                    "profile": {
+                        "first_name": user_response.first_name,
+                        "last_name": user_response.last_name,
+                        "phone": user_response.phone,
+                        "is_active": user_response.is_active,
+                        "created_at": str(user_response.created_at)
+                    }
+                },
                 expires_delta=access_token_expires
             )
             
@@ -201,18 +288,42 @@ class AuthService:
     
 
     
+    @staticmethod
+    async def _sync_directory_user(user) -> None:
+        """Record a provider user in the local user directory; a failure only costs the fast duplicate check"""
+        try:
+            await run_in_threadpool(directory_db.upsert_directory_users, [_directory_entry(user)])
+        except Exception as e:
+            print(f"⚠️ Could not update user directory for {user.email}: {e}")
+    
+    @staticmethod
+    def sync_user_directory(per_page: int = 1000) -> dict:
+        """Copy every auth backend user into the user directory, page by page, and drop users the provider no longer has"""
+        started = datetime.utcnow()
+        synced = 0
+        page = 1
+        while True:
+            users = auth_backend.list_users(page, per_page)
+            synced += directory_db.upsert_directory_users([_directory_entry(user) for user in users if user.email])
+            if len(users) < per_page:
+                break
+            page += 1
+        removed = directory_db.delete_directory_users_synced_before(started)
+        return {"synced": synced, "removed": removed, "pages": page}
+    
     @staticmethod
     async def logout_user(token: str):
-        """Logout user by invalidating token"""
+        """Logout user by revoking the token until it expires"""
+        from jose import JWTError, jwt
         try:
-            # Sign out user from Supabase
-            supabase.auth.sign_out()
+            payload = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
+        except JWTError:
+            # Invalid or expired tokens are already unusable
             return {"message": "Successfully logged out"}
-        except Exception as e:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Failed to logout: {str(e)}"
-            )
+        
+        await run_in_threadpool(token_revocations.revoke, payload.get("jti") or _token_hash(token), payload.get("exp"))
+        user_cache.pop(_token_hash(token))
+        return {"message": "Successfully logged out"}
 
 # Standalone dependency function for admin role requirement
 async def require_admin_role(current_user: UserResponse = Depends(get_current_user)) -> UserResponse:
@@ -1,4 +1,4 @@
-from typing import List, Optional
+from typing import List, Optional, Sequence
 from datetime import datetime
 from ..database.database import Database
 from ..models.booking import BookingCreate, BookingUpdate, CustomerBookingCreate
@@ -15,19 +15,20 @@ class BookingService:
         """Get all bookings from the database"""
         return self.db.get_all_bookings()
 
-    def create_booking(self, booking_data: BookingCreate) -> dict:
-        """Create a new booking"""
+    def create_booking(self, booking_data: BookingCreate, notify: Sequence[str] = ()) -> dict:
+        """Create a new booking, queueing the given outbox emails with it"""
         return self.db.create_booking_in_db(
             guest_id=booking_data.guest_id,
             room_id=booking_data.room_id,
             check_in_date=booking_data.check_in_date,
             check_out_date=booking_data.check_out_date,
-            total_price=booking_data.total_price
+            total_price=booking_data.total_price,
+            notify=notify
         )
 
-    def cancel_booking(self, booking_id: int) -> Optional[dict]:
-        """Cancel a booking"""
-        return self.db.delete_booking_from_db(booking_id)
+    def cancel_booking(self, booking_id: int, notify: Sequence[str] = ()) -> Optional[dict]:
+        """Cancel a booking, queueing the given outbox emails with it"""
+        return self.db.delete_booking_from_db(booking_id, notify=notify)
 
     def get_booking_by_id(self, booking_id: int) -> Optional[dict]:
         """Get a booking by its ID"""
@@ -48,7 +49,7 @@ class BookingService:
         
         return customer_bookings
 
-    def create_customer_booking(self, booking_data: CustomerBookingCreate) -> dict:
+    def create_customer_booking(self, booking_data: CustomerBookingCreate, notify: Sequence[str] = ()) -> dict:
         """Create a booking from customer interface"""
         # Validate dates
         try:
@@ -86,12 +87,13 @@ class BookingService:
             total_price=booking_data.total_price
         )
         
-        new_booking = self.create_booking(booking_create)
+        new_booking = self.create_booking(booking_create, notify)
         new_booking['confirmation_number'] = f"BK{new_booking['id']:06d}"
         
         return new_booking
 
-    def cancel_customer_booking(self, booking_id: int, customer_email: str) -> Optional[dict]:
+    def cancel_customer_booking(self, booking_id: int, customer_email: str,
+                                notify: Sequence[str] = ()) -> Optional[dict]:
         """Cancel a customer booking with email verification"""
         # Verify the booking belongs to this customer
         booking = self.get_booking_by_id(booking_id)
@@ -101,7 +103,7 @@ class BookingService:
         if booking.get('guest_email', '').lower() != customer_email.lower():
             return None
             
-        return self.cancel_booking(booking_id)
+        return self.cancel_booking(booking_id, notify)
 
     def check_room_availability(self, check_in: str, check_out: str) -> dict:
         """Check which rooms are available for specific dates"""
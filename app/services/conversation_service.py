@@ -0,0 +1,134 @@
+"""
+Conversation history management for the AI reception
+Keeps chat history within a token budget and summarizes older turns
+"""
+
+import hashlib
+import json
+from typing import Callable, Dict, List, Optional, Tuple
+from ..utils.cache import TTLCache
+
+try:
+    import tiktoken
+except ImportError:  # Optional dependency - fall back to a character estimate
+    tiktoken = None
+
+class TokenCounter:
+    """Counts tokens with tiktoken when installed, otherwise estimates ~4 characters per token"""
+
+    # Per-message framing overhead used by OpenAI chat models
+    MESSAGE_OVERHEAD = 4
+
+    def __init__(self, model: str):
+        self.encoding = None
+        if tiktoken is not None:
+            try:
+                self.encoding = tiktoken.encoding_for_model(model)
+            except KeyError:
+                self.encoding = tiktoken.get_encoding("cl100k_base")
+
+    def count(self, text: str) -> int:
+        """Count tokens in a piece of text"""
+        if not text:
+            return 0
+        if self.encoding is not None:
+            return len(self.encoding.encode(text))
+        return (len(text) + 3) // 4
+
+    def count_message(self, message: Dict) -> int:
+        """Count tokens in a single chat message"""
+        return self.MESSAGE_OVERHEAD + self.count(message.get("content") or "")
+
+    def count_messages(self, messages: List[Dict]) -> int:
+        """Count tokens in a list of chat messages, including reply priming"""
+        return sum(self.count_message(message) for message in messages) + 2
+
+class ConversationHistoryManager:
+    """
+    Trims conversation history to a token budget.
+
+    The newest turns that fit in the budget are sent verbatim; older turns are
+    folded into a running summary. Summaries are cached per conversation so
+    each turn is only summarized once as it falls out of the window.
+    """
+
+    def __init__(self, token_counter: TokenCounter, summarize: Callable[[str, List[Dict]], str],
+                 token_budget: int = 1500, cache_size: int = 1024, cache_ttl: float = 3600):
+        self.token_counter = token_counter
+        self.summarize = summarize
+        self.token_budget = token_budget
+        self.summary_cache = TTLCache(maxsize=cache_size, ttl=cache_ttl)
+
+    def sanitize(self, conversation_history: Optional[List]) -> List[Dict]:
+        """Keep only well-formed user/assistant messages"""
+        messages = []
+        for msg in conversation_history or []:
+            if not isinstance(msg, dict) or msg.get("role") not in ("user", "assistant"):
+                continue
+            content = msg.get("content")
+            if isinstance(content, str) and content:
+                messages.append({"role": msg["role"], "content": content})
+        return messages
+
+    def fit(self, history: List[Dict]) -> List[Dict]:
+        """Return the newest messages that fit in the token budget"""
+        kept = []
+        used = 0
+        for msg in reversed(history):
+            cost = self.token_counter.count_message(msg)
+            if used + cost > self.token_budget:
+                break
+            kept.append(msg)
+            used += cost
+        kept.reverse()
+        return kept
+
+    def prepare(self, conversation_history: Optional[List],
+                conversation_id: Optional[str] = None) -> Tuple[List[Dict], Optional[str]]:
+        """Return (recent messages within budget, summary of older messages or None)"""
+        history = self.sanitize(conversation_history)
+        kept = self.fit(history)
+
+        dropped = history[:len(history) - len(kept)]
+        if not dropped:
+            return kept, None
+        return kept, self.summarize_dropped(dropped, conversation_id)
+
+    def compact(self, summary: str, history: List[Dict]) -> Tuple[str, List[Dict]]:
+        """
+        Fold messages that no longer fit the budget into summary.
+
+        Used for server-side sessions, which store only the summary and the
+        recent window, so nothing needs to be cached or re-summarized.
+        """
+        kept = self.fit(history)
+        dropped = history[:len(history) - len(kept)]
+        if dropped:
+            summary = self.summarize(summary or "", dropped)
+        return summary, kept
+
+    def summarize_dropped(self, dropped: List[Dict], conversation_id: Optional[str] = None) -> str:
+        """Return a running summary of the dropped turns, reusing the cached one when possible"""
+        key = conversation_id or self._digest(dropped[:1])
+        cached = self.summary_cache.get(key)
+
+        previous_summary = ""
+        new_turns = dropped
+        if cached and cached["turns"] <= len(dropped) and cached["digest"] == self._digest(dropped[:cached["turns"]]):
+            if cached["turns"] == len(dropped):
+                return cached["summary"]
+            previous_summary = cached["summary"]
+            new_turns = dropped[cached["turns"]:]
+
+        summary = self.summarize(previous_summary, new_turns)
+        self.summary_cache.set(key, {
+            "turns": len(dropped),
+            "digest": self._digest(dropped),
+            "summary": summary
+        })
+        return summary
+
+    def _digest(self, messages: List[Dict]) -> str:
+        """Stable fingerprint of a list of messages"""
+        payload = json.dumps(messages, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()
@@ -0,0 +1,139 @@
+"""
+Asynchronous bulk email delivery
+Sends many emails concurrently over the pooled SMTP sessions, with a global
+in-flight limit and per-recipient-domain throttling, and reports throughput
+"""
+
+import asyncio
+import logging
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional, Tuple
+from .email_service import EmailService, email_service
+from .usage_service import latency_summary
+from ..utils.rate_limit import parse_rate
+
+class DomainThrottle:
+    """
+    Per-recipient-domain limits for one delivery run.
+
+    At most max_in_flight messages to the same domain are sent at once, and
+    with a rate such as "120/minute" sends to a domain are spaced evenly so
+    large providers do not defer or reject the burst.
+    """
+
+    def __init__(self, max_in_flight: int = 2, rate: str = "0"):
+        self.max_in_flight = max_in_flight
+        self.capacity, self.period = parse_rate(rate)
+        self.waited = 0.0
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._next_start: Dict[str, float] = {}
+
+    @asynccontextmanager
+    async def slot(self, domain: str):
+        semaphore = self._semaphores.setdefault(domain, asyncio.Semaphore(self.max_in_flight))
+        async with semaphore:
+            if self.capacity:
+                now = time.monotonic()
+                start = max(now, self._next_start.get(domain, now))
+                self._next_start[domain] = start + self.period / self.capacity
+                if start > now:
+                    self.waited += start - now
+                    await asyncio.sleep(start - now)
+            yield
+
+class EmailDeliveryEngine:
+    """
+    Delivers batches of emails concurrently.
+
+    A job is {"kind": ..., "booking": {...}, "guest": {...}} plus an optional
+    "id" that is echoed in its result. Messages are built on the event loop
+    and sent by up to max_in_flight worker threads, each holding one pooled
+    SMTP session; keep SMTP_POOL_SIZE at least as large, or sends wait for a
+    free session. Per-domain limits are applied before a job takes an
+    in-flight slot, so a throttled domain never holds up the others.
+    """
+
+    def __init__(self, sender: Optional[EmailService] = None, max_in_flight: int = 4,
+                 domain_max_in_flight: int = 2, domain_rate: str = "0"):
+        self.sender = sender or email_service
+        self.max_in_flight = max_in_flight
+        self.domain_max_in_flight = domain_max_in_flight
+        self.domain_rate = domain_rate
+        self.logger = logging.getLogger(__name__)
+
+    async def send_all(self, jobs: List[Dict]) -> Tuple[List[Dict], Dict]:
+        """Send every job; return (per-job results in job order, throughput report)"""
+        loop = asyncio.get_running_loop()
+        executor = ThreadPoolExecutor(max_workers=self.max_in_flight, thread_name_prefix="email")
+        in_flight = asyncio.Semaphore(self.max_in_flight)
+        throttle = DomainThrottle(self.domain_max_in_flight, self.domain_rate)
+        pool = getattr(self.sender, "_smtp_pool", None)
+        logins_before = pool.counters["logins"] if pool else 0
+        send_times: List[float] = []
+        peak = {"current": 0, "max": 0}
+
+        async def send(job: Dict) -> Dict:
+            result = {"id": job.get("id"), "kind": job["kind"], "recipient": None, "status": "failed", "error": None}
+            try:
+                built = self.sender.build_email(job["kind"], job["booking"], job["guest"])
+            except Exception as e:
+                result["error"] = str(e) or e.__class__.__name__
+                return result
+            if built is None:
+                result["status"] = "skipped"
+                return result
+
+            recipient, msg = built
+            result["recipient"] = recipient
+            async with throttle.slot(recipient.rsplit("@", 1)[-1].lower()):
+                async with in_flight:
+                    peak["current"] += 1
+                    peak["max"] = max(peak["max"], peak["current"])
+                    started = time.perf_counter()
+                    try:
+                        await loop.run_in_executor(executor, self.sender.deliver, recipient, msg)
+                        result["status"] = "sent"
+                    except Exception as e:
+                        result["error"] = str(e) or e.__class__.__name__
+                    finally:
+                        send_times.append((time.perf_counter() - started) * 1000)
+                        peak["current"] -= 1
+            return result
+
+        started = time.perf_counter()
+        try:
+            results = await asyncio.gather(*(send(job) for job in jobs))
+        finally:
+            executor.shutdown(wait=False)
+        elapsed = time.perf_counter() - started
+
+        pool = getattr(self.sender, "_smtp_pool", None)
+        domains = defaultdict(lambda: {"sent": 0, "failed": 0})
+        for result in results:
+            if result["recipient"] and result["status"] != "skipped":
+                domains[result["recipient"].rsplit("@", 1)[-1].lower()][result["status"]] += 1
+        sent = sum(1 for result in results if result["status"] == "sent")
+        report = {
+            "messages": len(results),
+            "sent": sent,
+            "failed": sum(1 for result in results if result["status"] == "failed"),
+            "skipped": sum(1 for result in results if result["status"] == "skipped"),
+            "elapsed_seconds": round(elapsed, 3),
+            "messages_per_second": round(sent / elapsed, 2) if elapsed > 0 else 0.0,
+            "send_latency_ms": latency_summary(send_times),
+            "max_in_flight": self.max_in_flight,
+            "peak_in_flight": peak["max"],
+            "domain_throttle_wait_seconds": round(throttle.waited, 3),
+            "smtp_logins": (pool.counters["logins"] - logins_before) if pool else 0,
+            "domains": dict(sorted(domains.items(), key=lambda item: -sum(item[1].values()))[:10])
+        }
+        if report["failed"]:
+            self.logger.warning(f"Email delivery run: {report['failed']} of {len(results)} emails failed")
+        return list(results), report
+
+    def send_all_blocking(self, jobs: List[Dict]) -> Tuple[List[Dict], Dict]:
+        """send_all for callers outside an event loop, such as worker threads and scripts"""
+        return asyncio.run(self.send_all(jobs))
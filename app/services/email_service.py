@@ -4,38 +4,44 @@ Email Service for Grand Hotel Management System
 Handles SMTP email notifications for booking confirmations and cancellations
 """
 
-import smtplib
 import ssl
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from datetime import datetime
-from typing import Optional
+from typing import List, Optional, Tuple
 import logging
-import os
+import threading
+from ..config.settings import settings
+from ..utils.smtp_pool import SMTPConnectionPool
 
 # Email Configuration - UPDATE THESE WITH YOUR EMAIL SETTINGS
 EMAIL_CONFIG = {
-    "SMTP_SERVER": os.getenv("SMTP_SERVER", "smtp.gmail.com"),
-    "SMTP_PORT": int(os.getenv("SMTP_PORT", "587")),
-    "EMAIL_ADDRESS": os.getenv("EMAIL_ADDRESS", "grandhotel@gmail.com"),
-    "EMAIL_PASSWORD": os.getenv("EMAIL_PASSWORD", "demo-password-12345"),
-    "USE_TLS": os.getenv("USE_TLS", "True").lower() == "true",
-    "DEMO_MODE": os.getenv("EMAIL_DEMO_MODE", "True").lower() == "true"
+    "SMTP_SERVER": settings.SMTP_SERVER,
+    "SMTP_PORT": settings.SMTP_PORT,
+    "EMAIL_ADDRESS": settings.EMAIL_ADDRESS,
+    "EMAIL_PASSWORD": settings.EMAIL_PASSWORD,
+    "USE_TLS": settings.USE_TLS,
+    "DEMO_MODE": settings.EMAIL_DEMO_MODE,
+    "SMTP_POOL_SIZE": settings.SMTP_POOL_SIZE,
+    "SMTP_MAX_MESSAGES_PER_CONNECTION": settings.SMTP_MAX_MESSAGES_PER_CONNECTION,
+    "SMTP_NOOP_AFTER": settings.SMTP_NOOP_AFTER,
+    "SMTP_MAX_IDLE": settings.SMTP_MAX_IDLE,
+    "SMTP_TIMEOUT": settings.SMTP_TIMEOUT
 }
 
 # Hotel Information
 HOTEL_INFO = {
-    "name": os.getenv("HOTEL_NAME", "Grand Hotel"),
-    "address": os.getenv("HOTEL_ADDRESS", "123 Luxury Avenue, Hotel District, City 12345"),
-    "phone": os.getenv("HOTEL_PHONE", "+1-555-HOTEL-1"),
-    "email": os.getenv("HOTEL_EMAIL", EMAIL_CONFIG["EMAIL_ADDRESS"]),
-    "website": os.getenv("HOTEL_WEBSITE", "https://grandhotel.com")
+    "name": settings.HOTEL_NAME,
+    "address": settings.HOTEL_ADDRESS,
+    "phone": settings.HOTEL_PHONE,
+    "email": settings.HOTEL_EMAIL,
+    "website": settings.HOTEL_WEBSITE,
+    "check_in_time": settings.HOTEL_CHECK_IN_TIME
 }
 
 # Admin Email Configuration
 ADMIN_CONFIG = {
-    "admin_email": os.getenv("ADMIN_EMAIL", EMAIL_CONFIG["EMAIL_ADDRESS"]),
-    "enable_admin_notifications": os.getenv("ENABLE_ADMIN_NOTIFICATIONS", "True").lower() == "true"
+    "admin_email": settings.ADMIN_EMAIL,
+    "enable_admin_notifications": settings.ENABLE_ADMIN_NOTIFICATIONS
 }
 
 class EmailService:
@@ -49,6 +55,10 @@ class EmailService:
         self.use_tls = EMAIL_CONFIG["USE_TLS"]
         self.demo_mode = EMAIL_CONFIG["DEMO_MODE"]
         
+        self._smtp_pool: Optional[SMTPConnectionPool] = None
+        self._pool_lock = threading.Lock()
+        self._templates = None
+        
         # Setup logging
         logging.basicConfig(level=logging.INFO)
         self.logger = logging.getLogger(__name__)
@@ -81,272 +91,136 @@ class EmailService:
         """Check if email service is properly configured"""
         return self.config_valid or self.demo_mode
     
-    def _create_smtp_connection(self):
-        """Create and return SMTP connection"""
-        if not self.config_valid:
-            self.logger.error(f"Cannot create SMTP connection: configuration invalid")
-            return None
-            
-        try:
-            self.logger.info(f"Attempting SMTP connection to {self.smtp_server}:{self.smtp_port}")
-            
-            # Create secure SSL context
-            context = ssl.create_default_context()
-            
-            # Connect to server
-            server = smtplib.SMTP(self.smtp_server, self.smtp_port)
-            
-            if self.use_tls:
-                server.starttls(context=context)
-                self.logger.info("TLS encryption enabled")
-            
-            # Login to account
-            server.login(self.email_address, self.email_password)
-            self.logger.info(f"Successfully authenticated as {self.email_address}")
-            
-            return server
-            
-        except Exception as e:
-            self.logger.error(f"Failed to create SMTP connection: {e}")
-            return None
+    @property
+    def templates(self):
+        """Email bodies, compiled once on the first email rather than at import"""
+        if self._templates is None:
+            with self._pool_lock:
+                if self._templates is None:
+                    from ..utils.email_templates import EmailTemplates
+                    self._templates = EmailTemplates(HOTEL_INFO)
+        return self._templates
+    
+    @property
+    def smtp_pool(self) -> SMTPConnectionPool:
+        """Pool of logged-in SMTP sessions, created on first real send"""
+        if self._smtp_pool is None:
+            with self._pool_lock:
+                if self._smtp_pool is None:
+                    self.logger.info(f"Opening SMTP connection pool to {self.smtp_server}:{self.smtp_port}")
+                    self._smtp_pool = SMTPConnectionPool(
+                        self.smtp_server,
+                        self.smtp_port,
+                        self.email_address,
+                        self.email_password,
+                        use_tls=self.use_tls,
+                        # One SSL context for every connection instead of one per message
+                        ssl_context=ssl.create_default_context(),
+                        max_size=EMAIL_CONFIG["SMTP_POOL_SIZE"],
+                        max_messages=EMAIL_CONFIG["SMTP_MAX_MESSAGES_PER_CONNECTION"],
+                        noop_after=EMAIL_CONFIG["SMTP_NOOP_AFTER"],
+                        max_idle=EMAIL_CONFIG["SMTP_MAX_IDLE"],
+                        timeout=EMAIL_CONFIG["SMTP_TIMEOUT"]
+                    )
+        return self._smtp_pool
+    
+    def close(self):
+        """Close pooled SMTP sessions"""
+        if self._smtp_pool is not None:
+            self._smtp_pool.close()
+    
+    def _create_notification_email(self, subject: str, recipient: str, text_content: str) -> MIMEMultipart:
+        """Create a plain-text notification email"""
+        msg = MIMEMultipart("alternative")
+        msg["Subject"] = f"{subject} - {HOTEL_INFO['name']}"
+        msg["From"] = f"{HOTEL_INFO['name']} <{self.email_address}>"
+        msg["To"] = recipient
+        msg.attach(MIMEText(text_content, "plain"))
+        return msg
     
     def _create_booking_confirmation_email(self, booking_data: dict, guest_data: dict) -> MIMEMultipart:
         """Create booking confirmation email"""
-        
-        # Create message container
+        text_content, html_content = self.templates.render("booking_confirmation", booking_data, guest_data)
         msg = MIMEMultipart("alternative")
         msg["Subject"] = f"Booking Confirmation - {booking_data['confirmation_number']} - {HOTEL_INFO['name']}"
         msg["From"] = f"{HOTEL_INFO['name']} <{self.email_address}>"
         msg["To"] = guest_data["email"]
-        
-        # Format dates
-        check_in = datetime.fromisoformat(booking_data["check_in_date"]).strftime("%B %d, %Y at %I:%M %p")
-        check_out = datetime.fromisoformat(booking_data["check_out_date"]).strftime("%B %d, %Y at %I:%M %p")
-        
-        # Calculate nights
-        check_in_dt = datetime.fromisoformat(booking_data["check_in_date"])
-        check_out_dt = datetime.fromisoformat(booking_data["check_out_date"])
-        nights = (check_out_dt - check_in_dt).days
-        
-        # Create HTML content
-        html_content = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <style>
-                body {{ font-family: Arial, sans-serif; margin: 0; padding: 20px; background-color: #f5f5f5; }}
-                .container {{ max-width: 600px; margin: 0 auto; background-color: white; padding: 30px; border-radius: 10px; box-shadow: 0 4px 6px rgba(0,0,0,0.1); }}
-                .header {{ text-align: center; border-bottom: 3px solid #D4AF37; padding-bottom: 20px; margin-bottom: 30px; }}
-                .hotel-name {{ color: #1B2B44; font-size: 28px; font-weight: bold; margin: 0; }}
-                .confirmation-title {{ color: #D4AF37; font-size: 24px; margin: 10px 0; }}
-                .booking-details {{ background-color: #f8f9fa; padding: 20px; border-radius: 8px; margin: 20px 0; }}
-                .detail-row {{ display: flex; justify-content: space-between; margin: 10px 0; padding: 5px 0; border-bottom: 1px solid #eee; }}
-                .detail-label {{ font-weight: bold; color: #1B2B44; }}
-                .detail-value {{ color: #333; }}
-                .highlight {{ background-color: #D4AF37; color: white; padding: 2px 8px; border-radius: 4px; font-weight: bold; }}
-                .total-price {{ font-size: 20px; color: #D4AF37; font-weight: bold; }}
-                .footer {{ text-align: center; margin-top: 30px; padding-top: 20px; border-top: 1px solid #eee; color: #666; }}
-                .contact-info {{ margin: 10px 0; }}
-                .thank-you {{ color: #1B2B44; font-size: 18px; font-weight: bold; margin: 20px 0; }}
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <div class="header">
-                    <h1 class="hotel-name">{HOTEL_INFO['name']}</h1>
-                    <h2 class="confirmation-title">🎉 Booking Confirmed!</h2>
-                </div>
-                
-                <p>Dear {guest_data['first_name']} {guest_data['last_name']},</p>
-                
-                <p>Thank you for choosing {HOTEL_INFO['name']}! We're delighted to confirm your reservation.</p>
-                
-                <div class="booking-details">
-                    <h3 style="color: #1B2B44; margin-top: 0;">📋 Booking Details</h3>
-                    
-                    <div class="detail-row">
-                        <span class="detail-label">Confirmation Number:</span>
-                        <span class="detail-value highlight">{booking_data['confirmation_number']}</span>
-                    </div>
-                    
-                    <div class="detail-row">
-                        <span class="detail-label">Guest Name:</span>
-                        <span class="detail-value">{guest_data['first_name']} {guest_data['last_name']}</span>
-                    </div>
-                    
-                    <div class="detail-row">
-                        <span class="detail-label">Room:</span>
-                        <span class="detail-value">Room {booking_data['room_number']} ({booking_data['room_type']})</span>
-                    </div>
-                    
-                    <div class="detail-row">
-                        <span class="detail-label">Check-in:</span>
-                        <span class="detail-value">{check_in}</span>
-                    </div>
-                    
-                    <div class="detail-row">
-                        <span class="detail-label">Check-out:</span>
-                        <span class="detail-value">{check_out}</span>
-                    </div>
-                    
-                    <div class="detail-row">
-                        <span class="detail-label">Duration:</span>
-                        <span class="detail-value">{nights} night{'s' if nights > 1 else ''}</span>
-                    </div>
-                    
-                    <div class="detail-row">
-                        <span class="detail-label">Total Amount:</span>
-                        <span class="detail-value total-price">${booking_data['total_price']:.2f}</span>
-                    </div>
-                </div>
-                
-                <div class="thank-you">
-                    ✨ We look forward to welcoming you to {HOTEL_INFO['name']}!
-                </div>
-                
-                <div class="footer">
-                    <div class="contact-info">
-                        <strong>{HOTEL_INFO['name']}</strong><br>
-                        {HOTEL_INFO['address']}<br>
-                        Phone: {HOTEL_INFO['phone']}<br>
-                        Email: {HOTEL_INFO['email']}<br>
-                        Website: {HOTEL_INFO['website']}
-                    </div>
-                </div>
-            </div>
-        </body>
-        </html>
-        """
-        
-        # Create plain text version
-        text_content = f"""
-        {HOTEL_INFO['name']} - Booking Confirmation
-        
-        Dear {guest_data['first_name']} {guest_data['last_name']},
-        
-        Thank you for choosing {HOTEL_INFO['name']}! We're delighted to confirm your reservation.
-        
-        BOOKING DETAILS:
-        Confirmation Number: {booking_data['confirmation_number']}
-        Guest Name: {guest_data['first_name']} {guest_data['last_name']}
-        Room: Room {booking_data['room_number']} ({booking_data['room_type']})
-        Check-in: {check_in}
-        Check-out: {check_out}
-        Duration: {nights} night{'s' if nights > 1 else ''}
-        Total Amount: ${booking_data['total_price']:.2f}
-        
-        We look forward to welcoming you to {HOTEL_INFO['name']}!
-        
-        {HOTEL_INFO['name']}
-        {HOTEL_INFO['address']}
-        Phone: {HOTEL_INFO['phone']}
-        Email: {HOTEL_INFO['email']}
-        Website: {HOTEL_INFO['website']}
-        """
-        
-        # Attach parts
-        part1 = MIMEText(text_content, "plain")
-        part2 = MIMEText(html_content, "html")
-        
-        msg.attach(part1)
-        msg.attach(part2)
-        
+        msg.attach(MIMEText(text_content, "plain"))
+        msg.attach(MIMEText(html_content, "html"))
         return msg
     
-    def send_booking_confirmation(self, booking_data: dict, guest_data: dict) -> bool:
-        """Send booking confirmation email to customer"""
-        try:
-            # Create email message
-            msg = self._create_booking_confirmation_email(booking_data, guest_data)
-            
-            # Demo mode - simulate sending without actual SMTP
-            if self.demo_mode:
-                self.logger.info("🎭 DEMO MODE: Simulating booking confirmation email")
-                self.logger.info(f"📧 Would send booking confirmation to: {guest_data['email']}")
-                self.logger.info(f"📋 Booking: {booking_data['confirmation_number']}")
-                self.logger.info("✅ Email simulated successfully!")
-                return True
-            
-            # Real mode - actual SMTP sending
-            server = self._create_smtp_connection()
-            if not server:
-                self.logger.error("Failed to create SMTP connection for booking confirmation")
-                return False
-            
-            # Send email
-            text = msg.as_string()
-            server.sendmail(self.email_address, guest_data["email"], text)
-            server.quit()
-            
-            self.logger.info(f"Booking confirmation email sent to {guest_data['email']}")
-            return True
-            
-        except Exception as e:
-            self.logger.error(f"Failed to send booking confirmation email: {e}")
-            return False
+    def _create_cancellation_email(self, booking_data: dict, guest_data: dict) -> MIMEMultipart:
+        """Create booking cancellation email"""
+        return self._create_notification_email(
+            f"Booking Cancelled - {booking_data['confirmation_number']}",
+            guest_data["email"],
+            self.templates.render("cancellation_confirmation", booking_data, guest_data)[0]
+        )
     
-    def send_cancellation_confirmation(self, booking_data: dict, guest_data: dict) -> bool:
-        """Send booking cancellation email to customer"""
-        try:
-            # Demo mode - simulate sending without actual SMTP
-            if self.demo_mode:
-                self.logger.info("🎭 DEMO MODE: Simulating cancellation confirmation email")
-                self.logger.info(f"📧 Would send cancellation notice to: {guest_data['email']}")
-                self.logger.info(f"📋 Cancelled booking: {booking_data['confirmation_number']}")
-                self.logger.info("✅ Cancellation email simulated successfully!")
-                return True
-            
-            # Real mode implementation would go here
-            self.logger.info(f"Cancellation confirmation email sent to {guest_data['email']}")
-            return True
-            
-        except Exception as e:
-            self.logger.error(f"Failed to send cancellation confirmation email: {e}")
-            return False
+    def _create_admin_booking_email(self, booking_data: dict, guest_data: dict) -> MIMEMultipart:
+        """Create admin new-booking notification"""
+        return self._create_notification_email(
+            f"New Booking - {booking_data['confirmation_number']}",
+            ADMIN_CONFIG["admin_email"],
+            self.templates.render("admin_booking_notification", booking_data, guest_data)[0]
+        )
     
-    def send_admin_booking_notification(self, booking_data: dict, guest_data: dict) -> bool:
-        """Send booking notification to admin"""
-        if not ADMIN_CONFIG["enable_admin_notifications"]:
-            return True
-            
-        try:
-            # Demo mode - simulate sending without actual SMTP
-            if self.demo_mode:
-                self.logger.info("🎭 DEMO MODE: Simulating admin booking notification")
-                self.logger.info(f"👨‍💼 Would send admin notification to: {ADMIN_CONFIG['admin_email']}")
-                self.logger.info(f"📋 Booking: {booking_data['confirmation_number']}")
-                self.logger.info("✅ Admin notification simulated successfully!")
-                return True
-            
-            # Real mode implementation would go here
-            self.logger.info(f"Admin booking notification sent for booking {booking_data['confirmation_number']}")
-            return True
-            
-        except Exception as e:
-            self.logger.error(f"Failed to send admin booking notification: {e}")
-            return False
+    def _create_admin_cancellation_email(self, booking_data: dict, guest_data: dict) -> MIMEMultipart:
+        """Create admin cancellation notification"""
+        return self._create_notification_email(
+            f"Booking Cancelled - {booking_data['confirmation_number']}",
+            ADMIN_CONFIG["admin_email"],
+            self.templates.render("admin_cancellation_notification", booking_data, guest_data)[0]
+        )
+    
+    def _create_pre_arrival_reminder_email(self, booking_data: dict, guest_data: dict) -> MIMEMultipart:
+        """Create pre-arrival reminder sent the day before check-in"""
+        return self._create_notification_email(
+            f"See You Tomorrow - {booking_data['confirmation_number']}",
+            guest_data["email"],
+            self.templates.render("pre_arrival_reminder", booking_data, guest_data)[0]
+        )
     
-    def send_admin_cancellation_notification(self, booking_data: dict, guest_data: dict) -> bool:
-        """Send cancellation notification to admin"""
+    EMAIL_BUILDERS = {
+        "booking_confirmation": "_create_booking_confirmation_email",
+        "cancellation_confirmation": "_create_cancellation_email",
+        "admin_booking_notification": "_create_admin_booking_email",
+        "admin_cancellation_notification": "_create_admin_cancellation_email",
+        "pre_arrival_reminder": "_create_pre_arrival_reminder_email",
+    }
+    
+    def build_email(self, kind: str, booking_data: dict, guest_data: dict) -> Optional[Tuple[str, MIMEMultipart]]:
+        """Build (recipient, message) for an email kind, or None if that kind is switched off"""
+        if kind.startswith("admin_") and not ADMIN_CONFIG["enable_admin_notifications"]:
+            return None
+        if kind not in self.EMAIL_BUILDERS:
+            raise ValueError(f"Unknown email kind: {kind}")
+        msg = getattr(self, self.EMAIL_BUILDERS[kind])(booking_data, guest_data)
+        return msg["To"], msg
+    
+    def build_admin_digest(self, events: List[dict]) -> Optional[Tuple[str, MIMEMultipart]]:
+        """Build (recipient, message) summarising many admin booking/cancellation events in one email"""
         if not ADMIN_CONFIG["enable_admin_notifications"]:
-            return True
-            
-        try:
-            # Demo mode - simulate sending without actual SMTP
-            if self.demo_mode:
-                self.logger.info("🎭 DEMO MODE: Simulating admin cancellation notification")
-                self.logger.info(f"👨‍💼 Would send admin cancellation notice to: {ADMIN_CONFIG['admin_email']}")
-                self.logger.info(f"📋 Cancelled booking: {booking_data['confirmation_number']}")
-                self.logger.info("✅ Admin cancellation notification simulated successfully!")
-                return True
-            
-            # Real mode implementation would go here
-            self.logger.info(f"Admin cancellation notification sent for booking {booking_data['confirmation_number']}")
-            return True
-            
-        except Exception as e:
-            self.logger.error(f"Failed to send admin cancellation notification: {e}")
-            return False
+            return None
+        text_content, html_content = self.templates.render_digest(events)
+        bookings = sum(1 for event in events if event["kind"] == "admin_booking_notification")
+        cancellations = len(events) - bookings
+        msg = MIMEMultipart("alternative")
+        msg["Subject"] = f"Admin Digest - {bookings} new, {cancellations} cancelled - {HOTEL_INFO['name']}"
+        msg["From"] = f"{HOTEL_INFO['name']} <{self.email_address}>"
+        msg["To"] = ADMIN_CONFIG["admin_email"]
+        msg.attach(MIMEText(text_content, "plain"))
+        msg.attach(MIMEText(html_content, "html"))
+        return msg["To"], msg
+    
+    def deliver(self, recipient: str, msg: MIMEMultipart) -> None:
+        """Send a built message over a pooled SMTP session (only logged in demo mode); raises on failure"""
+        if self.demo_mode:
+            self.logger.info(f"🎭 DEMO MODE: Would send \"{msg['Subject']}\" to {recipient}")
+            return
+        if not self.config_valid:
+            raise RuntimeError("Email configuration invalid")
+        self.smtp_pool.send(self.email_address, recipient, msg.as_string())
 
 # Global email service instance
-email_service = EmailService() 
\ No newline at end of file
+email_service = EmailService()
\ No newline at end of file
@@ -0,0 +1,127 @@
+"""
+Health probes for Grand Hotel Management System
+A liveness check that never leaves the process, and a readiness check of the
+database, connection pools, caches, email outbox and LLM circuit breaker
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+from ..config.settings import settings
+from ..database.database import Database
+from ..utils.cache import TTLCache
+from .ai_service import peek_ai_service
+from .auth_service import token_revocations, user_cache
+from .outbox_service import email_outbox
+
+class HealthService:
+    """
+    Liveness and readiness for container healthchecks and load balancers.
+
+    live() only reads process state, so its cost does not depend on the
+    size of any table. ready() runs SELECT 1 and the outbox backlog count on
+    a single probe thread and waits at most db_timeout for them: a hung
+    database fails the probe instead of hanging it, and later probes queue
+    behind a stuck query instead of piling up threads. Only a database that
+    cannot be reached makes the service unready. A saturated pool, an open
+    LLM circuit breaker or a stopped outbox worker make it "degraded". The
+    readiness result is reused for cache_ttl seconds.
+    """
+
+    def __init__(self, db: Optional[Database] = None, db_timeout: float = 2.0,
+                 pool_saturation_warn: float = 0.8, cache_ttl: float = 1.0):
+        self.db = db or Database()
+        self.db_timeout = db_timeout
+        self.pool_saturation_warn = pool_saturation_warn
+        self.started = time.monotonic()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="health-db")
+        self._ready_cache = TTLCache(maxsize=1, ttl=cache_ttl)
+
+    def live(self) -> Dict:
+        """The process is up and serving requests; no I/O"""
+        return {"status": "alive", "uptime_seconds": round(time.monotonic() - self.started, 1)}
+
+    def ready(self) -> Tuple[bool, Dict]:
+        """(whether to send traffic here, details of every check)"""
+        return self._ready_cache.get_or_set("ready", self._check)
+
+    def _probe_database(self) -> Dict:
+        started = time.perf_counter()
+        self.db.ping()
+        latency = time.perf_counter() - started
+        backlog = self.db.get_outbox_backlog()
+        return {"latency_ms": round(latency * 1000, 1), "backlog": backlog}
+
+    def check_database(self) -> Tuple[Dict, Optional[Dict]]:
+        """(database status, due outbox emails or None if the database did not answer in time)"""
+        try:
+            probe = self._executor.submit(self._probe_database).result(timeout=self.db_timeout)
+        except FutureTimeoutError:
+            return {"status": "timeout", "timeout_seconds": self.db_timeout}, None
+        except Exception as e:
+            return {"status": "error", "error": str(e)}, None
+        oldest = probe["backlog"]["oldest"]
+        return {"status": "connected", "latency_ms": probe["latency_ms"]}, {
+            "due": probe["backlog"]["count"],
+            "oldest_waiting_seconds": round((datetime.utcnow() - oldest).total_seconds()) if oldest else 0
+        }
+
+    def check_llm(self) -> Dict:
+        """Circuit breaker and queue of OpenAI calls; not started until the first AI request"""
+        ai_service = peek_ai_service()
+        if ai_service is None:
+            return {"status": "not_started"}
+        stats = ai_service.llm_guard.stats()
+        return {
+            "status": stats["breaker"]["state"],
+            "breaker": stats["breaker"],
+            "in_flight": stats["in_flight"],
+            "queue_depth": stats["queue_depth"]
+        }
+
+    def check_caches(self) -> Dict:
+        caches = {"auth_users": user_cache.stats()}
+        ai_service = peek_ai_service()
+        if ai_service is not None:
+            caches["ai_responses"] = ai_service.response_cache.stats()
+            caches["ai_sessions"] = ai_service.session_store.cache.stats()
+        caches["revoked_tokens"] = token_revocations.stats()
+        return caches
+
+    def _check(self) -> Tuple[bool, Dict]:
+        database, outbox = self.check_database()
+        pool = Database.get_pool_status()
+        llm = self.check_llm()
+        ready = database["status"] == "connected"
+
+        warnings = []
+        if pool["saturation"] >= self.pool_saturation_warn:
+            warnings.append("database connection pool nearly full")
+        if llm["status"] != "not_started" and llm["status"] != "closed":
+            warnings.append(f"LLM circuit breaker {llm['status']}")
+        if not email_outbox.is_running():
+            warnings.append("email outbox worker not running")
+
+        return ready, {
+            "status": "unavailable" if not ready else "degraded" if warnings else "ready",
+            "service": settings.APP_NAME,
+            "version": settings.APP_VERSION,
+            "checked_at": datetime.utcnow().isoformat(),
+            "warnings": warnings,
+            "database": database,
+            "pool": pool,
+            "outbox": {"running": email_outbox.is_running(), **(outbox or {})},
+            "caches": self.check_caches(),
+            "llm": llm
+        }
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+# Global health service instance, configured from settings
+health_service = HealthService(
+    db_timeout=settings.HEALTH_DB_TIMEOUT,
+    pool_saturation_warn=settings.HEALTH_POOL_SATURATION_WARN,
+    cache_ttl=settings.HEALTH_READY_CACHE_TTL
+)
@@ -0,0 +1,191 @@
+"""
+Rule-based intent fast path for the AI reception
+Answers common reception questions from hotel data without calling the language model
+"""
+
+import re
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Messages that ask the assistant to act on a booking always go to the model
+ACTION_PATTERN = re.compile(
+    r"\b(book|reserve|cancel (?:my|the|a|this|booking|reservation)|my (?:booking|reservation)|"
+    r"booking id|confirmation number|modify|change my)\b",
+    re.IGNORECASE
+)
+
+INTENT_PATTERNS = {
+    "check_in": re.compile(r"\b(what time|when|time)\b.*\bcheck[\s-]?in\b|\bcheck[\s-]?in\b.*\b(time|when)\b", re.IGNORECASE),
+    "check_out": re.compile(r"\b(what time|when|time)\b.*\bcheck[\s-]?out\b|\bcheck[\s-]?out\b.*\b(time|when)\b", re.IGNORECASE),
+    "cancellation_policy": re.compile(r"\bcancell?ation\b|\bcancel\b.*\b(free|fee|policy|charge|refund)\b|\brefund", re.IGNORECASE),
+    "payment": re.compile(r"\b(payment|deposit|when do i pay|how do i pay|pay at)\b", re.IGNORECASE),
+    "pets": re.compile(r"\b(pets?|dogs?|cats?|pet[\s-]friendly)\b", re.IGNORECASE),
+    "smoking": re.compile(r"\bsmok(e|ing|er)\b", re.IGNORECASE),
+    "amenities": re.compile(r"\b(amenit(y|ies)|facilit(y|ies)|pool|swimming|gym|fitness|wi-?fi|internet|parking|valet|restaurant|room service|concierge|business cent(er|re))\b", re.IGNORECASE),
+    "room_types": re.compile(r"\b(room types|types of rooms?|kinds? of rooms?|what rooms|which rooms)\b", re.IGNORECASE),
+    "availability": re.compile(r"\b(available|availability|free|vacan(t|cy|cies)|any rooms?|open rooms?)\b", re.IGNORECASE),
+}
+
+# Amenity keywords mapped to the names used in HOTEL_CONTEXT
+AMENITY_KEYWORDS = {
+    "wifi": "Free WiFi", "wi-fi": "Free WiFi", "internet": "Free WiFi",
+    "pool": "Swimming Pool", "swimming": "Swimming Pool",
+    "gym": "Fitness Center", "fitness": "Fitness Center",
+    "restaurant": "Restaurant", "room service": "Room Service",
+    "concierge": "Concierge", "parking": "Valet Parking", "valet": "Valet Parking",
+    "business center": "Business Center", "business centre": "Business Center"
+}
+
+ISO_DATE_PATTERN = re.compile(r"\b\d{4}-\d{2}-\d{2}\b")
+
+def resolve_stay_dates(message: str, today: Optional[date] = None) -> Optional[Tuple[date, date]]:
+    """Resolve the stay dates a guest is asking about, or None if they are unclear"""
+    today = today or date.today()
+    text = message.lower()
+
+    iso_dates = ISO_DATE_PATTERN.findall(text)
+    if iso_dates:
+        try:
+            check_in = datetime.strptime(iso_dates[0], "%Y-%m-%d").date()
+            if len(iso_dates) > 1:
+                check_out = datetime.strptime(iso_dates[1], "%Y-%m-%d").date()
+            else:
+                check_out = check_in + timedelta(days=1)
+        except ValueError:
+            return None
+        return (check_in, check_out) if check_in < check_out else None
+
+    if "tonight" in text or "today" in text:
+        return today, today + timedelta(days=1)
+    if "tomorrow" in text:
+        return today + timedelta(days=1), today + timedelta(days=2)
+
+    if "weekend" in text:
+        # A weekend stay is Friday night to Sunday morning
+        if "next weekend" in text:
+            friday = today - timedelta(days=today.weekday()) + timedelta(days=11)
+        elif today.weekday() <= 4:
+            friday = today + timedelta(days=4 - today.weekday())
+        else:
+            # Already the weekend: from tonight until Sunday (or Monday on a Sunday)
+            return today, today + timedelta(days=max(1, 6 - today.weekday()))
+        return friday, friday + timedelta(days=2)
+
+    return None
+
+class IntentFastPath:
+    """
+    Keyword/regex intent classifier with templated answers.
+
+    Only short, unambiguous questions are answered here; anything that asks
+    for an action, matches several intents or cannot be filled from hotel
+    data returns None and goes to the language model.
+    """
+
+    MAX_MESSAGE_LENGTH = 200
+
+    def __init__(self, hotel_context: Dict, get_available_rooms_for_dates: Callable[[str, str], List[Dict]]):
+        self.hotel_context = hotel_context
+        self.get_available_rooms_for_dates = get_available_rooms_for_dates
+
+    def classify(self, message: str) -> Optional[str]:
+        """Return the single intent a message matches, or None"""
+        if len(message) > self.MAX_MESSAGE_LENGTH or ACTION_PATTERN.search(message):
+            return None
+
+        intents = [name for name, pattern in INTENT_PATTERNS.items() if pattern.search(message)]
+        if len(intents) == 1:
+            return intents[0]
+        # A room type question with dates is an availability question
+        if "availability" in intents and set(intents) <= {"availability", "room_types"}:
+            return "availability"
+        return None
+
+    def answer(self, message: str) -> Optional[Tuple[str, str]]:
+        """Return (intent, answer) for messages the fast path can handle, otherwise None"""
+        intent = self.classify(message)
+        if intent is None:
+            return None
+
+        response = getattr(self, f"_answer_{intent}")(message)
+        if response is None:
+            return None
+        return intent, response
+
+    def _answer_check_in(self, message: str) -> str:
+        policies = self.hotel_context["policies"]
+        return (f"Check-in at {self.hotel_context['name']} is from {policies['check_in']}, "
+                f"and check-out is by {policies['check_out']}. Let me know if you'd like to arrange an early arrival!")
+
+    def _answer_check_out(self, message: str) -> str:
+        policies = self.hotel_context["policies"]
+        return (f"Check-out is by {policies['check_out']} (check-in is from {policies['check_in']}). "
+                "Our concierge is happy to store your luggage if you're leaving later.")
+
+    def _answer_cancellation_policy(self, message: str) -> str:
+        return (f"Our cancellation policy: {self.hotel_context['policies']['cancellation']}. "
+                "To cancel, just give me your booking ID or the email address you booked with.")
+
+    def _answer_payment(self, message: str) -> str:
+        return f"Payment policy: {self.hotel_context['policies']['payment']}."
+
+    def _answer_pets(self, message: str) -> str:
+        return f"{self.hotel_context['policies']['pets']}. Please mention your pet when booking so we can prepare the room."
+
+    def _answer_smoking(self, message: str) -> str:
+        return f"{self.hotel_context['policies']['smoking']}."
+
+    def _answer_amenities(self, message: str) -> Optional[str]:
+        amenities = self.hotel_context["amenities"]
+        text = message.lower()
+        asked = []
+        for keyword, amenity in AMENITY_KEYWORDS.items():
+            if keyword in text and amenity in amenities and amenity not in asked:
+                asked.append(amenity)
+
+        if asked:
+            return f"Yes! {self.hotel_context['name']} offers {', '.join(asked)}. Our full amenities: {', '.join(amenities)}."
+        if re.search(r"amenit|facilit", text):
+            return f"{self.hotel_context['name']} offers: {', '.join(amenities)}."
+        return None
+
+    def _answer_room_types(self, message: str) -> str:
+        lines = [f"We offer {len(self.hotel_context['room_types'])} room types:"]
+        for room_type, details in self.hotel_context["room_types"].items():
+            lines.append(f"• {room_type}: {details['description']} (Capacity: {details['capacity']})")
+        return "\n".join(lines)
+
+    def _answer_availability(self, message: str) -> Optional[str]:
+        dates = resolve_stay_dates(message)
+        if dates is None:
+            return None
+        check_in, check_out = dates
+        if check_in < date.today():
+            return (f"I can only check availability for stays from today onwards, and "
+                    f"{check_in.strftime('%a %d %b %Y')} has already passed. Which dates would you like?")
+
+        text = message.lower()
+        room_type = next((name for name in self.hotel_context["room_types"] if name.lower() in text), None)
+
+        available_rooms = self.get_available_rooms_for_dates(check_in.isoformat(), check_out.isoformat())
+        stay = f"{check_in.strftime('%a %d %b')} to {check_out.strftime('%a %d %b %Y')}"
+
+        by_type: Dict[str, List[Dict]] = {}
+        for room in available_rooms:
+            by_type.setdefault(room["room_type"], []).append(room)
+
+        if room_type:
+            rooms = by_type.get(room_type, [])
+            if rooms:
+                lowest = min(room["price_per_night"] for room in rooms)
+                return (f"Good news! We have {len(rooms)} {room_type} room{'s' if len(rooms) != 1 else ''} "
+                        f"available from {stay}, from ₹{lowest}/night. Would you like me to book one? "
+                        "Just share your full name, email and phone number.")
+            others = ", ".join(sorted(by_type)) or "none"
+            return (f"I'm sorry, we have no {room_type} rooms available from {stay}. "
+                    f"Room types still available for those dates: {others}.")
+
+        if not by_type:
+            return f"I'm sorry, we're fully booked from {stay}."
+        summary = ", ".join(f"{len(rooms)} {name}" for name, rooms in sorted(by_type.items()))
+        return f"For {stay} we currently have: {summary}. Which room type would you like?"
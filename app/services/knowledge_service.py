@@ -0,0 +1,229 @@
+"""
+Local knowledge retrieval for the AI reception
+Indexes hotel documents with BM25 so only the passages relevant to a guest
+message are added to the AI prompt
+"""
+
+import hashlib
+import json
+import math
+import os
+import re
+import threading
+from collections import Counter
+from typing import Dict, List, Optional
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+HEADING_PATTERN = re.compile(r"^#{1,6}\s+(.*)$")
+
+STOPWORDS = frozenset("""
+a an and are as at be but by can do does for from has have how i if in is it its me my
+of on or our so than that the their them then there these they this to up us was we
+what when where which who will with would you your
+""".split())
+
+DOCUMENT_EXTENSIONS = (".md", ".txt")
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens without stopwords, with plural 's' stripped"""
+    tokens = []
+    for token in TOKEN_PATTERN.findall(text.lower()):
+        if token in STOPWORDS:
+            continue
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+def chunk_document(text: str, source: str, max_words: int = 120) -> List[Dict]:
+    """Split a markdown or text document into heading-scoped chunks of about max_words words"""
+    chunks = []
+    heading = ""
+    paragraph_lines: List[str] = []
+    current: List[str] = []
+    current_words = 0
+    in_code = False
+
+    def flush_chunk():
+        nonlocal current, current_words
+        if current:
+            chunks.append({"source": source, "title": heading, "text": "\n\n".join(current)})
+        current, current_words = [], 0
+
+    def flush_paragraph():
+        nonlocal paragraph_lines, current_words
+        paragraph = "\n".join(paragraph_lines).strip()
+        paragraph_lines = []
+        if not paragraph:
+            return
+        words = len(paragraph.split())
+        if current and current_words + words > max_words:
+            flush_chunk()
+        current.append(paragraph)
+        current_words += words
+
+    for line in text.splitlines():
+        if line.lstrip().startswith("```"):
+            in_code = not in_code
+        match = None if in_code else HEADING_PATTERN.match(line)
+        if match:
+            flush_paragraph()
+            flush_chunk()
+            heading = match.group(1).strip()
+        elif not line.strip() and not in_code:
+            flush_paragraph()
+        else:
+            paragraph_lines.append(line)
+    flush_paragraph()
+    flush_chunk()
+    return chunks
+
+class BM25Index:
+    """Okapi BM25 over a fixed list of chunks"""
+
+    def __init__(self, chunks: List[Dict], k1: float = 1.5, b: float = 0.75):
+        self.chunks = chunks
+        self.k1 = k1
+        self.b = b
+        self.lengths: List[int] = []
+        self.postings: Dict[str, List[List[int]]] = {}
+        for doc_id, chunk in enumerate(chunks):
+            tokens = tokenize(f"{chunk['title']} {chunk['text']}")
+            self.lengths.append(len(tokens))
+            for term, count in Counter(tokens).items():
+                self.postings.setdefault(term, []).append([doc_id, count])
+        self.average_length = sum(self.lengths) / len(self.lengths) if self.lengths else 0.0
+
+    def idf(self, term: str) -> float:
+        document_frequency = len(self.postings.get(term, ()))
+        return math.log(1 + (len(self.chunks) - document_frequency + 0.5) / (document_frequency + 0.5))
+
+    def search(self, query: str, k: int = 3, min_score: float = 0.0) -> List[Dict]:
+        """Return up to k chunks scoring above min_score, best first"""
+        scores: Dict[int, float] = {}
+        for term in set(tokenize(query)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = self.idf(term)
+            for doc_id, count in postings:
+                norm = self.k1 * (1 - self.b + self.b * self.lengths[doc_id] / self.average_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * count * (self.k1 + 1) / (count + norm)
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        return [
+            {**self.chunks[doc_id], "score": round(score, 3)}
+            for doc_id, score in ranked[:k] if score > min_score
+        ]
+
+    def to_dict(self) -> Dict:
+        return {"k1": self.k1, "b": self.b, "chunks": self.chunks,
+                "lengths": self.lengths, "postings": self.postings}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "BM25Index":
+        index = cls.__new__(cls)
+        index.k1 = data["k1"]
+        index.b = data["b"]
+        index.chunks = data["chunks"]
+        index.lengths = data["lengths"]
+        index.postings = data["postings"]
+        index.average_length = sum(index.lengths) / len(index.lengths) if index.lengths else 0.0
+        return index
+
+class KnowledgeBase:
+    """
+    BM25 index over the hotel's knowledge documents.
+
+    The index is built from every .md/.txt file in the configured
+    directories and saved to index_path. A saved index is reused while its
+    fingerprint (file names, sizes and modification times) still matches,
+    so restarts only re-index after the documents change.
+    """
+
+    def __init__(self, directories: List[str], index_path: str, top_k: int = 3,
+                 min_score: float = 1.0, max_words: int = 120):
+        self.directories = directories
+        self.index_path = index_path
+        self.top_k = top_k
+        self.min_score = min_score
+        self.max_words = max_words
+        self._index: Optional[BM25Index] = None
+        self._lock = threading.Lock()
+
+    def document_paths(self) -> List[str]:
+        paths = []
+        for directory in self.directories:
+            if not os.path.isdir(directory):
+                continue
+            for root, _, files in os.walk(directory):
+                for name in files:
+                    if name.lower().endswith(DOCUMENT_EXTENSIONS) and name.lower() != "readme.md":
+                        paths.append(os.path.join(root, name))
+        return sorted(paths)
+
+    def fingerprint(self, paths: List[str]) -> str:
+        """Digest of the document set, used to tell whether a saved index is stale"""
+        digest = hashlib.sha1()
+        for path in paths:
+            stat = os.stat(path)
+            digest.update(f"{path}:{stat.st_size}:{stat.st_mtime_ns}\n".encode("utf-8"))
+        digest.update(f"max_words={self.max_words}".encode("utf-8"))
+        return digest.hexdigest()
+
+    def build(self) -> BM25Index:
+        """Build the index from the documents and save it to index_path"""
+        paths = self.document_paths()
+        chunks = []
+        for path in paths:
+            with open(path, encoding="utf-8", errors="ignore") as document:
+                chunks.extend(chunk_document(document.read(), os.path.relpath(path), self.max_words))
+
+        index = BM25Index(chunks)
+        if self.index_path and paths:
+            os.makedirs(os.path.dirname(self.index_path) or ".", exist_ok=True)
+            tmp_path = f"{self.index_path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as index_file:
+                json.dump({"fingerprint": self.fingerprint(paths), "index": index.to_dict()}, index_file)
+            os.replace(tmp_path, self.index_path)
+        return index
+
+    def load(self) -> BM25Index:
+        """Load the saved index if it is current, otherwise rebuild it"""
+        if self.index_path and os.path.exists(self.index_path):
+            try:
+                with open(self.index_path, encoding="utf-8") as index_file:
+                    saved = json.load(index_file)
+                if saved["fingerprint"] == self.fingerprint(self.document_paths()):
+                    return BM25Index.from_dict(saved["index"])
+            except (OSError, ValueError, KeyError) as e:
+                print(f"⚠️  Rebuilding knowledge index, saved copy unusable: {e}")
+        return self.build()
+
+    @property
+    def index(self) -> BM25Index:
+        if self._index is None:
+            with self._lock:
+                if self._index is None:
+                    self._index = self.load()
+        return self._index
+
+    def search(self, query: str) -> List[Dict]:
+        """Top chunks for a guest message"""
+        if not self.index.chunks:
+            return []
+        return self.index.search(query, self.top_k, self.min_score)
+
+    def create_prompt(self, query: str) -> str:
+        """Prompt fragment with the passages relevant to a guest message, or an empty string"""
+        results = self.search(query)
+        if not results:
+            return ""
+        passages = "\n\n".join(
+            f"[{result['title'] or result['source']}]\n{result['text']}" for result in results
+        )
+        return f"""
+
+        RELEVANT HOTEL INFORMATION (use it if it helps answer the guest):
+{passages}
+        """
@@ -0,0 +1,193 @@
+"""
+Local mock completion backend for the AI reception
+Mimics the OpenAI chat completions client with scripted answers so the AI
+endpoints can be load-tested and profiled without network access
+"""
+
+import asyncio
+import json
+import random
+import re
+import time
+from types import SimpleNamespace
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Tuple
+from ..services.session_service import extract_booking_slots
+
+BOOKING_FIELDS = ("guest_name", "email", "phone", "check_in", "check_out", "room_type")
+
+DEFAULT_REPLY = (
+    "Thank you for contacting Grand Hotel! I'd be happy to help with rooms, bookings "
+    "and anything else you need during your stay."
+)
+
+class LatencyModel:
+    """Samples time-to-first-token in seconds from a fixed, uniform or lognormal distribution"""
+
+    DISTRIBUTIONS = ("fixed", "uniform", "lognormal")
+
+    def __init__(self, distribution: str = "lognormal", median_ms: float = 600, spread: float = 0.5,
+                 seed: Optional[int] = None):
+        if distribution not in self.DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution: {distribution}")
+        self.distribution = distribution
+        self.median = median_ms / 1000
+        self.spread = spread
+        self.random = random.Random(seed)
+
+    def sample(self) -> float:
+        """Draw one latency"""
+        if self.distribution == "fixed" or self.median <= 0:
+            return max(self.median, 0.0)
+        if self.distribution == "uniform":
+            # spread is the relative half-width around the median
+            return self.random.uniform(self.median * (1 - self.spread), self.median * (1 + self.spread))
+        return self.random.lognormvariate(0, self.spread) * self.median
+
+class MockCompletionBackend:
+    """
+    Produces scripted assistant replies with realistic timing.
+
+    Replies come from the first script rule whose pattern matches the latest
+    user message; a rule may also carry a tool call. Without a matching rule,
+    a conversation that has supplied every booking detail gets a book_room
+    tool call (or a BOOK_ROOM command when no tools were offered), like the
+    real model would send, and anything else gets a generic reply.
+    """
+
+    def __init__(self, latency: LatencyModel, tokens_per_second: float = 40,
+                 script: Optional[List[Dict]] = None, room_types: Iterable[str] = ()):
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.rules = [(re.compile(rule["pattern"], re.IGNORECASE), rule["response"], rule.get("tool"))
+                      for rule in script or []]
+        self.room_types = list(room_types)
+
+    @classmethod
+    def load_script(cls, path: str) -> List[Dict]:
+        """Load script rules from a JSON file of [{"pattern": ..., "response": ..., "tool": {"name": ..., "arguments": {...}}}]"""
+        with open(path, encoding="utf-8") as script_file:
+            return json.load(script_file)
+
+    def reply(self, messages: List[Dict], use_tools: bool = False) -> Tuple[str, List[Dict]]:
+        """Choose the reply text and tool calls for a conversation"""
+        user_messages = [msg["content"] for msg in messages if msg.get("role") == "user"]
+        latest = user_messages[-1] if user_messages else ""
+        for pattern, response, tool in self.rules:
+            if pattern.search(latest):
+                return response, [tool] if tool and use_tools else []
+
+        slots = {}
+        for content in user_messages:
+            slots.update(extract_booking_slots(content, self.room_types))
+        if all(field in slots for field in BOOKING_FIELDS):
+            booking = {field: slots[field] for field in BOOKING_FIELDS}
+            text = f"Wonderful, {slots['guest_name'].split()[0]}! I'm booking your {slots['room_type']} room now."
+            if use_tools:
+                return text, [{"name": "book_room", "arguments": booking}]
+            command = json.dumps(booking).replace('"', "'")
+            return f"{text} BOOK_ROOM: {command}", []
+        return DEFAULT_REPLY, []
+
+    def tool_call_objects(self, tool_calls: List[Dict]) -> List[SimpleNamespace]:
+        """OpenAI-style tool call objects"""
+        return [
+            SimpleNamespace(id=f"call_{index}", type="function", function=SimpleNamespace(
+                name=tool_call["name"], arguments=json.dumps(tool_call["arguments"])))
+            for index, tool_call in enumerate(tool_calls)
+        ]
+
+    def tokenize(self, text: str) -> List[str]:
+        """Split a reply into word-sized stream deltas"""
+        return re.findall(r"\S+\s*", text) or [text]
+
+    def usage(self, messages: List[Dict], tokens: List[str]) -> SimpleNamespace:
+        """Approximate token usage, ~4 characters per prompt token"""
+        prompt_tokens = sum(len(msg.get("content") or "") for msg in messages) // 4
+        return SimpleNamespace(prompt_tokens=prompt_tokens, completion_tokens=len(tokens),
+                               total_tokens=prompt_tokens + len(tokens))
+
+    def generation_time(self, tokens: List[str]) -> float:
+        """Seconds spent generating tokens after the first one arrives"""
+        if self.tokens_per_second <= 0:
+            return 0.0
+        return len(tokens) / self.tokens_per_second
+
+    def message(self, tokens: List[str], tool_calls: List[Dict]) -> SimpleNamespace:
+        """Non-streamed completion response"""
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(
+            role="assistant",
+            content="".join(tokens),
+            tool_calls=self.tool_call_objects(tool_calls) or None
+        ))])
+
+    def completion(self, messages: List[Dict], max_tokens: Optional[int] = None,
+                   use_tools: bool = False) -> SimpleNamespace:
+        """Blocking, non-streamed completion"""
+        text, tool_calls = self.reply(messages, use_tools)
+        tokens = self.tokenize(text)[:max_tokens]
+        time.sleep(self.latency.sample() + self.generation_time(tokens))
+        response = self.message(tokens, tool_calls)
+        response.usage = self.usage(messages, tokens)
+        return response
+
+    async def acompletion(self, messages: List[Dict], max_tokens: Optional[int] = None,
+                          use_tools: bool = False) -> SimpleNamespace:
+        """Non-streamed completion that waits without blocking the event loop"""
+        text, tool_calls = self.reply(messages, use_tools)
+        tokens = self.tokenize(text)[:max_tokens]
+        await asyncio.sleep(self.latency.sample() + self.generation_time(tokens))
+        response = self.message(tokens, tool_calls)
+        response.usage = self.usage(messages, tokens)
+        return response
+
+    async def astream(self, messages: List[Dict], max_tokens: Optional[int] = None,
+                      include_usage: bool = False, use_tools: bool = False) -> AsyncIterator[SimpleNamespace]:
+        """Streamed completion yielding OpenAI-style chunks at the configured token rate"""
+        text, tool_calls = self.reply(messages, use_tools)
+        tokens = self.tokenize(text)[:max_tokens]
+        await asyncio.sleep(self.latency.sample())
+        delay = 1 / self.tokens_per_second if self.tokens_per_second > 0 else 0
+        for index, token in enumerate(tokens):
+            if index and delay:
+                await asyncio.sleep(delay)
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=token, tool_calls=None))],
+                                  usage=None)
+        for index, tool_call in enumerate(self.tool_call_objects(tool_calls)):
+            # Like the real API: name first, then the arguments in pieces
+            arguments = tool_call.function.arguments
+            fragments = [SimpleNamespace(name=tool_call.function.name, arguments="")]
+            fragments += [SimpleNamespace(name=None, arguments=arguments[i:i + 16]) for i in range(0, len(arguments), 16)]
+            for function in fragments:
+                if delay:
+                    await asyncio.sleep(delay)
+                fragment = SimpleNamespace(index=index, id=tool_call.id if function.name else None, function=function)
+                yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=None, tool_calls=[fragment]))],
+                                      usage=None)
+        if include_usage:
+            yield SimpleNamespace(choices=[], usage=self.usage(messages, tokens))
+
+class _Completions:
+    def __init__(self, backend: MockCompletionBackend, is_async: bool):
+        self.backend = backend
+        self.is_async = is_async
+
+    def create(self, model: str = None, messages: List[Dict] = None, max_tokens: Optional[int] = None,
+               stream: bool = False, stream_options: Optional[Dict] = None, tools: Optional[List[Dict]] = None,
+               **kwargs):
+        use_tools = bool(tools)
+        if not self.is_async:
+            return self.backend.completion(messages, max_tokens, use_tools)
+        if stream:
+            include_usage = bool((stream_options or {}).get("include_usage"))
+            return self._create_stream(messages, max_tokens, include_usage, use_tools)
+        return self.backend.acompletion(messages, max_tokens, use_tools)
+
+    async def _create_stream(self, messages, max_tokens, include_usage, use_tools):
+        return self.backend.astream(messages, max_tokens, include_usage, use_tools)
+
+class MockOpenAIClient:
+    """Drop-in stand-in for ``OpenAI`` / ``AsyncOpenAI`` exposing ``chat.completions.create``"""
+
+    def __init__(self, backend: MockCompletionBackend, is_async: bool = False):
+        self.backend = backend
+        self.chat = SimpleNamespace(completions=_Completions(backend, is_async))
@@ -0,0 +1,207 @@
+"""
+Email outbox worker for Grand Hotel Management System
+Sends the booking, cancellation and reminder emails queued in the
+email_outbox table, retrying failed sends with exponential backoff
+"""
+
+import logging
+import random
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+from ..config.settings import settings
+from ..database.database import Database
+from .email_service import EmailService, email_service
+from .email_delivery_service import EmailDeliveryEngine
+
+BOOKING_EMAILS = ("booking_confirmation", "admin_booking_notification")
+CANCELLATION_EMAILS = ("cancellation_confirmation", "admin_cancellation_notification")
+ADMIN_EMAILS = ("admin_booking_notification", "admin_cancellation_notification")
+
+class EmailOutboxWorker:
+    """
+    Background thread that drains the email outbox.
+
+    Booking routes commit outbox rows together with the booking and return
+    straight away; this worker claims due rows in batches and sends each
+    batch concurrently through the EmailDeliveryEngine. A failed send is retried after retry_base * 2^(attempts - 1) seconds
+    (with jitter, capped at retry_max) until max_attempts is reached, then
+    the email is marked failed.
+
+    With a digest_interval, admin notifications are not sent one by one:
+    they wait in the outbox until digest_max_events have built up or the
+    oldest has waited digest_interval seconds, and then go out together as
+    one digest email.
+
+    Sent and failed emails are kept for retention_days (0 keeps them for
+    good) and then deleted, at most once an hour. Reminders queued in the
+    last day are never deleted, as they mark bookings already reminded.
+    """
+
+    PURGE_INTERVAL = timedelta(hours=1)
+
+    def __init__(self, db: Optional[Database] = None, sender: Optional[EmailService] = None,
+                 poll_interval: float = 5.0, batch_size: int = 20, max_attempts: int = 6,
+                 retry_base: float = 30.0, retry_max: float = 3600.0, lease_seconds: float = 300.0,
+                 engine: Optional[EmailDeliveryEngine] = None, digest_interval: float = 0,
+                 digest_max_events: int = 200, retention_days: float = 30):
+        self.db = db or Database()
+        self.sender = sender or email_service
+        self.engine = engine or EmailDeliveryEngine(self.sender)
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self.lease_seconds = lease_seconds
+        self.digest_interval = digest_interval
+        self.digest_max_events = digest_max_events
+        self.retention_days = retention_days
+        self._next_purge = datetime.min
+        self.logger = logging.getLogger(__name__)
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Start the worker thread"""
+        if self._thread is not None:
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="email-outbox", daemon=True)
+        self._thread.start()
+        self.logger.info("📬 Email outbox worker started")
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def stop(self, timeout: float = 10.0):
+        """Stop the worker thread after the batch it is sending"""
+        self._stopped.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+        self._thread = None
+
+    def notify(self):
+        """Wake the worker now instead of at the next poll, e.g. right after queueing an email"""
+        self._wakeup.set()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            try:
+                # Keep going while full batches come back, then wait for new work
+                while not self._stopped.is_set() and self.process_batch()["messages"] >= self.batch_size:
+                    pass
+                while self.digest_interval and not self._stopped.is_set() and self.process_digest() >= self.digest_max_events:
+                    pass
+                if datetime.utcnow() >= self._next_purge:
+                    self.purge_old_emails()
+            except Exception as e:
+                self.logger.error(f"Email outbox worker error: {e}")
+            self._wakeup.wait(self.poll_interval)
+            self._wakeup.clear()
+
+    def process_batch(self) -> Dict:
+        """Claim one batch of due emails, send it and record the outcomes; return the delivery report"""
+        emails = self.db.claim_outbox_emails(self.batch_size, self.lease_seconds,
+                                             exclude_kinds=ADMIN_EMAILS if self.digest_interval else ())
+        if not emails:
+            return {"messages": 0}
+        jobs = []
+        for email in emails:
+            booking_data, guest_data = self.email_arguments(email["payload"])
+            jobs.append({"id": email["id"], "kind": email["kind"], "booking": booking_data, "guest": guest_data})
+
+        results, report = self.engine.send_all_blocking(jobs)
+        for email, result in zip(emails, results):
+            self.record_outcome(email, result["status"] != "failed", result["error"])
+        return report
+
+    def process_digest(self) -> int:
+        """Send due admin notifications as one digest email; return how many events it covered"""
+        backlog = self.db.get_outbox_backlog(ADMIN_EMAILS)
+        if not backlog["count"]:
+            return 0
+        if (backlog["count"] < self.digest_max_events
+                and backlog["oldest"] > datetime.utcnow() - timedelta(seconds=self.digest_interval)):
+            return 0
+        emails = self.db.claim_outbox_emails(self.digest_max_events, self.lease_seconds, kinds=ADMIN_EMAILS)
+        if not emails:
+            return 0
+
+        events = []
+        for email in emails:
+            booking_data, guest_data = self.email_arguments(email["payload"])
+            events.append({"kind": email["kind"], "booking": booking_data, "guest": guest_data,
+                           "queued_at": email["created_at"]})
+        error = None
+        try:
+            built = self.sender.build_admin_digest(events)
+            if built is not None:
+                self.sender.deliver(*built)
+                self.logger.info(f"📨 Sent admin digest covering {len(events)} events")
+        except Exception as e:
+            error = str(e) or e.__class__.__name__
+        for email in emails:
+            self.record_outcome(email, error is None, error)
+        return len(emails)
+
+    def purge_old_emails(self) -> int:
+        """Delete sent and failed emails older than the retention period; return how many were deleted"""
+        self._next_purge = datetime.utcnow() + self.PURGE_INTERVAL
+        if not self.retention_days:
+            return 0
+        # At least a day, so today's reminders still mark their bookings as reminded
+        cutoff = datetime.utcnow() - timedelta(days=max(self.retention_days, 1))
+        deleted = self.db.purge_outbox_emails(cutoff)
+        if deleted:
+            self.logger.info(f"🧹 Deleted {deleted} outbox emails older than {self.retention_days} days")
+        return deleted
+
+    def record_outcome(self, email: Dict, sent: bool, error: Optional[str] = None):
+        """Mark a claimed email sent, schedule its retry, or give up on it"""
+        if sent:
+            self.db.complete_outbox_email(email["id"], sent=True)
+        elif email["kind"] not in EmailService.EMAIL_BUILDERS or email["attempts"] >= self.max_attempts:
+            self.logger.error(f"Giving up on {email['kind']} email {email['id']} after {email['attempts']} attempts: {error}")
+            self.db.complete_outbox_email(email["id"], sent=False, error=error)
+        else:
+            self.logger.warning(f"Retrying {email['kind']} email {email['id']} later: {error}")
+            self.db.complete_outbox_email(email["id"], sent=False, error=error,
+                                          retry_at=datetime.utcnow() + timedelta(seconds=self.retry_delay(email["attempts"])))
+
+    def retry_delay(self, attempts: int) -> float:
+        """Backoff before the next attempt, with up to 20% jitter so retries do not bunch up"""
+        delay = min(self.retry_base * 2 ** max(attempts - 1, 0), self.retry_max)
+        return delay * random.uniform(0.8, 1.0)
+
+    def email_arguments(self, payload: Dict):
+        """(booking_data, guest_data) for the EmailService senders, from the queued snapshot"""
+        booking = payload["booking"]
+        return {
+            "confirmation_number": f"BK{booking['id']:06d}",
+            "room_number": booking["room_number"],
+            "room_type": booking["room_type"],
+            "check_in_date": booking["check_in_date"],
+            "check_out_date": booking["check_out_date"],
+            "total_price": booking["total_price"]
+        }, payload["guest"]
+
+# Global email outbox worker, started with the application
+email_outbox = EmailOutboxWorker(
+    engine=EmailDeliveryEngine(
+        email_service,
+        max_in_flight=settings.EMAIL_DELIVERY_MAX_IN_FLIGHT,
+        domain_max_in_flight=settings.EMAIL_DOMAIN_MAX_IN_FLIGHT,
+        domain_rate=settings.EMAIL_DOMAIN_RATE
+    ),
+    poll_interval=settings.EMAIL_OUTBOX_POLL_INTERVAL,
+    batch_size=settings.EMAIL_OUTBOX_BATCH_SIZE,
+    max_attempts=settings.EMAIL_OUTBOX_MAX_ATTEMPTS,
+    retry_base=settings.EMAIL_OUTBOX_RETRY_BASE,
+    retry_max=settings.EMAIL_OUTBOX_RETRY_MAX,
+    digest_interval=settings.ADMIN_DIGEST_INTERVAL if settings.ADMIN_DIGEST_ENABLED else 0,
+    digest_max_events=settings.ADMIN_DIGEST_MAX_EVENTS,
+    retention_days=settings.EMAIL_OUTBOX_RETENTION_DAYS
+)
@@ -0,0 +1,96 @@
+"""
+Access token revocation for Grand Hotel Management System
+Revoked token ids are stored in the database, shared by all app workers,
+and mirrored in each worker's in-memory denylist
+"""
+
+import logging
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+from ..database.database import Database
+from ..utils.token_denylist import TokenDenylist
+
+class TokenRevocationService:
+    """
+    Revoked access tokens, checked in memory and shared through the database.
+
+    revoke() writes the token id to the revoked_tokens table as well as the
+    local TokenDenylist. A background thread copies revocations made by
+    other workers into the local denylist every sync_interval seconds and
+    deletes expired rows now and then. is_revoked() only reads the local
+    denylist, so authenticating a request never waits on the database; a
+    logout in another worker takes effect here within sync_interval.
+
+    start() is called by the application lifespan, never from a request;
+    until it has run, only revocations made in this process are seen.
+    """
+
+    # Re-read this far back on each sync, for revocations committed out of order
+    SYNC_OVERLAP = timedelta(seconds=5)
+
+    def __init__(self, db: Optional[Database] = None, sync_interval: float = 2.0, default_ttl: float = 1800.0):
+        self.db = db or Database()
+        self.sync_interval = sync_interval
+        self.default_ttl = default_ttl
+        self.denylist = TokenDenylist(default_ttl=default_ttl)
+        self.logger = logging.getLogger(__name__)
+        self._synced_until: Optional[datetime] = None
+        self._next_cleanup = datetime.min
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Load current revocations, then start syncing in the background"""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._stopped.clear()
+            self.sync()
+            self._thread = threading.Thread(target=self._run, name="token-revocations", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        with self._lock:
+            self._stopped.set()
+            if self._thread is not None:
+                self._thread.join(timeout=5)
+            self._thread = None
+
+    def revoke(self, token_id: str, expires_at: Optional[float] = None):
+        """Revoke a token id until expires_at (Unix time) in this worker at once and in the others on their next sync"""
+        expires_at = expires_at if expires_at is not None else time.time() + self.default_ttl
+        self.denylist.revoke(token_id, expires_at)
+        self.db.add_revoked_token(token_id, datetime.utcfromtimestamp(expires_at))
+
+    def is_revoked(self, token_id: str) -> bool:
+        """Whether a token id is revoked; in memory, no database access"""
+        return self.denylist.is_revoked(token_id)
+
+    def sync(self) -> int:
+        """Copy revocations recorded since the last sync into the local denylist; return how many were read"""
+        started = datetime.utcnow()
+        since = self._synced_until - self.SYNC_OVERLAP if self._synced_until else datetime.min
+        try:
+            rows = self.db.get_revoked_tokens_since(since)
+            if started >= self._next_cleanup:
+                self.db.delete_expired_revoked_tokens()
+                self._next_cleanup = started + timedelta(minutes=10)
+        except Exception as e:
+            self.logger.warning(f"Could not sync revoked tokens: {e}")
+            return 0
+        self.denylist.revoke_many(
+            (row["jti"], row["expires_at"].replace(tzinfo=timezone.utc).timestamp()) for row in rows
+        )
+        self._synced_until = started
+        return len(rows)
+
+    def _run(self):
+        while not self._stopped.wait(self.sync_interval):
+            self.sync()
+
+    def stats(self) -> Dict:
+        """Revoked tokens held in memory and last sync time"""
+        return {"revoked": len(self.denylist), "synced_until": self._synced_until.isoformat() if self._synced_until else None}
@@ -0,0 +1,119 @@
+"""
+Chat session store for the AI reception
+Keeps conversation history, the rolling summary and collected booking details server-side
+"""
+
+import json
+import re
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Optional
+from ..database.database import Database
+from ..utils.cache import TTLCache
+
+EMAIL_PATTERN = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+PHONE_PATTERN = re.compile(r"\+?\d[\d\s().-]{6,}\d")
+DATE_PATTERN = re.compile(r"\b\d{4}-\d{2}-\d{2}\b")
+NAME_PATTERN = re.compile(r"\b(?i:my name is|i am|i'm|this is)\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)+)")
+
+def extract_booking_slots(message: str, room_types: Iterable[str]) -> Dict:
+    """Extract booking details (name, email, phone, dates, room type) mentioned in a guest message"""
+    slots = {}
+
+    name = NAME_PATTERN.search(message)
+    if name:
+        slots["guest_name"] = name.group(1)
+
+    email = EMAIL_PATTERN.search(message)
+    if email:
+        slots["email"] = email.group(0)
+
+    # Search for a phone number only outside of dates and emails
+    phone = PHONE_PATTERN.search(EMAIL_PATTERN.sub(" ", DATE_PATTERN.sub(" ", message)))
+    if phone:
+        slots["phone"] = phone.group(0).strip()
+
+    dates = DATE_PATTERN.findall(message)
+    if len(dates) >= 2:
+        slots["check_in"], slots["check_out"] = dates[0], dates[1]
+    elif len(dates) == 1:
+        slots["check_in"] = dates[0]
+
+    message_lower = message.lower()
+    for room_type in room_types:
+        if room_type.lower() in message_lower:
+            slots["room_type"] = room_type
+            break
+
+    return slots
+
+class ChatSessionStore:
+    """
+    Bounded store for AI chat sessions.
+
+    Sessions live in an in-memory LRU cache with a time-to-live. When
+    persistence is enabled they are also written to the chat_sessions table,
+    so they survive restarts and cache evictions.
+    """
+
+    def __init__(self, maxsize: int = 10000, ttl: float = 86400, persist: bool = False,
+                 db: Optional[Database] = None):
+        self.ttl = ttl
+        self.persist = persist
+        self.db = db or (Database() if persist else None)
+        self.cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._last_purge = time.monotonic()
+
+    def create(self) -> Dict:
+        """Create and store a new empty session"""
+        now = datetime.utcnow().isoformat()
+        session = {
+            "session_id": uuid.uuid4().hex,
+            "history": [],
+            "summary": "",
+            "slots": {},
+            "created_at": now,
+            "updated_at": now
+        }
+        self.save(session)
+        self._purge_expired()
+        return session
+
+    def get(self, session_id: str) -> Optional[Dict]:
+        """Get a session by ID, or None if it does not exist or has expired"""
+        session = self.cache.get(session_id)
+        if session is not None or not self.persist:
+            return session
+
+        row = self.db.get_chat_session(session_id)
+        if not row:
+            return None
+        if row["updated_at"] and row["updated_at"] < datetime.utcnow() - timedelta(seconds=self.ttl):
+            self.db.delete_chat_session(session_id)
+            return None
+
+        session = json.loads(row["data"])
+        self.cache.set(session_id, session)
+        return session
+
+    def save(self, session: Dict):
+        """Store the current state of a session"""
+        session["updated_at"] = datetime.utcnow().isoformat()
+        self.cache.set(session["session_id"], session)
+        if self.persist:
+            self.db.save_chat_session(session["session_id"], json.dumps(session))
+
+    def delete(self, session_id: str) -> bool:
+        """Delete a session"""
+        found = self.cache.pop(session_id) is not None
+        if self.persist:
+            found = self.db.delete_chat_session(session_id) or found
+        return found
+
+    def _purge_expired(self):
+        """Remove expired persisted sessions, at most once per ten minutes"""
+        if not self.persist or time.monotonic() - self._last_purge < 600:
+            return
+        self._last_purge = time.monotonic()
+        self.db.delete_chat_sessions_before(datetime.utcnow() - timedelta(seconds=self.ttl))
@@ -0,0 +1,206 @@
+"""
+Token, cost and latency accounting for the AI reception
+Buffers a record for every AI call and appends them to the ai_calls table in batches
+"""
+
+import math
+import threading
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from ..database.database import Database
+
+# USD per million (prompt, completion) tokens
+MODEL_PRICES = {
+    "gpt-3.5-turbo": (0.50, 1.50),
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4-turbo": (10.00, 30.00),
+    "gpt-4": (30.00, 60.00),
+}
+
+OUTCOMES = ("answered", "booked", "cancelled", "fallback")
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of values (0 for no values)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(fraction * len(ordered)))
+    return ordered[rank - 1]
+
+def latency_summary(values: List[float]) -> Dict:
+    return {
+        "count": len(values),
+        "p50": round(percentile(values, 0.50), 1),
+        "p95": round(percentile(values, 0.95), 1)
+    }
+
+class AIUsageRecorder:
+    """
+    Append-only log of AI reception calls with batched writes.
+
+    record() only appends to an in-memory buffer, so it is safe to call from
+    the event loop. A background thread writes the buffer to the database
+    every flush_interval seconds, or as soon as batch_size records are
+    waiting. Records that fail to write are kept for the next flush, up to
+    max_buffer records. Records older than retention_days (0 keeps them for
+    good) are deleted by the same thread, at most once an hour.
+    """
+
+    PURGE_INTERVAL = timedelta(hours=1)
+
+    def __init__(self, db: Optional[Database] = None, batch_size: int = 50, flush_interval: float = 5.0,
+                 enabled: bool = True, prices: Optional[Dict[str, Tuple[float, float]]] = None,
+                 max_buffer: int = 10000, retention_days: float = 90):
+        self.db = db or Database()
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.enabled = enabled
+        self.prices = dict(MODEL_PRICES if prices is None else prices)
+        self.max_buffer = max_buffer
+        self.retention_days = retention_days
+        self.dropped = 0
+        self._next_purge = datetime.min
+        self._buffer: List[Dict] = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = False
+        self._thread: Optional[threading.Thread] = None
+
+    def price(self, model: Optional[str]) -> Tuple[float, float]:
+        """Prices for a model; dated variants such as gpt-4o-mini-2024-07-18 use their base model's"""
+        if not model:
+            return 0.0, 0.0
+        if model in self.prices:
+            return self.prices[model]
+        matches = [name for name in self.prices if model.startswith(f"{name}-")]
+        return self.prices[max(matches, key=len)] if matches else (0.0, 0.0)
+
+    def cost(self, model: Optional[str], prompt_tokens: int, completion_tokens: int) -> float:
+        prompt_price, completion_price = self.price(model)
+        return (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1_000_000
+
+    def record(self, endpoint: str, source: str, model: Optional[str], outcome: str,
+               prompt_tokens: int = 0, completion_tokens: int = 0, latency_ms: float = 0.0):
+        """Buffer one call record"""
+        if not self.enabled:
+            return
+        record = {
+            "created_at": datetime.utcnow(),
+            "endpoint": endpoint,
+            "source": source,
+            "model": model,
+            "outcome": outcome,
+            "prompt_tokens": prompt_tokens or 0,
+            "completion_tokens": completion_tokens or 0,
+            "latency_ms": round(latency_ms, 2),
+            "cost_usd": self.cost(model, prompt_tokens or 0, completion_tokens or 0)
+        }
+        with self._lock:
+            self._buffer.append(record)
+            pending = len(self._buffer)
+            if self._thread is None and not self._stopped:
+                self._thread = threading.Thread(target=self._run, name="ai-usage", daemon=True)
+                self._thread.start()
+        if pending >= self.batch_size:
+            self._wakeup.set()
+
+    def flush(self) -> int:
+        """Write buffered records to the database; return how many were written"""
+        with self._flush_lock:
+            with self._lock:
+                records, self._buffer = self._buffer, []
+            if not records:
+                return 0
+            try:
+                self.db.add_ai_calls(records)
+                return len(records)
+            except Exception as e:
+                print(f"⚠️  Could not write AI usage records, will retry: {e}")
+                with self._lock:
+                    self._buffer = records + self._buffer
+                    overflow = len(self._buffer) - self.max_buffer
+                    if overflow > 0:
+                        self.dropped += overflow
+                        del self._buffer[:overflow]
+                return 0
+
+    def _run(self):
+        while not self._stopped:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+            if datetime.utcnow() >= self._next_purge:
+                self.purge_old_calls()
+
+    def purge_old_calls(self) -> int:
+        """Delete call records older than the retention period; return how many were deleted"""
+        self._next_purge = datetime.utcnow() + self.PURGE_INTERVAL
+        if not self.retention_days:
+            return 0
+        try:
+            return self.db.purge_ai_calls(datetime.utcnow() - timedelta(days=self.retention_days))
+        except Exception as e:
+            print(f"⚠️  Could not delete old AI usage records: {e}")
+            return 0
+
+    def close(self):
+        """Stop the background writer and write what is left"""
+        self._stopped = True
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self.flush()
+
+    def summary(self, days: int = 7) -> Dict:
+        """Call counts, tokens, spend and p50/p95 latency over the last days, overall and per day"""
+        self.flush()
+        since = (datetime.utcnow() - timedelta(days=days - 1)).replace(hour=0, minute=0, second=0, microsecond=0)
+        # Sums are grouped in SQL; only the latencies are read call by call, for the percentiles
+        totals = self.db.get_ai_call_totals(since)
+        latencies = self.db.get_ai_call_latencies(since)
+
+        per_day = defaultdict(Counter)
+        outcomes, sources, overall = Counter(), Counter(), Counter()
+        for row in totals:
+            sums = Counter({key: row[key] or 0 for key in ("calls", "prompt_tokens", "completion_tokens", "cost_usd")})
+            if row["source"] == "model":
+                sums["model_calls"] = row["calls"]
+            per_day[row["day"]].update(sums)
+            overall.update(sums)
+            outcomes[row["outcome"]] += row["calls"]
+            sources[row["source"]] += row["calls"]
+
+        day_latencies, source_latencies = defaultdict(list), defaultdict(list)
+        for day, source, latency_ms in latencies:
+            day_latencies[day].append(latency_ms)
+            source_latencies[source].append(latency_ms)
+
+        daily = [{
+            "date": day,
+            "calls": per_day[day]["calls"],
+            "model_calls": per_day[day]["model_calls"],
+            "prompt_tokens": per_day[day]["prompt_tokens"],
+            "completion_tokens": per_day[day]["completion_tokens"],
+            "cost_usd": round(per_day[day]["cost_usd"], 6),
+            "latency_ms": latency_summary(day_latencies[day])
+        } for day in sorted(per_day)]
+
+        return {
+            "since": since.isoformat(),
+            "calls": overall["calls"],
+            "outcomes": {outcome: outcomes.get(outcome, 0) for outcome in OUTCOMES},
+            "sources": dict(sources),
+            "prompt_tokens": overall["prompt_tokens"],
+            "completion_tokens": overall["completion_tokens"],
+            "cost_usd": round(overall["cost_usd"], 6),
+            "latency_ms": {
+                "all": latency_summary([latency_ms for _, _, latency_ms in latencies]),
+                **{source: latency_summary(values) for source, values in sorted(source_latencies.items())}
+            },
+            "per_day": daily,
+            "pending_writes": len(self._buffer),
+            "dropped_records": self.dropped
+        }
@@ -0,0 +1,106 @@
+"""
+Compiled Jinja2 templates for the hotel emails
+"""
+
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from jinja2 import Environment, FileSystemLoader, StrictUndefined, select_autoescape
+from markupsafe import Markup
+
+TEMPLATE_DIR = Path(__file__).resolve().parent.parent / "templates" / "email"
+
+# Text part, and HTML part where the email has one
+EMAIL_TEMPLATES = {
+    "booking_confirmation": ("booking_confirmation.txt", "booking_confirmation.html"),
+    "cancellation_confirmation": ("cancellation_confirmation.txt", None),
+    "admin_booking_notification": ("admin_booking_notification.txt", None),
+    "admin_cancellation_notification": ("admin_cancellation_notification.txt", None),
+    "pre_arrival_reminder": ("pre_arrival_reminder.txt", None),
+}
+
+DIGEST_LABELS = {
+    "admin_booking_notification": "New booking",
+    "admin_cancellation_notification": "Cancelled",
+}
+
+@lru_cache(maxsize=1024)
+def stay_date(value: str) -> Tuple[datetime, str]:
+    """Parse a check-in/out ISO date once and format it for display; many bookings share the same dates"""
+    parsed = datetime.fromisoformat(value)
+    return parsed, parsed.strftime("%B %d, %Y at %I:%M %p")
+
+class EmailTemplates:
+    """
+    Email bodies rendered from templates compiled once.
+
+    All templates are loaded and compiled when this is created. Fragments
+    that only depend on HOTEL_INFO (the HTML head with its CSS block, and
+    the hotel footers) are rendered once here too and handed to every
+    template as static.*, so a message only renders its booking fields.
+    """
+
+    def __init__(self, hotel_info: Dict, template_dir: Path = TEMPLATE_DIR):
+        self.env = Environment(
+            loader=FileSystemLoader(str(template_dir)),
+            autoescape=select_autoescape(["html"]),
+            undefined=StrictUndefined,
+            auto_reload=False
+        )
+        hotel = {"hotel": hotel_info}
+        self.env.globals["static"] = {
+            "header": Markup(self.env.get_template("_header.html").render()),
+            "footer_html": Markup(self.env.get_template("_footer.html").render(hotel)),
+            "footer_text": self.env.get_template("_footer.txt").render(hotel),
+            "hotel_name": hotel_info["name"],
+            "hotel_address": hotel_info["address"],
+            "hotel_phone": hotel_info["phone"],
+            "hotel_email": hotel_info["email"],
+            "check_in_time": hotel_info["check_in_time"],
+        }
+        self.templates = {
+            kind: tuple(self.env.get_template(name) if name else None for name in names)
+            for kind, names in EMAIL_TEMPLATES.items()
+        }
+        self.digest_templates = (self.env.get_template("admin_digest.txt"), self.env.get_template("admin_digest.html"))
+
+    def context(self, booking_data: dict, guest_data: dict) -> Dict:
+        """Per-message template variables; each date is parsed once"""
+        check_in, check_in_text = stay_date(booking_data["check_in_date"])
+        check_out, check_out_text = stay_date(booking_data["check_out_date"])
+        return {
+            "booking": booking_data,
+            "guest": guest_data,
+            "guest_name": f"{guest_data['first_name']} {guest_data['last_name']}",
+            "check_in": check_in_text,
+            "check_out": check_out_text,
+            "nights": (check_out - check_in).days,
+            "total_price": f"${booking_data['total_price']:.2f}",
+        }
+
+    def render(self, kind: str, booking_data: dict, guest_data: dict) -> Tuple[str, Optional[str]]:
+        """(text body, HTML body or None) for an email kind"""
+        if kind not in self.templates:
+            raise ValueError(f"Unknown email kind: {kind}")
+        text_template, html_template = self.templates[kind]
+        context = self.context(booking_data, guest_data)
+        return text_template.render(context), html_template.render(context) if html_template else None
+
+    def render_digest(self, events: List[Dict]) -> Tuple[str, str]:
+        """(text body, HTML body) of one admin digest; events are {"kind", "booking", "guest", "queued_at"}"""
+        rows = [
+            {**self.context(event["booking"], event["guest"]), "kind": event["kind"],
+             "label": DIGEST_LABELS.get(event["kind"], event["kind"])}
+            for event in events
+        ]
+        queued = sorted(event["queued_at"] for event in events)
+        context = {
+            "events": rows,
+            "bookings": sum(1 for event in events if event["kind"] == "admin_booking_notification"),
+            "cancellations": sum(1 for event in events if event["kind"] == "admin_cancellation_notification"),
+            "first_queued": queued[0].strftime("%Y-%m-%d %H:%M") if queued else "",
+            "last_queued": queued[-1].strftime("%Y-%m-%d %H:%M") if queued else "",
+        }
+        text_template, html_template = self.digest_templates
+        return text_template.render(context), html_template.render(context)
@@ -0,0 +1,228 @@
+"""
+Concurrency limiting and circuit breaking for calls to the language model provider
+"""
+
+import asyncio
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Dict, Tuple, Type
+
+class LLMUnavailableError(Exception):
+    """Raised when an LLM call is refused without being attempted"""
+
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+class CircuitBreaker:
+    """
+    Opens after consecutive failures and fails fast until reset_timeout passes.
+
+    Once the timeout has passed a single trial call is let through
+    (half-open); its outcome closes the breaker again or re-opens it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Return whether a call may be attempted now"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+            if self.state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.consecutive_failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.consecutive_failures += 1
+            self._trial_in_flight = False
+            if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    self.times_opened += 1
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+    def release(self):
+        """Give up a trial slot without an outcome (e.g. the caller went away)"""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def retry_after(self) -> float:
+        """Seconds until an open breaker lets a trial call through"""
+        if self.state != self.OPEN:
+            return 0.0
+        return max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+
+class LLMCallGuard:
+    """
+    Bounds in-flight LLM calls and fails fast when the provider is unhealthy.
+
+    At most max_concurrency calls run at once. Up to max_queue more may wait
+    for a slot, each for at most queue_timeout seconds; anything beyond that
+    is refused immediately so request workers are never tied up waiting on
+    a slow provider. call_timeout is the deadline handed to each call.
+
+    Only errors that say the provider is unhealthy count towards opening the
+    breaker: timeouts, connection errors (connection_exceptions) and HTTP
+    429 or 5xx responses. Any other error, such as a 400 for a prompt that
+    is too long, is the caller's problem and leaves the breaker as it was.
+    """
+
+    def __init__(self, max_concurrency: int = 8, max_queue: int = 32, queue_timeout: float = 5.0,
+                 call_timeout: float = 20.0, breaker: CircuitBreaker = None,
+                 timeout_exceptions: Tuple[Type[BaseException], ...] = (TimeoutError,),
+                 connection_exceptions: Tuple[Type[BaseException], ...] = (ConnectionError,)):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.call_timeout = call_timeout
+        self.breaker = breaker or CircuitBreaker()
+        self.timeout_exceptions = timeout_exceptions
+        self.connection_exceptions = connection_exceptions
+        self._semaphore = threading.BoundedSemaphore(max_concurrency)
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.waiting = 0
+        self.max_waiting_seen = 0
+        self.calls = 0
+        self.failures = 0
+        self.timeouts = 0
+        self.client_errors = 0
+        self.rejected = {"breaker_open": 0, "queue_full": 0, "queue_timeout": 0}
+
+    def _reject(self, reason: str):
+        with self._lock:
+            self.rejected[reason] += 1
+        raise LLMUnavailableError(reason)
+
+    def _enter_queue(self):
+        if not self.breaker.allow():
+            self._reject("breaker_open")
+        with self._lock:
+            if self.waiting >= self.max_queue:
+                full = True
+            else:
+                full = False
+                self.waiting += 1
+                self.max_waiting_seen = max(self.max_waiting_seen, self.waiting)
+        if full:
+            self.breaker.release()
+            self._reject("queue_full")
+
+    def _leave_queue(self, acquired: bool):
+        with self._lock:
+            self.waiting -= 1
+            if acquired:
+                self.in_flight += 1
+                self.calls += 1
+        if not acquired:
+            self.breaker.release()
+            self._reject("queue_timeout")
+
+    def is_provider_failure(self, error: BaseException) -> bool:
+        """Whether an error means the provider is unhealthy: a timeout, a connection error, 429 or 5xx"""
+        if isinstance(error, self.timeout_exceptions + self.connection_exceptions):
+            return True
+        status_code = getattr(error, "status_code", None)
+        return isinstance(status_code, int) and (status_code == 429 or status_code >= 500)
+
+    def _finish(self, error: BaseException = None):
+        provider_failure = isinstance(error, Exception) and self.is_provider_failure(error)
+        with self._lock:
+            self.in_flight -= 1
+            if provider_failure:
+                self.failures += 1
+                if isinstance(error, self.timeout_exceptions):
+                    self.timeouts += 1
+            elif isinstance(error, Exception):
+                self.client_errors += 1
+        self._semaphore.release()
+        if provider_failure:
+            self.breaker.record_failure()
+        elif error is None:
+            self.breaker.record_success()
+        else:
+            # Cancelled by the caller, or a request the provider rejected: says nothing about its health
+            self.breaker.release()
+
+    @contextmanager
+    def slot(self):
+        """Hold an LLM call slot for the duration of a blocking call"""
+        self._enter_queue()
+        self._leave_queue(self._semaphore.acquire(timeout=self.queue_timeout))
+        try:
+            yield
+        except BaseException as e:
+            self._finish(e)
+            raise
+        self._finish()
+
+    @asynccontextmanager
+    async def aslot(self):
+        """Hold an LLM call slot from async code without blocking the event loop"""
+        self._enter_queue()
+        deadline = time.monotonic() + self.queue_timeout
+        acquired = self._semaphore.acquire(blocking=False)
+        delay = 0.005
+        try:
+            while not acquired and time.monotonic() < deadline:
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 0.05)
+                acquired = self._semaphore.acquire(blocking=False)
+        except BaseException:
+            # Cancelled while queued (e.g. the client went away): give back the queue place and any trial
+            with self._lock:
+                self.waiting -= 1
+            self.breaker.release()
+            raise
+        self._leave_queue(acquired)
+        try:
+            yield
+        except BaseException as e:
+            self._finish(e)
+            raise
+        self._finish()
+
+    def stats(self) -> Dict:
+        """Return queue depth, call counters and breaker state"""
+        return {
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self.in_flight,
+            "queue_depth": self.waiting,
+            "max_queue_depth_seen": self.max_waiting_seen,
+            "max_queue": self.max_queue,
+            "calls": self.calls,
+            "failures": self.failures,
+            "timeouts": self.timeouts,
+            "client_errors": self.client_errors,
+            "rejected": dict(self.rejected),
+            "breaker": {
+                "state": self.breaker.state,
+                "consecutive_failures": self.breaker.consecutive_failures,
+                "times_opened": self.breaker.times_opened,
+                "retry_after_seconds": round(self.breaker.retry_after(), 1)
+            }
+        }
@@ -0,0 +1,21 @@
+"""
+Password hashing for the local auth backend
+Kept free of app imports so process pool workers start quickly.
+"""
+
+_contexts = {}
+
+def _context(rounds: int):
+    # passlib is only imported where passwords are actually hashed
+    if rounds not in _contexts:
+        from passlib.context import CryptContext
+        _contexts[rounds] = CryptContext(schemes=["bcrypt"], bcrypt__rounds=rounds)
+    return _contexts[rounds]
+
+def hash_password(password: str, rounds: int = 12) -> str:
+    """bcrypt hash of password"""
+    return _context(rounds).hash(password)
+
+def verify_password(password: str, password_hash: str) -> bool:
+    """Whether password matches a bcrypt hash"""
+    return _context(12).verify(password, password_hash)
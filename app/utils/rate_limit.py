@@ -0,0 +1,111 @@
+"""
+In-app token-bucket rate limiting for expensive routes
+"""
+
+import hashlib
+import math
+import threading
+import time
+from typing import Optional, Sequence, Tuple
+from fastapi import HTTPException, Request
+from .cache import TTLCache
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+# Buckets of every limiter, keyed by (limiter name, client identity)
+_buckets = TTLCache(maxsize=100000, ttl=3600)
+_buckets_lock = threading.Lock()
+
+def parse_rate(rate: str) -> Tuple[int, int]:
+    """Parse "20/minute" into (20 requests, 60 seconds); "0" or "" disables the limit"""
+    if not rate or rate.strip() == "0":
+        return 0, 1
+    requests, _, period = rate.strip().partition("/")
+    period = period.strip().lower().rstrip("s") or "second"
+    if period not in PERIODS:
+        raise ValueError(f"Unknown rate limit period in {rate!r}; use second, minute, hour or day")
+    return int(requests), PERIODS[period]
+
+class RateLimiter:
+    """
+    FastAPI dependency enforcing a token bucket per client.
+
+    The client is the first identity available, in the order given by keys:
+    "user" (bearer token), "session" (chat session ID in the body, query or
+    path) or "ip". Buckets hold up to the configured number of requests and
+    refill evenly over the period. Rejected requests get a 429 with
+    Retry-After. Stack a second, "ip"-keyed limiter to stop clients from
+    dodging a per-session limit by opening new sessions.
+    """
+
+    def __init__(self, name: str, rate: str, keys: Sequence[str] = ("user", "session", "ip"),
+                 trust_proxy: bool = False, enabled: bool = True):
+        self.name = name
+        self.capacity, self.period = parse_rate(rate)
+        self.keys = tuple(keys)
+        self.trust_proxy = trust_proxy
+        self.enabled = enabled and self.capacity > 0
+        self.rejected = 0
+
+    async def __call__(self, request: Request):
+        if not self.enabled:
+            return
+        identity = await self.identify(request)
+        retry_after = self.take(identity)
+        if retry_after:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=429,
+                detail="Too many requests. Please wait a moment before trying again.",
+                headers={"Retry-After": str(math.ceil(retry_after))}
+            )
+
+    def take(self, identity: str) -> float:
+        """Take a token for identity; return 0 if allowed, otherwise seconds until one is free"""
+        refill_rate = self.capacity / self.period
+        now = time.monotonic()
+        key = (self.name, identity)
+        with _buckets_lock:
+            tokens, updated = _buckets.get(key) or (self.capacity, now)
+            tokens = min(self.capacity, tokens + (now - updated) * refill_rate)
+            if tokens < 1:
+                _buckets.set(key, (tokens, now), ttl=self.period)
+                return (1 - tokens) / refill_rate
+            # A bucket untouched for a full period is full again, so it can expire
+            _buckets.set(key, (tokens - 1, now), ttl=self.period)
+        return 0.0
+
+    async def identify(self, request: Request) -> str:
+        """Identity the bucket is keyed on"""
+        for key in self.keys:
+            if key == "user":
+                authorization = request.headers.get("authorization", "")
+                if authorization.lower().startswith("bearer "):
+                    token = authorization[7:].strip()
+                    return "user:" + hashlib.sha1(token.encode("utf-8")).hexdigest()
+            elif key == "session":
+                session_id = await self.session_id(request)
+                if session_id:
+                    return f"session:{session_id}"
+            elif key == "ip":
+                return f"ip:{self.client_ip(request)}"
+        return f"ip:{self.client_ip(request)}"
+
+    async def session_id(self, request: Request) -> Optional[str]:
+        session_id = request.path_params.get("session_id") or request.query_params.get("session_id")
+        if session_id or request.method not in ("POST", "PUT", "PATCH"):
+            return session_id
+        try:
+            # FastAPI has already read the body, so this does not consume it
+            body = await request.json()
+        except Exception:
+            return None
+        value = body.get("session_id") if isinstance(body, dict) else None
+        return value if isinstance(value, str) else None
+
+    def client_ip(self, request: Request) -> str:
+        if self.trust_proxy:
+            forwarded = request.headers.get("x-real-ip") or request.headers.get("x-forwarded-for", "").split(",")[0]
+            if forwarded.strip():
+                return forwarded.strip()
+        return request.client.host if request.client else "unknown"
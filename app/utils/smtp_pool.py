@@ -0,0 +1,199 @@
+"""
+Pool of authenticated, reusable SMTP sessions
+"""
+
+import smtplib
+import ssl
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Deque, Dict, Iterator, List, Optional, Union
+
+class SMTPPoolTimeout(Exception):
+    """Raised when no SMTP session frees up within the acquire timeout"""
+
+def is_connection_error(error: BaseException) -> bool:
+    """
+    Whether an error means the session is gone and must not go back into the pool.
+
+    SMTPException subclasses OSError, so SMTP replies such as a refused
+    recipient are told apart from socket errors here; 421 means the server
+    is closing the session.
+    """
+    if isinstance(error, (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError)):
+        return True
+    if isinstance(error, smtplib.SMTPResponseException):
+        return error.smtp_code == 421
+    return isinstance(error, OSError) and not isinstance(error, smtplib.SMTPException)
+
+class _PooledSMTP:
+    def __init__(self, server: smtplib.SMTP):
+        self.server = server
+        self.messages = 0
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+
+class SMTPConnectionPool:
+    """
+    Keeps up to max_size logged-in SMTP sessions open and reuses them.
+
+    A session is opened (connect, STARTTLS with the shared SSL context,
+    login) only when no idle one is available. An idle session is checked
+    with NOOP before reuse if it has been idle longer than noop_after
+    seconds, and closed instead if it has been idle longer than max_idle,
+    since providers drop idle sessions. Sessions are retired after
+    max_messages messages. A send that fails because the session dropped is
+    retried once on a newly opened session, never on another idle one.
+    """
+
+    def __init__(self, host: str, port: int, username: str, password: str, use_tls: bool = True,
+                 ssl_context: Optional[ssl.SSLContext] = None, max_size: int = 2, max_messages: int = 100,
+                 noop_after: float = 30.0, max_idle: float = 240.0, timeout: float = 30.0,
+                 acquire_timeout: float = 30.0):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.ssl_context = ssl_context or ssl.create_default_context()
+        self.max_size = max_size
+        self.max_messages = max_messages
+        self.noop_after = noop_after
+        self.max_idle = max_idle
+        self.timeout = timeout
+        self.acquire_timeout = acquire_timeout
+        self._idle: Deque[_PooledSMTP] = deque()
+        self._open = 0
+        self._condition = threading.Condition()
+        self.counters = {"logins": 0, "reused": 0, "noops": 0, "stale": 0, "retired": 0, "broken": 0, "messages": 0}
+
+    def _count(self, name: str):
+        with self._condition:
+            self.counters[name] += 1
+
+    def _connect(self) -> _PooledSMTP:
+        """Open and authenticate a new session"""
+        server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.use_tls:
+                server.starttls(context=self.ssl_context)
+            if self.username:
+                server.login(self.username, self.password)
+        except Exception:
+            self._close(server)
+            raise
+        self._count("logins")
+        return _PooledSMTP(server)
+
+    def _close(self, server: smtplib.SMTP):
+        try:
+            server.quit()
+        except Exception:
+            server.close()
+
+    def _is_usable(self, pooled: _PooledSMTP) -> bool:
+        """Whether an idle session can be reused, sending NOOP if it has been idle a while"""
+        idle_for = time.monotonic() - pooled.last_used
+        if idle_for > self.max_idle:
+            self._count("stale")
+            return False
+        if idle_for > self.noop_after:
+            self._count("noops")
+            try:
+                if pooled.server.noop()[0] == 250:
+                    return True
+            except OSError:
+                pass
+            self._count("stale")
+            return False
+        return True
+
+    def _acquire(self, fresh: bool = False) -> _PooledSMTP:
+        """An idle session that still works, or a new one; with fresh, always a new one"""
+        deadline = time.monotonic() + self.acquire_timeout
+        while True:
+            with self._condition:
+                while not self._idle and self._open >= self.max_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise SMTPPoolTimeout("Timed out waiting for a free SMTP connection")
+                    self._condition.wait(remaining)
+                pooled = self._idle.pop() if self._idle else None
+                if pooled is None:
+                    # Reserve the slot before the (slow) handshake, outside the lock
+                    self._open += 1
+
+            if pooled is not None and fresh:
+                # Take over the idle session's slot; it may have been dropped like the one that just failed
+                self._close(pooled.server)
+                pooled = None
+            if pooled is None:
+                try:
+                    return self._connect()
+                except Exception:
+                    self._discard(None)
+                    raise
+            if self._is_usable(pooled):
+                self._count("reused")
+                return pooled
+            self._discard(pooled)
+
+    def _release(self, pooled: _PooledSMTP):
+        pooled.last_used = time.monotonic()
+        if pooled.messages >= self.max_messages:
+            self._count("retired")
+            self._discard(pooled)
+            return
+        with self._condition:
+            self._idle.append(pooled)
+            self._condition.notify()
+
+    def _discard(self, pooled: Optional[_PooledSMTP]):
+        if pooled is not None:
+            self._close(pooled.server)
+        with self._condition:
+            self._open -= 1
+            self._condition.notify()
+
+    @contextmanager
+    def connection(self, fresh: bool = False) -> Iterator[smtplib.SMTP]:
+        """Borrow a logged-in SMTP session (a newly opened one with fresh); it is returned to the pool unless it broke"""
+        pooled = self._acquire(fresh)
+        try:
+            yield pooled.server
+        except BaseException as e:
+            if is_connection_error(e):
+                self._count("broken")
+                self._discard(pooled)
+            else:
+                # SMTP replies such as a refused recipient leave the session usable
+                self._release(pooled)
+            raise
+        pooled.messages += 1
+        self._count("messages")
+        self._release(pooled)
+
+    def send(self, from_addr: str, to_addrs: Union[str, List[str]], message: str) -> Dict:
+        """Send a message, retrying once on a fresh session if the pooled one was dropped"""
+        try:
+            with self.connection() as server:
+                return server.sendmail(from_addr, to_addrs, message)
+        except Exception as e:
+            if not is_connection_error(e):
+                raise
+        # Not another idle session: the server may have dropped all of them at once
+        with self.connection(fresh=True) as server:
+            return server.sendmail(from_addr, to_addrs, message)
+
+    def close(self):
+        """Close all idle sessions"""
+        with self._condition:
+            idle, self._idle = list(self._idle), deque()
+        for pooled in idle:
+            self._discard(pooled)
+
+    def stats(self) -> Dict:
+        """Open and idle sessions plus login, reuse and health-check counters"""
+        with self._condition:
+            return {"open": self._open, "idle": len(self._idle), "max_size": self.max_size, **self.counters}
@@ -0,0 +1,47 @@
+"""
+Local denylist of revoked access tokens
+"""
+
+import threading
+import time
+from typing import Dict, Iterable, Optional, Tuple
+
+class TokenDenylist:
+    """
+    Thread-safe set of revoked token ids, each kept until its token expires.
+
+    Lookups are a single dict read without taking the lock. Entries are
+    never evicted early (unlike an LRU cache, dropping one would make a
+    revoked token valid again); expired ones are purged as new tokens are
+    revoked.
+    """
+
+    def __init__(self, default_ttl: float = 1800.0):
+        self.default_ttl = default_ttl
+        self._expires: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._next_purge = 0.0
+
+    def revoke(self, token_id: str, expires_at: Optional[float] = None):
+        """Deny token_id until expires_at (a Unix timestamp, the token's exp claim)"""
+        self.revoke_many([(token_id, expires_at)])
+
+    def revoke_many(self, entries: Iterable[Tuple[str, Optional[float]]]):
+        """Deny several (token_id, expires_at) pairs at once"""
+        now = time.time()
+        with self._lock:
+            for token_id, expires_at in entries:
+                expires_at = expires_at if expires_at is not None else now + self.default_ttl
+                if expires_at <= now:
+                    continue
+                self._expires[token_id] = max(expires_at, self._expires.get(token_id, 0.0))
+            if now >= self._next_purge:
+                self._expires = {key: exp for key, exp in self._expires.items() if exp > now}
+                self._next_purge = now + 60
+
+    def is_revoked(self, token_id: str) -> bool:
+        expires_at = self._expires.get(token_id)
+        return expires_at is not None and expires_at > time.time()
+
+    def __len__(self) -> int:
+        return len(self._expires)
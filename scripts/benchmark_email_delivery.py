@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Benchmark bulk email delivery against the local SMTP stand-in
+Sends synthetic pre-arrival reminders once the old way (a new connection
+and login per message, one at a time, timed on a sample and extrapolated)
+and once through the EmailDeliveryEngine over pooled sessions:
+
+    python scripts/benchmark_email_delivery.py --messages 1500 --handshake-ms 300 --data-ms 100
+
+--handshake-ms and --data-ms set the stand-in's greeting/login and
+per-message delays; pick values measured against your provider.
+"""
+
+import argparse
+import os
+import smtplib
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from smtp_stand_in import SMTPStandIn
+
+DOMAINS = ["gmail.com", "yahoo.com", "outlook.com", "hotmail.com", "icloud.com", "example.org"]
+
+def make_jobs(count: int):
+    jobs = []
+    for index in range(count):
+        jobs.append({
+            "id": index,
+            "kind": "pre_arrival_reminder",
+            "booking": {
+                "confirmation_number": f"BK{index + 1:06d}",
+                "room_number": str(100 + index % 50),
+                "room_type": "Double",
+                "check_in_date": "2026-11-10T00:00:00",
+                "check_out_date": "2026-11-12T00:00:00",
+                "total_price": 240.0
+            },
+            "guest": {"first_name": "Guest", "last_name": str(index),
+                      "email": f"guest{index}@{DOMAINS[index % len(DOMAINS)]}"}
+        })
+    return jobs
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark bulk email delivery")
+    parser.add_argument("--messages", type=int, default=1500)
+    parser.add_argument("--handshake-ms", type=float, default=300)
+    parser.add_argument("--data-ms", type=float, default=100)
+    parser.add_argument("--in-flight", type=int, default=8, help="Concurrent sends (and pooled sessions)")
+    parser.add_argument("--domain-in-flight", type=int, default=4)
+    parser.add_argument("--domain-rate", default="0", help='Per-domain rate such as "600/minute"; 0 for none')
+    parser.add_argument("--serial-sample", type=int, default=20,
+                        help="Messages sent the old way to estimate the serial time")
+    args = parser.parse_args()
+
+    with SMTPStandIn(handshake_ms=args.handshake_ms, data_ms=args.data_ms) as stand_in:
+        os.environ.update(
+            SMTP_SERVER=stand_in.host, SMTP_PORT=str(stand_in.port), USE_TLS="False",
+            EMAIL_DEMO_MODE="False", EMAIL_ADDRESS="hotel@example.com", EMAIL_PASSWORD="stand-in",
+            SMTP_POOL_SIZE=str(args.in_flight), ENABLE_ADMIN_NOTIFICATIONS="False"
+        )
+        from app.services.email_service import EmailService
+        from app.services.email_delivery_service import EmailDeliveryEngine
+
+        sender = EmailService()
+        jobs = make_jobs(args.messages)
+
+        sample = jobs[:args.serial_sample]
+        started = time.perf_counter()
+        for job in sample:
+            recipient, msg = sender.build_email(job["kind"], job["booking"], job["guest"])
+            server = smtplib.SMTP(stand_in.host, stand_in.port)
+            server.login(sender.email_address, sender.email_password)
+            server.sendmail(sender.email_address, recipient, msg.as_string())
+            server.quit()
+        per_message = (time.perf_counter() - started) / max(len(sample), 1)
+        serial_estimate = per_message * args.messages
+        logins_before = stand_in.stats()["logins"]
+
+        engine = EmailDeliveryEngine(sender, max_in_flight=args.in_flight,
+                                     domain_max_in_flight=args.domain_in_flight, domain_rate=args.domain_rate)
+        _, report = engine.send_all_blocking(jobs)
+        sender.close()
+        logins = stand_in.stats()["logins"] - logins_before
+
+    print(f"📧 {args.messages} emails, handshake {args.handshake_ms:.0f} ms, message {args.data_ms:.0f} ms")
+    print(f"   Serial, login per message: {per_message * 1000:.0f} ms/email -> ~{serial_estimate:.0f}s "
+          f"({args.messages} logins), from {len(sample)} samples")
+    print(f"   Engine, {args.in_flight} in flight:   {report['elapsed_seconds']:.1f}s, "
+          f"{report['messages_per_second']} emails/s, {logins} logins, "
+          f"p50/p95 send {report['send_latency_ms']['p50']}/{report['send_latency_ms']['p95']} ms, "
+          f"{report['sent']} sent, {report['failed']} failed")
+    print(f"   Speed-up: {serial_estimate / report['elapsed_seconds']:.1f}x"
+          if report["elapsed_seconds"] else "")
+
+if __name__ == "__main__":
+    main()
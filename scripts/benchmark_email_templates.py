@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Benchmark email rendering
+Renders synthetic messages of every email kind with the compiled templates
+and reports messages per second for the template render alone, for the
+full MIME message, and for the serialized message handed to SMTP. For
+comparison it also times compiling the templates for every message, which
+is what the startup compilation avoids:
+
+    python scripts/benchmark_email_templates.py --messages 5000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from benchmark_email_delivery import make_jobs
+
+def rate(count: int, seconds: float) -> str:
+    return f"{count / seconds:>9,.0f} msg/s ({seconds / count * 1e6:,.0f} µs each)" if seconds > 0 else "n/a"
+
+def timed(function, jobs) -> float:
+    started = time.perf_counter()
+    for job in jobs:
+        function(job)
+    return time.perf_counter() - started
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark email template rendering")
+    parser.add_argument("--messages", type=int, default=5000, help="Messages per email kind")
+    parser.add_argument("--compile-sample", type=int, default=50,
+                        help="Messages rendered with templates compiled per message")
+    args = parser.parse_args()
+
+    os.environ.setdefault("EMAIL_DEMO_MODE", "True")
+    from app.services.email_service import EmailService, HOTEL_INFO
+    from app.utils.email_templates import EmailTemplates
+
+    started = time.perf_counter()
+    sender = EmailService()
+    sender.templates
+    print(f"📧 Email service ready in {(time.perf_counter() - started) * 1000:.0f} ms (templates compiled)")
+
+    for kind in EmailService.EMAIL_BUILDERS:
+        jobs = make_jobs(args.messages)
+        for index, job in enumerate(jobs):
+            job["kind"] = kind
+            job["booking"]["check_in_date"] = f"2026-11-{index % 28 + 1:02d}T00:00:00"
+        render = timed(lambda job: sender.templates.render(kind, job["booking"], job["guest"]), jobs)
+        build = timed(lambda job: sender.build_email(kind, job["booking"], job["guest"]), jobs)
+        serialize = timed(lambda job: sender.build_email(kind, job["booking"], job["guest"])[1].as_string(), jobs)
+        sample = jobs[:args.compile_sample]
+        recompile = timed(lambda job: EmailTemplates(HOTEL_INFO).render(kind, job["booking"], job["guest"]), sample)
+
+        print(f"\n   {kind}")
+        print(f"      Render:                 {rate(len(jobs), render)}")
+        print(f"      MIME message:           {rate(len(jobs), build)}")
+        print(f"      Serialized for SMTP:    {rate(len(jobs), serialize)}")
+        print(f"      Compiled per message:   {rate(len(sample), recompile)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Benchmark application import time
+Imports app.main in fresh interpreters with python -X importtime and reports
+the median total and the slowest modules. Exits with status 1 if the import
+takes longer than the budget, or if an SDK that should only load on first
+use (OpenAI, Supabase, JWT, password hashing, templates) is imported eagerly:
+
+    python scripts/benchmark_import_time.py --runs 5 --budget-ms 1200
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+# Imported on first use by the services that need them, never by app.main
+DEFERRED_MODULES = ["openai", "supabase", "jose", "passlib", "jinja2", "httpx"]
+
+def import_times(module: str) -> List[Tuple[str, int, int]]:
+    """(module, self µs, cumulative µs) for every import made by a fresh interpreter importing module"""
+    env = dict(os.environ, PYTHONPATH=os.path.abspath(ROOT))
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=ROOT, env=env, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|")
+        rows.append((name.strip(), int(own), int(cumulative)))
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark application import time")
+    parser.add_argument("--module", default="app.main", help="Module to import")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters to time")
+    parser.add_argument("--budget-ms", type=float, default=1200, help="Median import time allowed")
+    parser.add_argument("--top", type=int, default=15, help="Slowest modules to list")
+    args = parser.parse_args()
+
+    totals = []
+    runs: List[List[Tuple[str, int, int]]] = []
+    for _ in range(args.runs):
+        rows = import_times(args.module)
+        runs.append(rows)
+        totals.append(next(cumulative for name, _, cumulative in rows if name == args.module) / 1000)
+    median = statistics.median(totals)
+
+    print(f"📦 import {args.module}: median {median:.0f} ms over {args.runs} runs "
+          f"(min {min(totals):.0f}, max {max(totals):.0f}; budget {args.budget_ms:.0f} ms)")
+
+    # Slowest top-level packages, and the application's own modules, from the median run
+    rows = runs[totals.index(sorted(totals)[len(totals) // 2])]
+    packages: Dict[str, int] = {}
+    for name, _, cumulative in rows:
+        if "." not in name or name.startswith("app."):
+            packages[name] = max(packages.get(name, 0), cumulative)
+    print(f"\n   Slowest imports (cumulative):")
+    for name, cumulative in sorted(packages.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"      {name:<40} {cumulative / 1000:>8.1f} ms")
+
+    imported = {name.split(".")[0] for name, _, _ in rows}
+    eager = [name for name in DEFERRED_MODULES if name in imported]
+    failed = False
+    if eager:
+        print(f"\n❌ Imported eagerly: {', '.join(eager)}")
+        failed = True
+    if median > args.budget_ms:
+        print(f"\n❌ Import time {median:.0f} ms is over the {args.budget_ms:.0f} ms budget")
+        failed = True
+    if not failed:
+        print("\n✅ Within budget")
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
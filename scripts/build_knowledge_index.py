@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Build the AI reception knowledge index ahead of time
+Indexes the documents in AI_KNOWLEDGE_DIRS and saves the index to
+AI_KNOWLEDGE_INDEX_PATH, optionally showing what a query retrieves
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from app.services.knowledge_service import KnowledgeBase
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the AI reception knowledge index")
+    parser.add_argument("--dirs", default=os.getenv("AI_KNOWLEDGE_DIRS", "knowledge"),
+                        help="Comma-separated document folders")
+    parser.add_argument("--index-path", default=os.getenv("AI_KNOWLEDGE_INDEX_PATH", "data/knowledge_index.json"))
+    parser.add_argument("--top-k", type=int, default=int(os.getenv("AI_KNOWLEDGE_TOP_K", "3")))
+    parser.add_argument("--min-score", type=float, default=float(os.getenv("AI_KNOWLEDGE_MIN_SCORE", "1.0")))
+    parser.add_argument("--query", help="Show the passages retrieved for this guest message")
+    args = parser.parse_args()
+
+    knowledge_base = KnowledgeBase(
+        directories=[d.strip() for d in args.dirs.split(",") if d.strip()],
+        index_path=args.index_path,
+        top_k=args.top_k,
+        min_score=args.min_score
+    )
+
+    paths = knowledge_base.document_paths()
+    if not paths:
+        print(f"⚠️  No .md or .txt documents found in: {args.dirs}")
+        return
+
+    started = time.perf_counter()
+    index = knowledge_base.build()
+    elapsed = (time.perf_counter() - started) * 1000
+    print(f"✅ Indexed {len(paths)} documents into {len(index.chunks)} chunks "
+          f"({len(index.postings)} terms) in {elapsed:.1f} ms")
+    print(f"💾 Saved to {args.index_path} ({os.path.getsize(args.index_path) / 1024:.1f} KB)")
+
+    if args.query:
+        knowledge_base._index = index
+        started = time.perf_counter()
+        results = knowledge_base.search(args.query)
+        elapsed = (time.perf_counter() - started) * 1000
+        print(f"\n🔍 {len(results)} passages for {args.query!r} in {elapsed:.2f} ms")
+        for result in results:
+            print(f"\n[{result['score']}] {result['source']} — {result['title']}")
+            print(result["text"][:300])
+
+if __name__ == "__main__":
+    main()
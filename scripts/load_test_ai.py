@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Load test for the AI reception chat endpoints
+Runs simulated guests that ask a question and then book a room through chat.
+
+By default the app runs in-process with the local mock completion backend
+(AI_BACKEND=mock), so no network access or OpenAI key is needed:
+
+    python scripts/load_test_ai.py --guests 200 --concurrency 50 --stream
+
+Use --url to target a running server instead, and --profile to write
+cProfile stats for an in-process run. The in-process transport delivers a
+streamed response in one piece, so first-token times are only meaningful
+with --url.
+"""
+
+import argparse
+import asyncio
+import cProfile
+import json
+import logging
+import os
+import random
+import statistics
+import sys
+import time
+import uuid
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+QUESTIONS = [
+    "Which room would suit a family of four?",
+    "I'm travelling for work, what do you recommend?",
+    "Can you tell me a bit about the hotel?",
+    "We're on our honeymoon, which room is the most romantic?",
+]
+
+FIRST_NAMES = ["Olivia", "Liam", "Priya", "Noah", "Amara", "Lucas", "Mei", "Omar"]
+LAST_NAMES = ["Smith", "Patel", "Garcia", "Chen", "Okafor", "Muller", "Rossi", "Khan"]
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+def seed_rooms(count):
+    """Make sure the local database has at least count rooms to book"""
+    from app.database.database import Database
+    from app.models.database_models import Base
+    from app.services.ai_service import HOTEL_CONTEXT
+
+    db = Database()
+    Base.metadata.create_all(bind=db.engine)
+    existing = {room["room_number"] for room in db.get_all_rooms()}
+    room_types = list(HOTEL_CONTEXT["room_types"])
+    added = 0
+    number = 900
+    while len(existing) + added < count:
+        number += 1
+        if str(number) in existing:
+            continue
+        db.create_room_in_db(str(number), room_types[number % len(room_types)], 100.0 + 50 * (number % len(room_types)))
+        added += 1
+    print(f"🛏️  {len(existing) + added} rooms in database ({added} added)")
+
+async def send(client, results, kind, payload, stream):
+    """Send one chat message and record its latency"""
+    started = time.perf_counter()
+    first_token = None
+    try:
+        if stream:
+            body = {}
+            async with client.stream("POST", "/ai/chat/stream", json=payload) as response:
+                response.raise_for_status()
+                event = None
+                async for line in response.aiter_lines():
+                    if line.startswith("event: "):
+                        event = line[7:]
+                        if event == "token" and first_token is None:
+                            first_token = time.perf_counter() - started
+                    elif line.startswith("data: ") and event in ("done", "error"):
+                        body = json.loads(line[6:])
+        else:
+            response = await client.post("/ai/chat", json=payload)
+            response.raise_for_status()
+            body = response.json()
+        ok = body.get("success", False)
+    except Exception as e:
+        body = {"error": str(e)}
+        ok = False
+
+    results.append({
+        "kind": kind,
+        "latency": time.perf_counter() - started,
+        "first_token": first_token,
+        "ok": ok,
+        "booked": bool(body.get("booking_processed")) and "BOOKING CONFIRMED" in body.get("response", ""),
+        "error": None if ok else body.get("error")
+    })
+
+async def run_guest(client, semaphore, results, guest, rng, stream):
+    """One guest: open a session, ask a question, then book with every detail in one message"""
+    async with semaphore:
+        response = await client.post("/ai/sessions")
+        session_id = response.json()["session_id"]
+
+        await send(client, results, "question", {"message": rng.choice(QUESTIONS), "session_id": session_id}, stream)
+
+        check_in = date.today() + timedelta(days=rng.randint(1, 90))
+        check_out = check_in + timedelta(days=rng.randint(1, 4))
+        room_type = rng.choice(["Single", "Double", "Suite", "Deluxe"])
+        message = (
+            f"My name is {rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}, email guest{guest}.{uuid.uuid4().hex[:6]}@example.com, "
+            f"phone +1 555 {1000 + guest % 9000}. Please book a {room_type} room from {check_in} to {check_out}."
+        )
+        await send(client, results, "booking", {"message": message, "session_id": session_id}, stream)
+
+async def run_load_test(args):
+    import httpx
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    if args.url:
+        transport = None
+        base_url = args.url
+    else:
+        from app.main import app
+        transport = httpx.ASGITransport(app=app)
+        base_url = "http://loadtest"
+
+    rng = random.Random(args.seed)
+    semaphore = asyncio.Semaphore(args.concurrency)
+    results = []
+    async with httpx.AsyncClient(transport=transport, base_url=base_url, timeout=args.timeout) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(run_guest(client, semaphore, results, guest, rng, args.stream)
+                               for guest in range(args.guests)))
+        elapsed = time.perf_counter() - started
+
+    if not args.url:
+        from app.services.ai_service import shutdown_ai_service
+        await shutdown_ai_service()
+    return results, elapsed
+
+def print_report(results, elapsed, args):
+    """Print latency percentiles and throughput"""
+    print("\n📊 AI Reception Load Test")
+    print("=" * 60)
+    print(f"Guests: {args.guests}  Concurrency: {args.concurrency}  Mode: {'stream' if args.stream else 'chat'}")
+    print(f"Requests: {len(results)} in {elapsed:.2f}s ({len(results) / elapsed:.1f} req/s)")
+    for kind in ("question", "booking"):
+        rows = [row for row in results if row["kind"] == kind]
+        latencies = [row["latency"] * 1000 for row in rows]
+        if not rows:
+            continue
+        print(f"\n{kind.title()} ({len(rows)} requests, {sum(not row['ok'] for row in rows)} failed)")
+        print(f"  latency ms  p50 {percentile(latencies, 50):8.1f}  p95 {percentile(latencies, 95):8.1f}  "
+              f"p99 {percentile(latencies, 99):8.1f}  max {max(latencies):8.1f}  mean {statistics.mean(latencies):8.1f}")
+        first_tokens = [row["first_token"] * 1000 for row in rows if row["first_token"] is not None]
+        if first_tokens:
+            print(f"  first token ms  p50 {percentile(first_tokens, 50):8.1f}  p95 {percentile(first_tokens, 95):8.1f}")
+
+    bookings = [row for row in results if row["kind"] == "booking"]
+    print(f"\n✅ Bookings confirmed: {sum(row['booked'] for row in bookings)}/{len(bookings)}")
+    errors = {row["error"] for row in results if row["error"]}
+    for error in list(errors)[:5]:
+        print(f"❌ {error}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the AI reception chat endpoints")
+    parser.add_argument("--url", help="Base URL of a running server (default: run the app in-process)")
+    parser.add_argument("--guests", type=int, default=100, help="Number of simulated guests")
+    parser.add_argument("--concurrency", type=int, default=20, help="Guests chatting at the same time")
+    parser.add_argument("--stream", action="store_true", help="Use the SSE streaming endpoint")
+    parser.add_argument("--seed-rooms", type=int, default=40, help="Rooms to make available (in-process only)")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed for guest messages")
+    parser.add_argument("--timeout", type=float, default=60, help="Per-request timeout in seconds")
+    parser.add_argument("--profile", metavar="FILE", help="Write cProfile stats to FILE (in-process only)")
+    args = parser.parse_args()
+
+    if not args.url:
+        os.environ.setdefault("AI_BACKEND", "mock")
+        # Every guest message is unique, but keep cached answers out of the measurements
+        os.environ.setdefault("AI_RESPONSE_CACHE_TTL", "0")
+        seed_rooms(args.seed_rooms)
+
+    profiler = cProfile.Profile() if args.profile and not args.url else None
+    if profiler:
+        profiler.enable()
+    results, elapsed = asyncio.run(run_load_test(args))
+    if profiler:
+        profiler.disable()
+        profiler.dump_stats(args.profile)
+        print(f"🔍 Profile written to {args.profile} (view with: python -m pstats {args.profile})")
+
+    print_report(results, elapsed, args)
+
+if __name__ == "__main__":
+    main()
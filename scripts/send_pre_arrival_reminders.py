@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Send pre-arrival reminders for a day's check-ins
+Queues one reminder per confirmed booking checking in on the given day
+(tomorrow by default) in the email outbox, then sends the outbox
+concurrently and prints a throughput report. Bookings that already have a
+reminder are skipped, so the script is safe to run again, e.g. from cron:
+
+    python scripts/send_pre_arrival_reminders.py --date 2026-11-10
+
+With --queue-only the running application's outbox worker sends them.
+"""
+
+import argparse
+import os
+import sys
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from app.database.database import Database
+from app.models.database_models import Base
+from app.services.outbox_service import EmailOutboxWorker, email_outbox
+
+def main():
+    parser = argparse.ArgumentParser(description="Send pre-arrival reminder emails")
+    parser.add_argument("--date", type=date.fromisoformat, default=date.today() + timedelta(days=1),
+                        help="Check-in day (YYYY-MM-DD), default tomorrow")
+    parser.add_argument("--queue-only", action="store_true", help="Queue reminders without sending them")
+    parser.add_argument("--batch-size", type=int, default=500, help="Emails claimed from the outbox per batch")
+    args = parser.parse_args()
+
+    db = Database()
+    Base.metadata.create_all(bind=db.engine)
+    queued = db.queue_pre_arrival_reminders(args.date)
+    print(f"📬 Queued {queued} pre-arrival reminders for check-ins on {args.date}")
+    if args.queue_only:
+        return
+
+    worker = EmailOutboxWorker(db=db, engine=email_outbox.engine, batch_size=args.batch_size,
+                               max_attempts=email_outbox.max_attempts, retry_base=email_outbox.retry_base,
+                               retry_max=email_outbox.retry_max,
+                               # Leave admin notifications to the digest when it is enabled
+                               digest_interval=email_outbox.digest_interval,
+                               digest_max_events=email_outbox.digest_max_events)
+    totals = {"messages": 0, "sent": 0, "failed": 0, "skipped": 0, "elapsed_seconds": 0.0}
+    while True:
+        report = worker.process_batch()
+        if not report["messages"]:
+            break
+        for key in totals:
+            totals[key] += report[key]
+        print(f"   Batch: {report['sent']} sent, {report['failed']} failed in {report['elapsed_seconds']}s "
+              f"({report['messages_per_second']}/s, p95 send {report['send_latency_ms']['p95']} ms, "
+              f"{report['smtp_logins']} SMTP logins)")
+        if report["messages"] < args.batch_size:
+            break
+
+    rate = totals["sent"] / totals["elapsed_seconds"] if totals["elapsed_seconds"] else 0.0
+    print(f"✅ Outbox drained: {totals['sent']} sent, {totals['failed']} failed, "
+          f"{totals['skipped']} skipped in {totals['elapsed_seconds']:.1f}s ({rate:.1f} emails/s)")
+    email_outbox.sender.close()
+
+if __name__ == "__main__":
+    main()
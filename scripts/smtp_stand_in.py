@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Local SMTP stand-in for testing email delivery without a real provider
+Accepts EHLO, AUTH, MAIL, RCPT, DATA, NOOP, RSET and QUIT, discards the
+messages and counts connections, logins and messages, so connection reuse
+can be checked:
+
+    python scripts/smtp_stand_in.py --port 2525 --handshake-ms 300
+
+then run the app with SMTP_SERVER=127.0.0.1 SMTP_PORT=2525 USE_TLS=False
+EMAIL_DEMO_MODE=False. STARTTLS is not offered. --handshake-ms delays each
+greeting and login and --data-ms each accepted message, like a remote
+provider would, and --idle-timeout drops idle sessions like providers do.
+"""
+
+import argparse
+import socketserver
+import threading
+import time
+from typing import Dict
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    def reply(self, line: str):
+        self.wfile.write(f"{line}\r\n".encode("utf-8"))
+
+    def handle(self):
+        stand_in: "SMTPStandIn" = self.server.stand_in
+        stand_in.count("connections")
+        self.connection.settimeout(stand_in.idle_timeout)
+        time.sleep(stand_in.handshake_delay)
+        self.reply("220 localhost SMTP stand-in ready")
+        try:
+            while True:
+                line = self.rfile.readline()
+                if not line:
+                    return
+                command = line.decode("utf-8", errors="replace").strip()
+                verb = command.split(" ", 1)[0].upper()
+                if verb in ("EHLO", "HELO"):
+                    self.reply("250-localhost")
+                    self.reply("250-AUTH PLAIN LOGIN")
+                    self.reply("250 8BITMIME")
+                elif verb == "AUTH":
+                    self.authenticate(command)
+                elif verb in ("MAIL", "RCPT", "RSET"):
+                    self.reply("250 OK")
+                elif verb == "NOOP":
+                    stand_in.count("noops")
+                    self.reply("250 OK")
+                elif verb == "DATA":
+                    self.reply("354 End data with <CR><LF>.<CR><LF>")
+                    while self.rfile.readline() not in (b".\r\n", b".\n", b""):
+                        pass
+                    time.sleep(stand_in.data_delay)
+                    stand_in.count("messages")
+                    self.reply("250 OK queued")
+                elif verb == "QUIT":
+                    self.reply("221 Bye")
+                    return
+                else:
+                    self.reply("502 Command not implemented")
+        except OSError:
+            # Idle timeout or client went away
+            stand_in.count("dropped")
+
+    def authenticate(self, command: str):
+        parts = command.split()
+        if len(parts) > 1 and parts[1].upper() == "LOGIN":
+            # Username (unless sent with the command) and password prompts
+            prompts = ("334 VXNlcm5hbWU6", "334 UGFzc3dvcmQ6")[len(parts) - 2:]
+            for prompt in prompts:
+                self.reply(prompt)
+                self.rfile.readline()
+        elif len(parts) == 2:
+            self.reply("334 ")
+            self.rfile.readline()
+        time.sleep(self.server.stand_in.handshake_delay)
+        self.server.stand_in.count("logins")
+        self.reply("235 Authentication successful")
+
+class SMTPStandIn:
+    """Threaded local SMTP server; use as a context manager or with start()/stop()"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, handshake_ms: float = 0,
+                 idle_timeout: float = 300, data_ms: float = 0):
+        self.handshake_delay = handshake_ms / 1000
+        self.data_delay = data_ms / 1000
+        self.idle_timeout = idle_timeout
+        self.counters = {"connections": 0, "logins": 0, "messages": 0, "noops": 0, "dropped": 0}
+        self._lock = threading.Lock()
+        socketserver.ThreadingTCPServer.allow_reuse_address = True
+        self.server = socketserver.ThreadingTCPServer((host, port), _SMTPHandler)
+        self.server.daemon_threads = True
+        self.server.stand_in = self
+        self.host, self.port = self.server.server_address[:2]
+        self._thread = None
+
+    def count(self, name: str):
+        with self._lock:
+            self.counters[name] += 1
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return dict(self.counters)
+
+    def start(self) -> "SMTPStandIn":
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local SMTP stand-in server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=2525)
+    parser.add_argument("--handshake-ms", type=float, default=0,
+                        help="Delay added to the greeting and to each login")
+    parser.add_argument("--data-ms", type=float, default=0,
+                        help="Delay before each message is accepted")
+    parser.add_argument("--idle-timeout", type=float, default=300,
+                        help="Seconds of inactivity before a session is dropped")
+    args = parser.parse_args()
+
+    stand_in = SMTPStandIn(args.host, args.port, args.handshake_ms, args.idle_timeout, args.data_ms).start()
+    print(f"📮 SMTP stand-in listening on {stand_in.host}:{stand_in.port} (Ctrl+C to stop)")
+    last = None
+    try:
+        while True:
+            time.sleep(1)
+            stats = stand_in.stats()
+            if stats != last:
+                print("   " + ", ".join(f"{name}={value}" for name, value in stats.items()))
+                last = stats
+    except KeyboardInterrupt:
+        stand_in.stop()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+Sync the local user directory with Supabase Auth
+Registration checks for an existing email with one indexed lookup in the
+user_directory table instead of listing every Supabase user. Logins and
+registrations keep it up to date; run this once to fill it for existing
+users, and from cron to pick up users created or deleted elsewhere:
+
+    python scripts/sync_user_directory.py
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from app.models.database_models import Base
+from app.services.auth_service import AuthService, directory_db
+
+def main():
+    parser = argparse.ArgumentParser(description="Sync the local user directory with Supabase Auth")
+    parser.add_argument("--per-page", type=int, default=1000, help="Users fetched per Supabase request")
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=directory_db.engine)
+    result = AuthService.sync_user_directory(per_page=args.per_page)
+    print(f"👥 User directory synced: {result['synced']} users from {result['pages']} pages, "
+          f"{result['removed']} removed")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Tests for the local auth backend
+"""
+
+import asyncio
+from concurrent.futures import Executor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from app.database.database import Database
+from app.models.database_models import Base
+from app.services.auth_backends import AuthBackend, LocalAuthBackend
+
+class BrokenExecutor(Executor):
+    """Process pool stand-in whose workers could not be started"""
+
+    def submit(self, fn, *args, **kwargs):
+        raise BrokenProcessPool("workers could not start")
+
+@pytest.fixture
+def backend(tmp_path):
+    db = Database()
+    db.DATABASE_URL = f"sqlite:///{tmp_path / 'users.db'}"
+    Base.metadata.create_all(bind=db.engine)
+    local = LocalAuthBackend(db=db, hash_workers=1, rounds=4)
+    local._executor = ThreadPoolExecutor(max_workers=1)
+    yield local
+    local.close()
+    db.engine.dispose()
+
+def test_create_and_authenticate(backend):
+    user = asyncio.run(backend.create_user("Ada@Example.com", "secret", {"role": "admin"}))
+    assert user.email == "ada@example.com"
+    assert user.user_metadata == {"role": "admin"}
+    authenticated = asyncio.run(backend.authenticate("ada@example.com", "secret"))
+    assert authenticated.id == user.id
+    assert [listed.id for listed in backend.list_users(1, 10)] == [user.id]
+
+def test_duplicate_email_is_rejected(backend):
+    asyncio.run(backend.create_user("ada@example.com", "secret", {}))
+    with pytest.raises(ValueError, match="already exists"):
+        asyncio.run(backend.create_user("ADA@example.com", "other", {}))
+
+def test_wrong_password_is_rejected(backend):
+    asyncio.run(backend.create_user("ada@example.com", "secret", {}))
+    assert asyncio.run(backend.authenticate("ada@example.com", "wrong")) is None
+
+def test_unknown_email_is_checked_against_a_dummy_hash(backend):
+    assert asyncio.run(backend.authenticate("nobody@example.com", "secret")) is None
+    assert backend._dummy_hash is not None
+
+def test_broken_process_pool_falls_back_to_threads(backend):
+    backend._executor = BrokenExecutor()
+    user = asyncio.run(backend.create_user("ada@example.com", "secret", {}))
+    assert isinstance(backend._executor, ThreadPoolExecutor)
+    assert asyncio.run(backend.authenticate("ada@example.com", "secret")).id == user.id
+
+def test_backend_must_implement_the_abstract_methods():
+    class Incomplete(AuthBackend):
+        async def authenticate(self, email, password):
+            return None
+
+    with pytest.raises(TypeError):
+        Incomplete()
@@ -0,0 +1,134 @@
+"""
+Tests for authenticating requests from token claims, revoking tokens on logout
+and rejecting duplicate registrations
+"""
+
+import asyncio
+import time
+from datetime import timedelta
+
+import pytest
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+
+from app.database.database import Database
+from app.models.auth_models import UserRegister
+from app.models.database_models import Base
+from app.services import auth_service
+from app.services.auth_backends import AuthUser
+from app.services.auth_service import AuthService, get_current_user
+from app.services.revocation_service import TokenRevocationService
+from app.utils.cache import TTLCache
+
+PROFILE = {"first_name": "Ada", "last_name": "Lovelace", "phone": None, "is_active": True,
+           "created_at": "2026-01-01T00:00:00"}
+
+class FakeBackend:
+    """Auth backend stand-in that counts user lookups and records created users"""
+
+    def __init__(self):
+        self.lookups = 0
+        self.created = []
+        self.create_error = None
+
+    async def get_user(self, token):
+        self.lookups += 1
+        return AuthUser(id="u-1", email="ada@example.com", user_metadata={"role": "user", "first_name": "Ada"},
+                        created_at="2026-01-01T00:00:00", email_confirmed_at="2026-01-01T00:00:00")
+
+    async def create_user(self, email, password, user_metadata):
+        if self.create_error:
+            raise self.create_error
+        self.created.append(email)
+        return AuthUser(id=f"u-{len(self.created)}", email=email, user_metadata=user_metadata,
+                        created_at="2026-01-01T00:00:00")
+
+@pytest.fixture
+def backend(tmp_path, monkeypatch):
+    db = Database()
+    db.DATABASE_URL = f"sqlite:///{tmp_path / 'auth.db'}"
+    Base.metadata.create_all(bind=db.engine)
+    fake = FakeBackend()
+    monkeypatch.setattr(auth_service, "auth_backend", fake)
+    monkeypatch.setattr(auth_service, "directory_db", db)
+    monkeypatch.setattr(auth_service, "user_cache", TTLCache(maxsize=10, ttl=600))
+    monkeypatch.setattr(auth_service, "token_revocations", TokenRevocationService(db, default_ttl=600))
+    yield fake
+    db.engine.dispose()
+
+def authenticate(token):
+    return asyncio.run(get_current_user(HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)))
+
+def test_user_comes_from_token_claims(backend):
+    token = AuthService.create_access_token({"sub": "ada@example.com", "role": "admin", "uid": "u-1", "profile": PROFILE})
+    user = authenticate(token)
+    assert (user.id, user.email, user.role.value, user.first_name) == ("u-1", "ada@example.com", "admin", "Ada")
+    assert backend.lookups == 0
+
+def test_token_without_profile_is_looked_up_once(backend):
+    token = AuthService.create_access_token({"sub": "ada@example.com", "role": "user"})
+    assert authenticate(token).id == "u-1"
+    assert authenticate(token).id == "u-1"
+    assert backend.lookups == 1
+
+def test_cached_user_never_outlives_the_token(backend):
+    token = AuthService.create_access_token({"sub": "ada@example.com", "role": "user"}, timedelta(seconds=30))
+    authenticate(token)
+    _, expires_at = auth_service.user_cache._data[auth_service._token_hash(token)]
+    assert expires_at - time.monotonic() <= 30
+
+def test_token_is_rejected_after_logout(backend):
+    token = AuthService.create_access_token({"sub": "ada@example.com", "role": "user", "uid": "u-1", "profile": PROFILE})
+    authenticate(token)
+    asyncio.run(AuthService.logout_user(token))
+    with pytest.raises(HTTPException) as error:
+        authenticate(token)
+    assert error.value.status_code == 401
+    other = AuthService.create_access_token({"sub": "ada@example.com", "role": "user", "uid": "u-1", "profile": PROFILE})
+    assert authenticate(other).id == "u-1"
+
+def test_logout_drops_the_cached_user(backend):
+    token = AuthService.create_access_token({"sub": "ada@example.com", "role": "user"})
+    authenticate(token)
+    asyncio.run(AuthService.logout_user(token))
+    assert len(auth_service.user_cache) == 0
+
+def test_expired_and_forged_tokens_are_rejected(backend):
+    expired = AuthService.create_access_token({"sub": "ada@example.com"}, timedelta(seconds=-1))
+    forged = AuthService.create_access_token({"sub": "ada@example.com"})[:-2] + "xx"
+    for token in (expired, forged):
+        with pytest.raises(HTTPException):
+            authenticate(token)
+
+def register(email="grace@example.com"):
+    return asyncio.run(AuthService.register_user(
+        UserRegister(email=email, password="secret", first_name="Grace", last_name="Hopper")
+    ))
+
+def test_registration_records_the_user_in_the_directory(backend):
+    user = register()
+    assert user.email == "grace@example.com"
+    assert backend.created == ["grace@example.com"]
+    assert auth_service.directory_db.user_email_exists("grace@example.com")
+
+def test_email_in_the_directory_is_rejected_without_asking_the_backend(backend):
+    register()
+    with pytest.raises(HTTPException) as error:
+        register()
+    assert error.value.status_code == 400
+    assert backend.created == ["grace@example.com"]
+
+@pytest.mark.parametrize("message", ["A user with this email address has already been registered",
+                                     "User already exists", "email_exists"])
+def test_provider_duplicate_error_is_rejected(backend, message):
+    backend.create_error = Exception(message)
+    with pytest.raises(HTTPException) as error:
+        register()
+    assert error.value.status_code == 400
+    assert error.value.detail == "User with this email already exists"
+
+def test_other_provider_errors_are_server_errors(backend):
+    backend.create_error = Exception("connection reset")
+    with pytest.raises(HTTPException) as error:
+        register()
+    assert error.value.status_code == 500
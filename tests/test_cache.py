@@ -0,0 +1,51 @@
+"""
+Tests for the TTL cache
+"""
+
+from app.utils.cache import TTLCache
+
+def test_get_and_set():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+    assert cache.get("missing", "default") == "default"
+    assert (cache.hits, cache.misses) == (1, 1)
+
+def test_expired_entry_is_dropped():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1, ttl=-1)
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+def test_per_entry_ttl_overrides_default():
+    cache = TTLCache(maxsize=2, ttl=-1)
+    cache.set("a", 1)
+    cache.set("b", 2, ttl=60)
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+
+def test_least_recently_used_is_evicted():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.evictions == 1
+
+def test_get_or_set_calls_factory_once():
+    cache = TTLCache(maxsize=2, ttl=60)
+    calls = []
+    factory = lambda: calls.append(1) or "value"
+    assert cache.get_or_set("k", factory) == "value"
+    assert cache.get_or_set("k", factory) == "value"
+    assert len(calls) == 1
+
+def test_pop_and_stats():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    assert cache.pop("a") == 1
+    assert cache.pop("a", "gone") == "gone"
+    assert cache.stats()["size"] == 0
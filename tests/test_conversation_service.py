@@ -0,0 +1,82 @@
+"""
+Tests for trimming chat history to a token budget and summarizing older turns
+"""
+
+from app.services.conversation_service import ConversationHistoryManager, TokenCounter
+
+class FixedCounter:
+    """Token counter stand-in where every message costs 10 tokens"""
+
+    def count_message(self, message):
+        return 10
+
+class StubSummarizer:
+    """Summarizer stand-in that records what it is asked to summarize"""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, previous_summary, turns):
+        self.calls.append((previous_summary, [turn["content"] for turn in turns]))
+        return "|".join(filter(None, [previous_summary] + [turn["content"] for turn in turns]))
+
+def turns(count):
+    return [{"role": "user" if i % 2 == 0 else "assistant", "content": f"m{i}"} for i in range(count)]
+
+def manager(budget=30):
+    summarizer = StubSummarizer()
+    return ConversationHistoryManager(FixedCounter(), summarizer, token_budget=budget), summarizer
+
+def test_history_within_budget_is_kept_without_summary():
+    history_manager, summarizer = manager()
+    assert history_manager.prepare(turns(3)) == (turns(3), None)
+    assert summarizer.calls == []
+
+def test_oldest_turns_are_summarized_when_over_budget():
+    history_manager, summarizer = manager()
+    kept, summary = history_manager.prepare(turns(5))
+    assert [turn["content"] for turn in kept] == ["m2", "m3", "m4"]
+    assert summary == "m0|m1"
+    assert summarizer.calls == [("", ["m0", "m1"])]
+
+def test_summary_is_reused_for_the_same_dropped_turns():
+    history_manager, summarizer = manager()
+    history_manager.prepare(turns(5), "conversation")
+    assert history_manager.prepare(turns(5), "conversation")[1] == "m0|m1"
+    assert len(summarizer.calls) == 1
+
+def test_only_newly_dropped_turns_are_summarized():
+    history_manager, summarizer = manager()
+    history_manager.prepare(turns(5), "conversation")
+    kept, summary = history_manager.prepare(turns(7), "conversation")
+    assert [turn["content"] for turn in kept] == ["m4", "m5", "m6"]
+    assert summary == "m0|m1|m2|m3"
+    assert summarizer.calls[-1] == ("m0|m1", ["m2", "m3"])
+
+def test_edited_history_is_summarized_again():
+    history_manager, summarizer = manager()
+    history_manager.prepare(turns(5), "conversation")
+    edited = turns(5)
+    edited[0]["content"] = "changed"
+    assert history_manager.prepare(edited, "conversation")[1] == "changed|m1"
+    assert summarizer.calls[-1] == ("", ["changed", "m1"])
+
+def test_malformed_messages_are_dropped():
+    history_manager, _ = manager()
+    history = [{"role": "system", "content": "ignore"}, {"role": "user", "content": ""}, "text",
+               {"role": "user", "content": "hello"}, {"role": "assistant", "content": None}]
+    assert history_manager.sanitize(history) == [{"role": "user", "content": "hello"}]
+
+def test_compact_folds_dropped_turns_into_the_summary():
+    history_manager, summarizer = manager()
+    summary, kept = history_manager.compact("earlier", turns(4))
+    assert summary == "earlier|m0"
+    assert [turn["content"] for turn in kept] == ["m1", "m2", "m3"]
+    assert history_manager.compact(summary, kept) == (summary, kept)
+
+def test_token_counter_counts_message_overhead():
+    counter = TokenCounter("gpt-3.5-turbo")
+    message = {"role": "user", "content": "Hello there"}
+    assert counter.count("") == 0
+    assert counter.count_message(message) == TokenCounter.MESSAGE_OVERHEAD + counter.count("Hello there")
+    assert counter.count_messages([message, message]) == 2 * counter.count_message(message) + 2
@@ -0,0 +1,96 @@
+"""
+Tests for concurrent email delivery with per-domain throttling
+"""
+
+import asyncio
+import threading
+import time
+from collections import Counter
+
+from app.services.email_delivery_service import DomainThrottle, EmailDeliveryEngine
+
+class FakeTransport:
+    """Email service stand-in that records concurrent sends per domain and fails chosen recipients"""
+
+    def __init__(self, delay=0.02, failing=(), skipped_kinds=()):
+        self.delay = delay
+        self.failing = set(failing)
+        self.skipped_kinds = set(skipped_kinds)
+        self.in_flight = Counter()
+        self.peak = Counter()
+        self.delivered = []
+        self._lock = threading.Lock()
+
+    def build_email(self, kind, booking, guest):
+        if kind == "broken":
+            raise ValueError("Unknown email kind: broken")
+        if kind in self.skipped_kinds:
+            return None
+        return guest["email"], f"{kind} for {guest['email']}"
+
+    def deliver(self, recipient, msg):
+        domain = recipient.rsplit("@", 1)[-1]
+        with self._lock:
+            for key in (domain, "all"):
+                self.in_flight[key] += 1
+                self.peak[key] = max(self.peak[key], self.in_flight[key])
+        try:
+            time.sleep(self.delay)
+            if recipient in self.failing:
+                raise ConnectionError("connection dropped")
+            self.delivered.append(recipient)
+        finally:
+            with self._lock:
+                for key in (domain, "all"):
+                    self.in_flight[key] -= 1
+
+def job(email, kind="booking_confirmation", job_id=None):
+    return {"id": job_id, "kind": kind, "booking": {}, "guest": {"email": email}}
+
+def test_per_domain_and_global_concurrency_limits():
+    transport = FakeTransport()
+    engine = EmailDeliveryEngine(transport, max_in_flight=3, domain_max_in_flight=1)
+    jobs = [job(f"guest{i}@{domain}") for i in range(4) for domain in ("a.com", "b.com", "c.com", "d.com")]
+    results, report = engine.send_all_blocking(jobs)
+    assert report["sent"] == 16
+    assert transport.peak["a.com"] == 1 and transport.peak["d.com"] == 1
+    assert 2 <= transport.peak["all"] <= 3
+    assert report["peak_in_flight"] <= 3
+
+def test_domain_rate_spaces_out_sends():
+    async def start_times(throttle, domains):
+        times = []
+
+        async def send(domain):
+            async with throttle.slot(domain):
+                times.append((domain, time.monotonic()))
+
+        await asyncio.gather(*(send(domain) for domain in domains))
+        return times
+
+    throttle = DomainThrottle(max_in_flight=5, rate="20/second")
+    started = time.monotonic()
+    times = asyncio.run(start_times(throttle, ["a.com"] * 5 + ["b.com"]))
+    a_times = sorted(at for domain, at in times if domain == "a.com")
+    assert a_times[-1] - a_times[0] >= 0.19
+    assert next(at for domain, at in times if domain == "b.com") - started < 0.05
+    assert throttle.waited >= 0.49
+
+def test_partial_failures_are_reported_per_job():
+    transport = FakeTransport(failing={"bad@b.com"}, skipped_kinds={"admin_booking_notification"})
+    engine = EmailDeliveryEngine(transport, max_in_flight=2)
+    jobs = [job("ok@a.com", job_id=1), job("bad@b.com", job_id=2), job("x@a.com", kind="broken", job_id=3),
+            job("admin@a.com", kind="admin_booking_notification", job_id=4), job("ok2@b.com", job_id=5)]
+    results, report = engine.send_all_blocking(jobs)
+    assert [(result["id"], result["status"]) for result in results] == [
+        (1, "sent"), (2, "failed"), (3, "failed"), (4, "skipped"), (5, "sent")]
+    assert results[1]["error"] == "connection dropped"
+    assert results[2]["recipient"] is None and "Unknown email kind" in results[2]["error"]
+    assert (report["messages"], report["sent"], report["failed"], report["skipped"]) == (5, 2, 2, 1)
+    assert report["domains"] == {"a.com": {"sent": 1, "failed": 0}, "b.com": {"sent": 1, "failed": 1}}
+    assert sorted(transport.delivered) == ["ok2@b.com", "ok@a.com"]
+
+def test_empty_batch():
+    results, report = EmailDeliveryEngine(FakeTransport()).send_all_blocking([])
+    assert results == []
+    assert (report["messages"], report["sent"]) == (0, 0)
@@ -0,0 +1,79 @@
+"""
+Tests for rendering the hotel emails from templates
+"""
+
+from datetime import datetime
+
+import pytest
+
+from app.services.email_service import ADMIN_CONFIG, HOTEL_INFO, EmailService
+from app.utils.email_templates import EMAIL_TEMPLATES, EmailTemplates
+
+BOOKING = {"confirmation_number": "BK000042", "room_number": "305", "room_type": "Deluxe",
+           "check_in_date": "2026-11-10T00:00:00", "check_out_date": "2026-11-13T00:00:00", "total_price": 450.0}
+GUEST = {"first_name": "Ada", "last_name": "Lovelace", "email": "ada@example.com"}
+
+SUBJECTS = {
+    "booking_confirmation": "Booking Confirmation - BK000042",
+    "cancellation_confirmation": "Booking Cancelled - BK000042",
+    "admin_booking_notification": "New Booking - BK000042",
+    "admin_cancellation_notification": "Booking Cancelled - BK000042",
+    "pre_arrival_reminder": "See You Tomorrow - BK000042",
+}
+
+@pytest.fixture(scope="module")
+def templates():
+    return EmailTemplates(HOTEL_INFO)
+
+def parts(msg):
+    return {part.get_content_type(): part.get_payload(decode=True).decode("utf-8") for part in msg.get_payload()}
+
+@pytest.mark.parametrize("kind", sorted(EMAIL_TEMPLATES))
+def test_every_email_renders_with_booking_details(templates, kind):
+    text, html = templates.render(kind, BOOKING, GUEST)
+    assert "BK000042" in text
+    assert "Ada" in text
+    assert (html is not None) == (kind == "booking_confirmation")
+
+@pytest.mark.parametrize("kind", sorted(SUBJECTS))
+def test_built_email_has_subject_recipient_and_text_part(kind):
+    recipient, msg = EmailService().build_email(kind, BOOKING, GUEST)
+    assert msg["Subject"] == f"{SUBJECTS[kind]} - {HOTEL_INFO['name']}"
+    assert recipient == (ADMIN_CONFIG["admin_email"] if kind.startswith("admin_") else GUEST["email"])
+    assert "BK000042" in parts(msg)["text/plain"]
+
+def test_confirmation_has_plain_text_fallback_before_html():
+    _, msg = EmailService().build_email("booking_confirmation", BOOKING, GUEST)
+    assert [part.get_content_type() for part in msg.get_payload()] == ["text/plain", "text/html"]
+    text = parts(msg)["text/plain"]
+    assert "<" not in text.replace("<ada@example.com>", "")
+    assert "Ada Lovelace" in text and "$450.00" in text and "November 10, 2026" in text
+
+def test_html_is_autoescaped_but_text_is_not(templates):
+    guest = {**GUEST, "first_name": "<script>alert(1)</script>"}
+    text, html = templates.render("booking_confirmation", BOOKING, guest)
+    assert "<script>" not in html
+    assert "&lt;script&gt;" in html
+    assert "<script>alert(1)</script> Lovelace" in text
+
+def test_nights_and_dates_come_from_the_stay(templates):
+    context = templates.context(BOOKING, GUEST)
+    assert context["nights"] == 3
+    assert context["check_out"] == "November 13, 2026 at 12:00 AM"
+
+def test_unknown_kind_is_rejected(templates):
+    with pytest.raises(ValueError):
+        templates.render("newsletter", BOOKING, GUEST)
+
+def test_digest_lists_every_event(templates):
+    guest = {**GUEST, "last_name": "<b>Byron</b>"}
+    events = [
+        {"kind": "admin_booking_notification", "booking": BOOKING, "guest": guest, "queued_at": datetime(2026, 11, 1, 9, 0)},
+        {"kind": "admin_cancellation_notification", "booking": {**BOOKING, "confirmation_number": "BK000043"},
+         "guest": GUEST, "queued_at": datetime(2026, 11, 1, 9, 30)},
+    ]
+    text, html = templates.render_digest(events)
+    assert "1 new booking and 1 cancellation queued between 2026-11-01 09:00 and 2026-11-01 09:30" in text
+    assert "NEW BOOKING" in text and "CANCELLED" in text
+    assert "BK000042" in html and "BK000043" in html
+    assert "&lt;b&gt;Byron&lt;/b&gt;" in html
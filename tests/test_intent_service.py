@@ -0,0 +1,85 @@
+"""
+Tests for the rule-based intent fast path and stay date resolution
+"""
+
+from datetime import date, timedelta
+
+import pytest
+
+from app.services.ai_service import HOTEL_CONTEXT
+from app.services.intent_service import IntentFastPath, resolve_stay_dates
+
+WEDNESDAY = date(2026, 11, 4)
+
+class FakeRooms:
+    """Availability lookup stand-in that records the dates it is asked about"""
+
+    def __init__(self, rooms):
+        self.rooms = rooms
+        self.calls = []
+
+    def __call__(self, check_in, check_out):
+        self.calls.append((check_in, check_out))
+        return self.rooms
+
+def fast_path(rooms=()):
+    return IntentFastPath(HOTEL_CONTEXT, FakeRooms(list(rooms)))
+
+@pytest.mark.parametrize("message, intent", [
+    ("What time is check-in?", "check_in"),
+    ("When is checkout?", "check_out"),
+    ("Can I bring my dog?", "pets"),
+    ("Do you have a pool?", "amenities"),
+    ("What is your cancellation policy?", "cancellation_policy"),
+    ("Any Deluxe rooms available tomorrow?", "availability"),
+])
+def test_classify_single_intent(message, intent):
+    assert fast_path().classify(message) == intent
+
+@pytest.mark.parametrize("message", [
+    "I want to book a room for tomorrow",
+    "Cancel my booking please",
+    "Is smoking allowed and can I bring pets?",
+    "What time is check-in? " + "Thanks! " * 30,
+    "Tell me a joke",
+])
+def test_classify_leaves_actions_and_ambiguous_messages_to_the_model(message):
+    assert fast_path().classify(message) is None
+
+def test_iso_dates():
+    assert resolve_stay_dates("rooms on 2026-12-01?", WEDNESDAY) == (date(2026, 12, 1), date(2026, 12, 2))
+    assert resolve_stay_dates("from 2026-12-01 to 2026-12-05", WEDNESDAY) == (date(2026, 12, 1), date(2026, 12, 5))
+    assert resolve_stay_dates("from 2026-12-05 to 2026-12-01", WEDNESDAY) is None
+    assert resolve_stay_dates("on 2026-13-45", WEDNESDAY) is None
+
+def test_relative_dates():
+    assert resolve_stay_dates("anything free tonight?", WEDNESDAY) == (WEDNESDAY, WEDNESDAY + timedelta(days=1))
+    assert resolve_stay_dates("a room tomorrow", WEDNESDAY) == (WEDNESDAY + timedelta(days=1), WEDNESDAY + timedelta(days=2))
+    assert resolve_stay_dates("any rooms soon?", WEDNESDAY) is None
+
+@pytest.mark.parametrize("today, stay", [
+    (WEDNESDAY, (date(2026, 11, 6), date(2026, 11, 8))),
+    (date(2026, 11, 6), (date(2026, 11, 6), date(2026, 11, 8))),
+    (date(2026, 11, 7), (date(2026, 11, 7), date(2026, 11, 8))),
+    (date(2026, 11, 8), (date(2026, 11, 8), date(2026, 11, 9))),
+])
+def test_this_weekend(today, stay):
+    assert resolve_stay_dates("rooms this weekend?", today) == stay
+
+@pytest.mark.parametrize("today", [WEDNESDAY, date(2026, 11, 6), date(2026, 11, 8)])
+def test_next_weekend_is_the_friday_of_next_week(today):
+    assert resolve_stay_dates("rooms next weekend?", today) == (date(2026, 11, 13), date(2026, 11, 15))
+
+def test_availability_answer_lists_rooms_by_type():
+    rooms = [{"room_type": "Deluxe", "price_per_night": 5000}, {"room_type": "Deluxe", "price_per_night": 4500},
+             {"room_type": "Standard", "price_per_night": 2500}]
+    intent, answer = fast_path(rooms).answer("Any Deluxe rooms available tomorrow?")
+    assert intent == "availability"
+    assert "2 Deluxe rooms" in answer and "₹4500" in answer
+
+def test_availability_for_a_past_date_is_not_looked_up():
+    path = fast_path([{"room_type": "Deluxe", "price_per_night": 5000}])
+    intent, answer = path.answer("Any rooms available on 2020-01-01?")
+    assert intent == "availability"
+    assert "already passed" in answer
+    assert path.get_available_rooms_for_dates.calls == []
@@ -0,0 +1,108 @@
+"""
+Tests for chunking hotel documents, BM25 ranking and the saved knowledge index
+"""
+
+import json
+
+import pytest
+
+from app.services.knowledge_service import BM25Index, KnowledgeBase, chunk_document, tokenize
+
+DOCUMENTS = {
+    "amenities.md": """# Pool
+
+The rooftop swimming pool is open from 7 AM to 10 PM. Towels are provided at the pool.
+
+# Spa
+
+The spa offers massages and facials. Book spa treatments at the front desk.
+""",
+    "dining.md": """# Restaurant
+
+Breakfast is served from 6:30 AM to 10:30 AM in the main restaurant.
+
+# Room Service
+
+Room service is available around the clock.
+""",
+    "parking.txt": "Valet parking costs 500 per night. Electric vehicle chargers are in the basement garage.",
+    "README.md": "This folder holds knowledge documents about the pool and everything else.",
+}
+
+@pytest.fixture
+def corpus(tmp_path):
+    directory = tmp_path / "knowledge"
+    directory.mkdir()
+    for name, text in DOCUMENTS.items():
+        (directory / name).write_text(text, encoding="utf-8")
+    return directory
+
+def knowledge_base(corpus, tmp_path):
+    return KnowledgeBase([str(corpus)], str(tmp_path / "data" / "index.json"), top_k=2, min_score=0.0)
+
+def test_tokenize_drops_stopwords_and_plurals():
+    assert tokenize("What are the Pool hours for guests?") == ["pool", "hour", "guest"]
+    assert tokenize("glass class") == ["glass", "class"]
+
+def test_chunks_are_scoped_by_heading():
+    chunks = chunk_document(DOCUMENTS["amenities.md"], "amenities.md")
+    assert [chunk["title"] for chunk in chunks] == ["Pool", "Spa"]
+    assert chunks[0]["text"].startswith("The rooftop swimming pool")
+    assert {chunk["source"] for chunk in chunks} == {"amenities.md"}
+
+def test_long_sections_split_at_paragraphs_without_overlap():
+    paragraphs = [" ".join(f"p{n}w{i}" for i in range(30)) for n in range(5)]
+    chunks = chunk_document("# Policies\n\n" + "\n\n".join(paragraphs), "policies.md", max_words=70)
+    assert [chunk["text"].split("\n\n") for chunk in chunks] == [paragraphs[0:2], paragraphs[2:4], paragraphs[4:5]]
+    assert all(chunk["title"] == "Policies" for chunk in chunks)
+
+def test_oversized_paragraph_is_kept_whole():
+    paragraph = " ".join(f"w{i}" for i in range(50))
+    assert [chunk["text"] for chunk in chunk_document(paragraph, "long.txt", max_words=10)] == [paragraph]
+
+def test_headings_inside_code_blocks_are_text():
+    text = "# Wifi\n\n```\n# not a heading\nnetwork: GrandHotel\n```\n"
+    chunks = chunk_document(text, "wifi.md")
+    assert len(chunks) == 1
+    assert "# not a heading" in chunks[0]["text"]
+
+def test_bm25_ranks_the_matching_chunk_first():
+    chunks = [chunk for name in ("amenities.md", "dining.md") for chunk in chunk_document(DOCUMENTS[name], name)]
+    index = BM25Index(chunks)
+    assert index.search("When is the pool open?")[0]["title"] == "Pool"
+    assert index.search("breakfast times", k=1)[0]["title"] == "Restaurant"
+    assert index.search("helicopter") == []
+    assert all(result["score"] > 1.0 for result in index.search("spa massage", min_score=1.0))
+
+def test_index_round_trips_through_a_dict():
+    index = BM25Index(chunk_document(DOCUMENTS["dining.md"], "dining.md"))
+    restored = BM25Index.from_dict(json.loads(json.dumps(index.to_dict())))
+    assert restored.search("room service") == index.search("room service")
+
+def test_build_indexes_documents_except_readme(corpus, tmp_path):
+    base = knowledge_base(corpus, tmp_path)
+    sources = {chunk["source"].rsplit("/", 1)[-1] for chunk in base.index.chunks}
+    assert sources == {"amenities.md", "dining.md", "parking.txt"}
+    assert (tmp_path / "data" / "index.json").exists()
+    assert base.search("valet parking")[0]["source"].endswith("parking.txt")
+
+def test_saved_index_is_reused_until_documents_change(corpus, tmp_path, monkeypatch):
+    knowledge_base(corpus, tmp_path).index
+    reloaded = knowledge_base(corpus, tmp_path)
+    monkeypatch.setattr(reloaded, "build", lambda: pytest.fail("index was rebuilt"))
+    assert reloaded.search("spa")[0]["title"] == "Spa"
+
+    (corpus / "parking.txt").write_text("Valet parking is free for suite guests. Ask the concierge.", encoding="utf-8")
+    changed = knowledge_base(corpus, tmp_path)
+    assert "free for suite guests" in changed.search("valet parking")[0]["text"]
+
+def test_unreadable_saved_index_is_rebuilt(corpus, tmp_path):
+    knowledge_base(corpus, tmp_path).index
+    (tmp_path / "data" / "index.json").write_text("{not json", encoding="utf-8")
+    assert knowledge_base(corpus, tmp_path).search("spa")[0]["title"] == "Spa"
+    assert json.loads((tmp_path / "data" / "index.json").read_text(encoding="utf-8"))["fingerprint"]
+
+def test_missing_directory_gives_no_passages(tmp_path):
+    base = KnowledgeBase([str(tmp_path / "missing")], str(tmp_path / "index.json"))
+    assert base.search("pool") == []
+    assert base.create_prompt("pool") == ""
@@ -0,0 +1,156 @@
+"""
+Tests for the LLM circuit breaker and call guard
+"""
+
+import asyncio
+
+import pytest
+
+from app.utils.llm_guard import CircuitBreaker, LLMCallGuard, LLMUnavailableError
+
+class ProviderError(Exception):
+    """Stand-in for an SDK error carrying an HTTP status code"""
+
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+def fail_call(guard, error):
+    with pytest.raises(type(error)):
+        with guard.slot():
+            raise error
+
+def test_breaker_opens_after_consecutive_failures():
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30)
+    for _ in range(2):
+        assert breaker.allow()
+        breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.times_opened == 1
+    assert not breaker.allow()
+    assert 0 < breaker.retry_after() <= 30
+
+def test_success_resets_failure_count():
+    breaker = CircuitBreaker(failure_threshold=2)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+def test_half_open_lets_one_trial_through():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    breaker.record_failure()
+    breaker.opened_at -= 31
+    assert breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert not breaker.allow()
+
+def test_half_open_trial_success_closes():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    breaker.record_failure()
+    breaker.opened_at -= 31
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow()
+
+def test_half_open_trial_failure_reopens():
+    breaker = CircuitBreaker(failure_threshold=5, reset_timeout=30)
+    for _ in range(5):
+        breaker.record_failure()
+    breaker.opened_at -= 31
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.times_opened == 2
+    assert not breaker.allow()
+
+def test_released_trial_can_be_retried():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    breaker.record_failure()
+    breaker.opened_at -= 31
+    assert breaker.allow()
+    breaker.release()
+    assert breaker.allow()
+
+@pytest.mark.parametrize("error", [TimeoutError(), ConnectionError(), ProviderError(429), ProviderError(500),
+                                   ProviderError(503)])
+def test_provider_failures_open_the_breaker(error):
+    guard = LLMCallGuard(breaker=CircuitBreaker(failure_threshold=2))
+    fail_call(guard, error)
+    fail_call(guard, error)
+    assert guard.breaker.state == CircuitBreaker.OPEN
+    assert guard.failures == 2
+    with pytest.raises(LLMUnavailableError):
+        with guard.slot():
+            pass
+    assert guard.rejected["breaker_open"] == 1
+
+@pytest.mark.parametrize("error", [ProviderError(400), ProviderError(404), ProviderError(422), ValueError("bad tool arguments")])
+def test_client_errors_leave_the_breaker_closed(error):
+    guard = LLMCallGuard(breaker=CircuitBreaker(failure_threshold=2))
+    for _ in range(5):
+        fail_call(guard, error)
+    assert guard.breaker.state == CircuitBreaker.CLOSED
+    assert guard.failures == 0
+    assert guard.client_errors == 5
+
+def test_client_error_releases_half_open_trial():
+    guard = LLMCallGuard(breaker=CircuitBreaker(failure_threshold=1, reset_timeout=30))
+    fail_call(guard, TimeoutError())
+    guard.breaker.opened_at -= 31
+    fail_call(guard, ProviderError(400))
+    assert guard.breaker.state == CircuitBreaker.HALF_OPEN
+    with guard.slot():
+        pass
+    assert guard.breaker.state == CircuitBreaker.CLOSED
+
+def test_timeouts_are_counted():
+    guard = LLMCallGuard(breaker=CircuitBreaker(failure_threshold=10))
+    fail_call(guard, TimeoutError())
+    fail_call(guard, ProviderError(502))
+    stats = guard.stats()
+    assert stats["failures"] == 2
+    assert stats["timeouts"] == 1
+    assert stats["in_flight"] == 0
+
+def test_cancelled_waiter_gives_back_its_queue_place():
+    async def scenario():
+        guard = LLMCallGuard(max_concurrency=1, max_queue=1, queue_timeout=5)
+        async with guard.aslot():
+            waiter = asyncio.create_task(guard.aslot().__aenter__())
+            await asyncio.sleep(0.02)
+            assert guard.stats()["queue_depth"] == 1
+            waiter.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await waiter
+            assert guard.stats()["queue_depth"] == 0
+        async with guard.aslot():
+            assert guard.stats()["in_flight"] == 1
+        return guard.stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["queue_depth"] == 0
+    assert stats["in_flight"] == 0
+    assert stats["rejected"]["queue_full"] == 0
+
+def test_cancelled_half_open_trial_is_released():
+    async def scenario():
+        guard = LLMCallGuard(max_concurrency=1, queue_timeout=5,
+                             breaker=CircuitBreaker(failure_threshold=1, reset_timeout=30))
+        guard._semaphore.acquire()
+        guard.breaker.record_failure()
+        guard.breaker.opened_at -= 31
+        waiter = asyncio.create_task(guard.aslot().__aenter__())
+        await asyncio.sleep(0.02)
+        assert guard.breaker.state == CircuitBreaker.HALF_OPEN
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        guard._semaphore.release()
+        return guard
+
+    guard = asyncio.run(scenario())
+    assert guard.breaker.allow()
@@ -0,0 +1,164 @@
+"""
+Tests for claiming and sending outbox emails, batching admin notifications into digests
+and deleting old emails
+"""
+
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.database.database import Database
+from app.models.database_models import Base, EmailOutbox
+from app.services.outbox_service import ADMIN_EMAILS, EmailOutboxWorker
+
+PAYLOAD = json.dumps({
+    "booking": {"id": 1, "room_number": "101", "room_type": "Deluxe", "check_in_date": "2026-11-10T00:00:00",
+                "check_out_date": "2026-11-12T00:00:00", "total_price": 300.0},
+    "guest": {"first_name": "Ada", "last_name": "Lovelace", "email": "ada@example.com"}
+})
+
+class FakeEngine:
+    """Delivery engine that records the jobs it is given and reports them all sent"""
+
+    def __init__(self):
+        self.jobs = []
+
+    def send_all_blocking(self, jobs):
+        self.jobs.extend(jobs)
+        return [{"status": "sent", "error": None} for _ in jobs], {"messages": len(jobs)}
+
+class FakeSender:
+    """Email service stand-in that records digests"""
+
+    def __init__(self):
+        self.digests = []
+
+    def build_admin_digest(self, events):
+        return "admin@example.com", events
+
+    def deliver(self, recipient, events):
+        self.digests.append(events)
+
+@pytest.fixture
+def db(tmp_path):
+    database = Database()
+    database.DATABASE_URL = f"sqlite:///{tmp_path / 'outbox.db'}"
+    Base.metadata.create_all(bind=database.engine)
+    yield database
+    database.engine.dispose()
+
+def queue(db, kind, created_at=None):
+    session = db.SessionLocal()
+    try:
+        email = EmailOutbox(kind=kind, booking_id=1, payload=PAYLOAD, created_at=created_at or datetime.utcnow())
+        session.add(email)
+        session.commit()
+        return email.id
+    finally:
+        session.close()
+
+def outbox_rows(db):
+    session = db.SessionLocal()
+    try:
+        return {email.id: (email.kind, email.status, email.attempts) for email in session.query(EmailOutbox)}
+    finally:
+        session.close()
+
+def expire_leases(db):
+    session = db.SessionLocal()
+    try:
+        session.query(EmailOutbox).update({EmailOutbox.next_attempt_at: datetime.utcnow() - timedelta(seconds=1)})
+        session.commit()
+    finally:
+        session.close()
+
+def test_claim_leases_emails(db):
+    email_id = queue(db, "booking_confirmation")
+    claimed = db.claim_outbox_emails(10, lease_seconds=300)
+    assert [email["id"] for email in claimed] == [email_id]
+    assert claimed[0]["attempts"] == 1
+    assert outbox_rows(db)[email_id][1] == "sending"
+    assert db.claim_outbox_emails(10, lease_seconds=300) == []
+
+def test_expired_lease_is_reclaimed(db):
+    email_id = queue(db, "booking_confirmation")
+    db.claim_outbox_emails(10, lease_seconds=300)
+    expire_leases(db)
+    reclaimed = db.claim_outbox_emails(10, lease_seconds=300)
+    assert [email["id"] for email in reclaimed] == [email_id]
+    assert reclaimed[0]["attempts"] == 2
+
+def test_claim_filters_kinds(db):
+    confirmation = queue(db, "booking_confirmation")
+    admin = queue(db, "admin_booking_notification")
+    assert [e["id"] for e in db.claim_outbox_emails(10, 300, exclude_kinds=ADMIN_EMAILS)] == [confirmation]
+    assert [e["id"] for e in db.claim_outbox_emails(10, 300, kinds=ADMIN_EMAILS)] == [admin]
+
+def test_sent_and_failed_emails_are_not_claimed(db):
+    sent = queue(db, "booking_confirmation")
+    failed = queue(db, "booking_confirmation")
+    db.claim_outbox_emails(10, 300)
+    db.complete_outbox_email(sent, sent=True)
+    db.complete_outbox_email(failed, sent=False, error="rejected")
+    expire_leases(db)
+    assert db.claim_outbox_emails(10, 300) == []
+    assert db.get_outbox_backlog()["count"] == 0
+
+def test_batch_sends_due_emails(db):
+    engine = FakeEngine()
+    worker = EmailOutboxWorker(db=db, engine=engine)
+    confirmation = queue(db, "booking_confirmation")
+    admin = queue(db, "admin_booking_notification")
+    assert worker.process_batch()["messages"] == 2
+    assert sorted(job["id"] for job in engine.jobs) == [confirmation, admin]
+    assert {status for _, status, _ in outbox_rows(db).values()} == {"sent"}
+    assert worker.process_batch()["messages"] == 0
+
+def test_batch_leaves_admin_emails_for_the_digest(db):
+    engine = FakeEngine()
+    worker = EmailOutboxWorker(db=db, sender=FakeSender(), engine=engine, digest_interval=60)
+    confirmation = queue(db, "booking_confirmation")
+    admin = queue(db, "admin_booking_notification")
+    assert worker.process_batch()["messages"] == 1
+    assert [job["id"] for job in engine.jobs] == [confirmation]
+    rows = outbox_rows(db)
+    assert rows[confirmation][1] == "sent"
+    assert rows[admin][1] == "pending"
+
+def test_digest_waits_for_interval_or_size(db):
+    sender = FakeSender()
+    worker = EmailOutboxWorker(db=db, sender=sender, engine=FakeEngine(), digest_interval=60, digest_max_events=3)
+    queue(db, "admin_booking_notification")
+    queue(db, "admin_cancellation_notification")
+    assert worker.process_digest() == 0
+    assert sender.digests == []
+
+    queue(db, "admin_booking_notification")
+    assert worker.process_digest() == 3
+    assert len(sender.digests) == 1
+    assert {event["kind"] for event in sender.digests[0]} == set(ADMIN_EMAILS)
+    assert {status for _, status, _ in outbox_rows(db).values()} == {"sent"}
+
+def test_digest_sends_once_oldest_is_due(db):
+    sender = FakeSender()
+    worker = EmailOutboxWorker(db=db, sender=sender, engine=FakeEngine(), digest_interval=60, digest_max_events=100)
+    queue(db, "admin_booking_notification", created_at=datetime.utcnow() - timedelta(seconds=120))
+    queue(db, "booking_confirmation")
+    assert worker.process_digest() == 1
+    assert [event["kind"] for event in sender.digests[0]] == ["admin_booking_notification"]
+    assert sorted(status for _, status, _ in outbox_rows(db).values()) == ["pending", "sent"]
+
+def test_purge_deletes_only_old_finished_emails(db):
+    old = datetime.utcnow() - timedelta(days=40)
+    sent, failed, pending = (queue(db, "booking_confirmation", created_at=old) for _ in range(3))
+    recent = queue(db, "booking_confirmation")
+    db.claim_outbox_emails(10, 300)
+    db.complete_outbox_email(sent, sent=True)
+    db.complete_outbox_email(failed, sent=False, error="rejected")
+    db.complete_outbox_email(recent, sent=True)
+    db.complete_outbox_email(pending, sent=False, error="timeout", retry_at=datetime.utcnow())
+    worker = EmailOutboxWorker(db=db, engine=FakeEngine(), retention_days=30)
+    assert worker.purge_old_emails() == 2
+    assert sorted(outbox_rows(db)) == sorted([pending, recent])
+    assert EmailOutboxWorker(db=db, engine=FakeEngine(), retention_days=0).purge_old_emails() == 0
@@ -0,0 +1,74 @@
+"""
+Tests for rate limit parsing, client identity and token buckets
+"""
+
+import asyncio
+import json
+
+import pytest
+from starlette.requests import Request
+
+from app.utils.rate_limit import RateLimiter, parse_rate
+
+def make_request(method="POST", headers=None, body=None, query="", path_params=None, client="10.0.0.1"):
+    payload = json.dumps(body).encode("utf-8") if body is not None else b""
+    scope = {
+        "type": "http",
+        "method": method,
+        "path": "/ai/chat",
+        "query_string": query.encode("utf-8"),
+        "headers": [(key.lower().encode("latin-1"), value.encode("latin-1")) for key, value in (headers or {}).items()],
+        "client": (client, 12345),
+        "path_params": path_params or {},
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": payload, "more_body": False}
+
+    return Request(scope, receive)
+
+def identify(limiter, request):
+    return asyncio.run(limiter.identify(request))
+
+def test_parse_rate():
+    assert parse_rate("20/minute") == (20, 60)
+    assert parse_rate("5/hours") == (5, 3600)
+    assert parse_rate("3") == (3, 1)
+    assert parse_rate("0") == (0, 1)
+    with pytest.raises(ValueError):
+        parse_rate("5/fortnight")
+
+def test_user_comes_before_session_and_ip():
+    limiter = RateLimiter("test", "10/minute")
+    request = make_request(headers={"Authorization": "Bearer abc"}, body={"session_id": "s1"})
+    assert identify(limiter, request).startswith("user:")
+
+def test_session_comes_before_ip():
+    limiter = RateLimiter("test", "10/minute")
+    assert identify(limiter, make_request(body={"session_id": "s1"})) == "session:s1"
+    assert identify(limiter, make_request(method="GET", query="session_id=s2")) == "session:s2"
+    assert identify(limiter, make_request(method="DELETE", path_params={"session_id": "s3"})) == "session:s3"
+
+def test_falls_back_to_ip():
+    limiter = RateLimiter("test", "10/minute")
+    assert identify(limiter, make_request(body={"message": "hi"})) == "ip:10.0.0.1"
+    assert identify(limiter, make_request(headers={"Authorization": "Basic xyz"})) == "ip:10.0.0.1"
+
+def test_keys_order_is_respected():
+    limiter = RateLimiter("test", "10/minute", keys=("ip",))
+    request = make_request(headers={"Authorization": "Bearer abc"}, body={"session_id": "s1"})
+    assert identify(limiter, request) == "ip:10.0.0.1"
+
+def test_proxy_headers_only_when_trusted():
+    headers = {"X-Real-IP": "203.0.113.9"}
+    assert identify(RateLimiter("test", "1/second", keys=("ip",)), make_request(headers=headers)) == "ip:10.0.0.1"
+    trusted = RateLimiter("test", "1/second", keys=("ip",), trust_proxy=True)
+    assert identify(trusted, make_request(headers=headers)) == "ip:203.0.113.9"
+
+def test_bucket_allows_capacity_then_rejects():
+    limiter = RateLimiter("test-bucket", "2/minute")
+    assert limiter.take("client") == 0.0
+    assert limiter.take("client") == 0.0
+    retry_after = limiter.take("client")
+    assert 0 < retry_after <= 30
+    assert limiter.take("other-client") == 0.0
@@ -0,0 +1,70 @@
+"""
+Tests for sharing token revocations between workers through the database
+"""
+
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.database.database import Database
+from app.models.database_models import Base
+from app.services.revocation_service import TokenRevocationService
+
+class UnavailableDatabase:
+    """Database stand-in that cannot be reached"""
+
+    def get_revoked_tokens_since(self, since):
+        raise ConnectionError("database unavailable")
+
+@pytest.fixture
+def db(tmp_path):
+    database = Database()
+    database.DATABASE_URL = f"sqlite:///{tmp_path / 'revocations.db'}"
+    Base.metadata.create_all(bind=database.engine)
+    yield database
+    database.engine.dispose()
+
+def test_revocation_is_seen_by_other_workers_after_sync(db):
+    worker, other = TokenRevocationService(db), TokenRevocationService(db)
+    worker.revoke("token", time.time() + 60)
+    assert worker.is_revoked("token")
+    assert not other.is_revoked("token")
+    assert other.sync() == 1
+    assert other.is_revoked("token")
+
+def test_sync_only_reads_recent_revocations(db):
+    worker, other = TokenRevocationService(db), TokenRevocationService(db)
+    worker.revoke("first", time.time() + 60)
+    other.sync()
+    other._synced_until += TokenRevocationService.SYNC_OVERLAP
+    worker.revoke("second", time.time() + 60)
+    assert other.sync() == 1
+    assert other.is_revoked("first") and other.is_revoked("second")
+
+def test_expired_revocations_are_not_loaded_and_are_deleted(db):
+    db.add_revoked_token("expired", datetime.utcnow() - timedelta(seconds=1))
+    db.add_revoked_token("live", datetime.utcnow() + timedelta(seconds=60))
+    service = TokenRevocationService(db)
+    assert service.sync() == 1
+    assert not service.is_revoked("expired")
+    assert service.is_revoked("live")
+    assert db.delete_expired_revoked_tokens() == 0
+
+def test_start_loads_revocations_before_returning(db):
+    TokenRevocationService(db).revoke("token", time.time() + 60)
+    service = TokenRevocationService(db, sync_interval=60)
+    service.start()
+    try:
+        assert service.is_revoked("token")
+        assert service.stats()["synced_until"] is not None
+    finally:
+        service.stop()
+
+def test_failed_sync_keeps_the_local_denylist(db):
+    service = TokenRevocationService(db)
+    service.revoke("token", time.time() + 60)
+    service.db = UnavailableDatabase()
+    assert service.sync() == 0
+    assert service.is_revoked("token")
+    assert service.stats()["synced_until"] is None
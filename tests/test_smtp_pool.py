@@ -0,0 +1,89 @@
+"""
+Tests for the SMTP connection pool against the local SMTP stand-in
+"""
+
+import smtplib
+import time
+
+import pytest
+
+from app.utils.smtp_pool import SMTPConnectionPool, is_connection_error
+from scripts.smtp_stand_in import SMTPStandIn
+
+MESSAGE = "Subject: Test\r\n\r\nHello"
+
+@pytest.fixture
+def stand_in():
+    with SMTPStandIn(idle_timeout=0.3) as server:
+        yield server
+
+def make_pool(stand_in, **options):
+    options.setdefault("max_size", 1)
+    return SMTPConnectionPool(stand_in.host, stand_in.port, "user", "secret", use_tls=False, **options)
+
+def send(pool, count=1):
+    for _ in range(count):
+        pool.send("hotel@example.com", "guest@example.com", MESSAGE)
+
+def test_session_is_reused(stand_in):
+    pool = make_pool(stand_in)
+    send(pool, 3)
+    pool.close()
+    assert stand_in.stats()["connections"] == 1
+    assert stand_in.stats()["logins"] == 1
+    assert stand_in.stats()["messages"] == 3
+    assert pool.stats()["reused"] == 2
+
+def test_session_is_retired_after_max_messages(stand_in):
+    pool = make_pool(stand_in, max_messages=2)
+    send(pool, 5)
+    pool.close()
+    assert stand_in.stats()["connections"] == 3
+    assert stand_in.stats()["messages"] == 5
+    assert pool.stats()["retired"] == 2
+
+def test_dropped_session_is_retried_on_a_new_one(stand_in):
+    pool = make_pool(stand_in)
+    send(pool)
+    time.sleep(0.6)
+    send(pool)
+    stats = pool.stats()
+    pool.close()
+    assert stats["broken"] == 1
+    assert stats["open"] == 1
+    assert stand_in.stats()["connections"] == 2
+    assert stand_in.stats()["messages"] == 2
+
+def test_retry_does_not_use_another_dropped_idle_session(stand_in):
+    pool = make_pool(stand_in, max_size=2)
+    with pool.connection() as first, pool.connection() as second:
+        first.noop()
+        second.noop()
+    assert pool.stats()["idle"] == 2
+    time.sleep(0.6)
+    send(pool)
+    stats = pool.stats()
+    pool.close()
+    assert stats["broken"] == 1
+    assert stats["open"] == 1
+    assert stand_in.stats()["messages"] == 1
+
+def test_idle_session_is_checked_with_noop(stand_in):
+    pool = make_pool(stand_in, noop_after=0.1)
+    send(pool)
+    time.sleep(0.6)
+    send(pool)
+    stats = pool.stats()
+    pool.close()
+    assert (stats["noops"], stats["stale"], stats["broken"]) == (1, 1, 0)
+    assert stand_in.stats()["messages"] == 2
+
+@pytest.mark.parametrize("error, expected", [
+    (smtplib.SMTPServerDisconnected("gone"), True),
+    (smtplib.SMTPResponseException(421, b"closing"), True),
+    (ConnectionResetError(), True),
+    (smtplib.SMTPRecipientsRefused({}), False),
+    (smtplib.SMTPResponseException(550, b"mailbox unavailable"), False),
+])
+def test_connection_errors(error, expected):
+    assert is_connection_error(error) is expected
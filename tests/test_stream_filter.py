@@ -0,0 +1,55 @@
+"""
+Tests for separating booking commands from streamed AI answers
+"""
+
+from app.services.ai_service import CommandStreamFilter
+
+def run(deltas):
+    stream = CommandStreamFilter()
+    emitted, commands = "", []
+    for delta in deltas:
+        text, done = stream.feed(delta)
+        emitted += text
+        commands += done
+    text, done = stream.flush()
+    return emitted + text, commands
+
+def test_plain_text_passes_through():
+    assert run(["Hello, ", "welcome to ", "the hotel."]) == ("Hello, welcome to the hotel.", [])
+
+def test_command_in_one_delta():
+    text, commands = run(['Booked! BOOK_ROOM: {"room_id": 1} Enjoy.'])
+    assert text == "Booked!  Enjoy."
+    assert commands == ['BOOK_ROOM: {"room_id": 1}']
+
+def test_marker_split_across_deltas():
+    text, commands = run(["Sure. BOO", "K_RO", 'OM: {"room_id": 2', "}", " Done."])
+    assert text == "Sure.  Done."
+    assert commands == ['BOOK_ROOM: {"room_id": 2}']
+
+def test_marker_prefix_is_held_back_until_resolved():
+    stream = CommandStreamFilter()
+    assert stream.feed("Call us to CANC") == ("Call us to ", [])
+    assert stream.feed("EL_BOOKING: {\"id\": 7}") == ("", ['CANCEL_BOOKING: {"id": 7}'])
+
+def test_prefix_that_turns_out_to_be_text_is_released():
+    stream = CommandStreamFilter()
+    assert stream.feed("Our BOO") == ("Our ", [])
+    assert stream.feed("KSHOP is open") == ("BOOKSHOP is open", [])
+    assert stream.flush() == ("", [])
+
+def test_single_character_deltas():
+    text, commands = run(list('Hi CANCEL_BOOKING: {"id": 3} bye'))
+    assert text == "Hi  bye"
+    assert commands == ['CANCEL_BOOKING: {"id": 3}']
+
+def test_two_commands():
+    text, commands = run(['A BOOK_ROOM: {"a": 1}', ' B CANCEL_BOOKING: {"b": 2} C'])
+    assert text == "A  B  C"
+    assert commands == ['BOOK_ROOM: {"a": 1}', 'CANCEL_BOOKING: {"b": 2}']
+
+def test_unterminated_command_is_returned_on_flush():
+    stream = CommandStreamFilter()
+    assert stream.feed('Ok BOOK_ROOM: {"room_id": ') == ("Ok ", [])
+    assert stream.flush() == ("", ['BOOK_ROOM: {"room_id": '])
+    assert stream.visible_text == "Ok "
@@ -0,0 +1,34 @@
+"""
+Tests for the revoked-token denylist
+"""
+
+import time
+
+from app.utils.token_denylist import TokenDenylist
+
+def test_denylist_keeps_token_until_expiry():
+    denylist = TokenDenylist()
+    denylist.revoke("live", time.time() + 60)
+    denylist.revoke("expired", time.time() - 1)
+    assert denylist.is_revoked("live")
+    assert not denylist.is_revoked("expired")
+    assert not denylist.is_revoked("never-revoked")
+
+def test_denylist_default_ttl():
+    denylist = TokenDenylist(default_ttl=60)
+    denylist.revoke("token")
+    assert denylist.is_revoked("token")
+
+def test_denylist_keeps_latest_expiry():
+    denylist = TokenDenylist()
+    later = time.time() + 120
+    denylist.revoke_many([("token", later), ("token", time.time() + 10)])
+    assert denylist._expires["token"] == later
+
+def test_denylist_purges_expired_entries():
+    denylist = TokenDenylist()
+    denylist._expires["old"] = time.time() - 1
+    denylist._next_purge = 0
+    denylist.revoke("new", time.time() + 60)
+    assert "old" not in denylist._expires
+    assert len(denylist) == 1
@@ -0,0 +1,67 @@
+"""
+Tests for AI usage summaries and retention
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.database.database import Database
+from app.models.database_models import Base
+from app.services.usage_service import AIUsageRecorder
+
+@pytest.fixture
+def recorder(tmp_path):
+    db = Database()
+    db.DATABASE_URL = f"sqlite:///{tmp_path / 'usage.db'}"
+    Base.metadata.create_all(bind=db.engine)
+    usage = AIUsageRecorder(db=db, prices={"gpt-4o-mini": (1.0, 2.0)}, retention_days=30)
+    yield usage
+    usage.close()
+    db.engine.dispose()
+
+def add_call(recorder, created_at, source="model", outcome="answered", prompt_tokens=100,
+             completion_tokens=50, latency_ms=500.0):
+    recorder.db.add_ai_calls([{
+        "created_at": created_at, "endpoint": "chat", "source": source, "model": "gpt-4o-mini",
+        "outcome": outcome, "prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+        "latency_ms": latency_ms, "cost_usd": recorder.cost("gpt-4o-mini", prompt_tokens, completion_tokens)
+    }])
+
+def test_summary_totals_and_per_day(recorder):
+    today = datetime.utcnow().replace(hour=12, minute=0, second=0, microsecond=0)
+    yesterday = today - timedelta(days=1)
+    add_call(recorder, yesterday, latency_ms=800)
+    add_call(recorder, today, latency_ms=400)
+    add_call(recorder, today, outcome="booked", latency_ms=600)
+    add_call(recorder, today, source="cache", prompt_tokens=0, completion_tokens=0, latency_ms=2)
+    add_call(recorder, today - timedelta(days=30), latency_ms=9000)
+
+    summary = recorder.summary(days=7)
+    assert summary["calls"] == 4
+    assert summary["outcomes"] == {"answered": 3, "booked": 1, "cancelled": 0, "fallback": 0}
+    assert summary["sources"] == {"model": 3, "cache": 1}
+    assert (summary["prompt_tokens"], summary["completion_tokens"]) == (300, 150)
+    assert summary["cost_usd"] == pytest.approx(3 * (100 * 1.0 + 50 * 2.0) / 1_000_000)
+    assert summary["latency_ms"]["all"] == {"count": 4, "p50": 400.0, "p95": 800.0}
+    assert summary["latency_ms"]["cache"]["count"] == 1
+
+    assert [day["date"] for day in summary["per_day"]] == [yesterday.date().isoformat(), today.date().isoformat()]
+    last = summary["per_day"][-1]
+    assert (last["calls"], last["model_calls"], last["prompt_tokens"]) == (3, 2, 200)
+    assert last["latency_ms"] == {"count": 3, "p50": 400.0, "p95": 600.0}
+
+def test_summary_includes_buffered_records(recorder):
+    recorder.record("chat", "fast_path", None, "answered", latency_ms=3)
+    summary = recorder.summary(days=1)
+    assert summary["calls"] == 1
+    assert summary["sources"] == {"fast_path": 1}
+    assert summary["pending_writes"] == 0
+
+def test_purge_deletes_records_past_retention(recorder):
+    add_call(recorder, datetime.utcnow() - timedelta(days=31))
+    add_call(recorder, datetime.utcnow() - timedelta(days=29))
+    assert recorder.purge_old_calls() == 1
+    assert recorder.summary(days=30)["calls"] == 1
+    recorder.retention_days = 0
+    assert recorder.purge_old_calls() == 0